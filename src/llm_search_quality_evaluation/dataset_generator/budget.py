@@ -0,0 +1,120 @@
+"""
+Judgment budget of a dataset generation: a maximum number of LLM calls (`max_llm_calls`, or `max_cost` divided by
+`llm_cost_per_call`), spent on query generation first, then on the (query, doc) pairs chosen by `plan_pairs`.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from llm_search_quality_evaluation.dataset_generator.config import Config
+from llm_search_quality_evaluation.shared.data_store import DataStore
+from llm_search_quality_evaluation.shared.models import Document, Query
+
+log = logging.getLogger(__name__)
+
+
+class JudgmentBudget:
+    """Countdown of the LLM calls allowed; `limit=None` is unlimited."""
+
+    def __init__(self, limit: Optional[int] = None):
+        if limit is not None and limit < 0:
+            log.error(f"Invalid LLM calls budget {limit}")
+            raise ValueError("The LLM calls budget must be >= 0")
+        self.limit = limit
+        self.used = 0
+
+    @classmethod
+    def from_config(cls, config: Config) -> JudgmentBudget:
+        return cls(config.llm_calls_budget)
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.limit is None else max(0, self.limit - self.used)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.limit is not None and self.used >= self.limit
+
+    def spend(self) -> bool:
+        """Take one call from the budget; False (nothing taken) if it is exhausted."""
+        if self.exhausted:
+            return False
+        self.used += 1
+        return True
+
+
+class Projection(NamedTuple):
+    """Upper bound of the LLM calls of a run, known before any call is made."""
+    generation_calls: int
+    cartesian_calls: int
+    # queries whose search engine top-k is scored: the number of results is only known after retrieval
+    top_k_queries: int
+
+
+def project_llm_calls(config: Config, data_store: DataStore) -> Projection:
+    """Upper bound of the LLM calls of a run from the configuration and the datastore content."""
+    existing_queries = data_store.num_queries()
+    needs_generation = existing_queries < config.num_queries_needed
+    generation_calls = config.number_of_docs if needs_generation else 0
+    num_queries = max(existing_queries, config.num_queries_needed if needs_generation else 0)
+    # a generated query is rated by its own document without a call
+    generated_queries = num_queries - existing_queries
+    cartesian_calls = num_queries * config.number_of_docs - generated_queries if config.enable_cartesian_product else 0
+    top_k_queries = num_queries if config.query_template is not None else 0
+    return Projection(generation_calls, cartesian_calls, top_k_queries)
+
+
+def log_projection(config: Config, projection: Projection, budget: JudgmentBudget) -> None:
+    calls = projection.generation_calls + projection.cartesian_calls
+    message = (f"Projected LLM calls: up to {projection.generation_calls} for query generation and "
+               f"{projection.cartesian_calls} for the cartesian product")
+    if projection.top_k_queries:
+        message += f", plus the search engine results of {projection.top_k_queries} queries"
+    if config.llm_cost_per_call is not None:
+        message += f"; projected cost {calls * config.llm_cost_per_call:.4f}"
+        if projection.top_k_queries:
+            message += f" + {config.llm_cost_per_call:.4f} per search engine result"
+    log.info(message)
+    if budget.limit is not None:
+        log.info(f"LLM calls budget: {budget.limit}")
+        if calls > budget.limit:
+            log.warning(f"The projected LLM calls ({calls}) exceed the budget ({budget.limit}): "
+                        f"the pairs to score are sampled across queries")
+
+
+def plan_pairs(candidates: Sequence[Tuple[Query, Sequence[Document]]],
+               limit: Optional[int]) -> List[Tuple[Query, Document]]:
+    """
+    Choose up to `limit` (query, doc) pairs among the candidates, given per query in priority order.
+
+    Selection is stratified: the first candidate of every query, then the second of every query, and so on, so the
+    budget covers as many queries as possible and the top-ranked engine results of each query come first.
+    """
+    planned: List[Tuple[Query, Document]] = []
+    depth = 0
+    max_depth = max((len(docs) for _, docs in candidates), default=0)
+    while depth < max_depth:
+        for query, docs in candidates:
+            if limit is not None and len(planned) >= limit:
+                return planned
+            if depth < len(docs):
+                planned.append((query, docs[depth]))
+        depth += 1
+    return planned
+
+
+def candidate_pairs(config: Config, data_store: DataStore,
+                    top_k: Dict[str, List[Document]]) -> List[Tuple[Query, List[Document]]]:
+    """Unrated candidates of every query: its search engine results in rank order, then the cartesian docs."""
+    cartesian_docs = data_store.get_cartesian_prod_docs() if config.enable_cartesian_product else []
+    candidates: List[Tuple[Query, List[Document]]] = []
+    for query in data_store.get_queries():
+        seen = set()
+        docs: List[Document] = []
+        for doc in top_k.get(query.id, []) + cartesian_docs:
+            if doc.id not in seen and not data_store.has_rating_score(query.id, doc.id):
+                seen.add(doc.id)
+                docs.append(doc)
+        candidates.append((query, docs))
+    return candidates
@@ -2,6 +2,7 @@ from typing import List, Optional, Literal, Dict
 from pydantic import BaseModel, HttpUrl, Field, field_validator, FilePath, model_validator
 import yaml
 import logging
+import math
 from pathlib import Path
 from urllib.parse import urljoin
 
@@ -43,10 +44,63 @@ class Config(BaseModel):
     datastore_autosave_every_n_updates: Optional[int] = Field(None, gt=0,
         description="If set, periodically persist datastore every N successful updates (adds/ratings)."
     )
+    datastore_background_autosave: bool = Field(
+        True,
+        description="Write the autosave snapshots on a background thread instead of blocking the updates."
+    )
+    datastore_format: Optional[Literal['json', 'binary']] = Field(
+        None,
+        description="On-disk format of the datastore; if not set, the format of the existing datastore is kept "
+                    "(json for a new one)."
+    )
+    query_near_duplicate_threshold: Optional[float] = Field(
+        None, gt=0, le=1,
+        description="If set, a new query whose text similarity (Jaccard of character shingles) with an existing query "
+                    "reaches this threshold is suppressed."
+    )
     enable_cartesian_product: bool = Field(
         True,
         description="Enable cartesian product scoring between queries and documents used to generate queries."
     )
+    max_llm_calls: Optional[int] = Field(
+        None, gt=0,
+        description="Maximum number of LLM calls (query generations and scores) of a run."
+    )
+    max_cost: Optional[float] = Field(
+        None, gt=0,
+        description="Maximum cost of the LLM calls of a run, in the unit of llm_cost_per_call."
+    )
+    llm_cost_per_call: Optional[float] = Field(
+        None, gt=0,
+        description="Estimated cost of one LLM call, used by max_cost and by the projected cost."
+    )
+    doc_field_max_chars: Optional[int] = Field(
+        None, gt=0,
+        description="Maximum characters of every text field of a document in the LLM prompts; longer values keep "
+                    "their head and tail."
+    )
+    doc_field_max_tokens: Optional[int] = Field(
+        None, gt=0,
+        description="Same as doc_field_max_chars, in tokens (about 4 characters per token)."
+    )
+    doc_field_max_chars_by_field: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Maximum characters of some fields in the LLM prompts, overriding doc_field_max_chars and "
+                    "doc_field_max_tokens."
+    )
+    llm_metrics_destination: Optional[Path] = Field(
+        None,
+        description="JSON lines file where the token usage, latency and outcome of every LLM call are appended."
+    )
+    llm_input_token_cost: Optional[float] = Field(
+        None, ge=0,
+        description="Price of one million prompt tokens, to compute the cost of the LLM calls."
+    )
+    llm_output_token_cost: Optional[float] = Field(
+        None, ge=0,
+        description="Price of one million completion tokens (reasoning included), to compute the cost of the LLM "
+                    "calls."
+    )
 
     def build_writer_config(self) -> WriterConfig:
         if self.rre_query_template is not None:
@@ -74,6 +128,14 @@ class Config(BaseModel):
             raise ValueError("docFields cannot contain empty strings.")
         return value_field
 
+    @field_validator('doc_field_max_chars_by_field')
+    @classmethod
+    def check_field_budgets(cls, value_field: Dict[str, int]) -> Dict[str, int]:
+        if any(budget <= 0 for budget in value_field.values()):
+            log.error("doc_field_max_chars_by_field values must be greater than 0.")
+            raise ValueError("doc_field_max_chars_by_field values must be greater than 0.")
+        return value_field
+
     @field_validator('queries')
     @classmethod
     def check_doc_type(cls, value_field: Optional[FilePath]) -> Optional[FilePath]:
@@ -96,6 +158,25 @@ class Config(BaseModel):
             raise ValueError("llm_explanation_destination must be set when save_llm_explanation is set to True.")
         return self
 
+    @model_validator(mode="after")
+    def validate_budget_fields(self) -> "Config":
+        if self.max_cost is not None and self.llm_cost_per_call is None:
+            raise ValueError("llm_cost_per_call must be set when max_cost is set.")
+        return self
+
+    @property
+    def llm_calls_budget(self) -> Optional[int]:
+        """
+        Returns the maximum number of LLM calls allowed by max_llm_calls and max_cost, None if unlimited.
+        """
+        limits = []
+        if self.max_llm_calls is not None:
+            limits.append(self.max_llm_calls)
+        if self.max_cost is not None and self.llm_cost_per_call is not None:
+            # rounded first: 0.5 // 0.1 == 4.0 in floating point
+            limits.append(math.floor(round(self.max_cost / self.llm_cost_per_call, 9)))
+        return min(limits) if limits else None
+
     @property
     def relevance_label_set(self) -> set[int]:
         """
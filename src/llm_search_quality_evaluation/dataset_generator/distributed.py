@@ -0,0 +1,303 @@
+"""
+Distributed dataset generation: one coordinator and any number of workers sharing a SQLite work queue.
+
+- The coordinator owns the datastore and the search engine calls. It runs the same steps as `dataset_generator`, but
+  enqueues the LLM calls as tasks (query generation per document, then the scoring of every unrated (query, doc)
+  pair), waits for the workers and ingests the results of the tasks it enqueued. A task key includes the task
+  parameters and a hash of the LLM settings, so a restarted coordinator reuses the tasks already done only if
+  nothing that changes the LLM answer changed.
+- A worker only needs the LLM configuration: it leases batches of tasks, calls the LLMService and reports the
+  results, until the coordinator closes the queue. Start as many workers as needed, on any node that can open the
+  queue file; a crashed worker's tasks are leased again once their lease expires.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import yaml
+
+from llm_search_quality_evaluation.dataset_generator.budget import JudgmentBudget, log_projection, project_llm_calls
+from llm_search_quality_evaluation.dataset_generator.config import Config
+from llm_search_quality_evaluation.dataset_generator.llm import LLMConfig, LLMService, LLMServiceFactory
+from llm_search_quality_evaluation.dataset_generator.main import (
+    GENERATED_QUERY_EXPLANATION, add_user_queries, build_data_store, build_document_formatter, build_search_engine,
+    build_telemetry, write_outputs
+)
+from llm_search_quality_evaluation.dataset_generator.work_queue import (
+    DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, DONE, FAILED, LEASED, PENDING, Task, WorkQueue, default_worker_id
+)
+from llm_search_quality_evaluation.shared.data_store import DataStore
+from llm_search_quality_evaluation.shared.logger import setup_logging
+from llm_search_quality_evaluation.shared.models import Document
+from llm_search_quality_evaluation.shared.search_engines import BaseSearchEngine
+from llm_search_quality_evaluation.shared.writers import WriterFactory
+
+log = logging.getLogger(__name__)
+
+GENERATE_QUERIES = "generate_queries"
+SCORE = "score"
+
+DEFAULT_QUEUE_PATH = Path("resources/tmp/work_queue.sqlite")
+DEFAULT_WORKER_BATCH_SIZE = 4
+DEFAULT_POLL_SECONDS = 2.0
+DOCUMENT_CACHE_SIZE = 4096
+LLM_SETTINGS_HASH_LENGTH = 16
+
+
+# ────────────────────────────────────────────
+# Coordinator
+# ────────────────────────────────────────────
+def llm_settings_hash(config: Config) -> str:
+    """Hash of what shapes the LLM answers besides the task payload: the LLM configuration and the prompt budgets."""
+    with open(config.llm_configuration_file, "r") as f:
+        llm_config = yaml.safe_load(f)
+    settings = {
+        "llm": llm_config,
+        "doc_field_max_chars": config.doc_field_max_chars,
+        "doc_field_max_tokens": config.doc_field_max_tokens,
+        "doc_field_max_chars_by_field": config.doc_field_max_chars_by_field,
+    }
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:LLM_SETTINGS_HASH_LENGTH]
+
+
+def _wait(queue: WorkQueue, kind: str, poll_seconds: float) -> None:
+    counts = queue.wait_until_drained(kind, poll_seconds)
+    log.info(f"[coordinator] {kind} tasks: {counts[DONE]} done, {counts[FAILED]} failed")
+    if counts[FAILED]:
+        log.warning(f"[coordinator] {counts[FAILED]} {kind} tasks failed after the maximum attempts, skipped")
+
+
+def generate_queries_distributed(config: Config, data_store: DataStore, search_engine: BaseSearchEngine,
+                                 queue: WorkQueue, poll_seconds: float = DEFAULT_POLL_SECONDS) -> None:
+    """Same as main.generate_and_add_queries, the LLM calls being made by the workers."""
+    log_projection(config, project_llm_calls(config, data_store), JudgmentBudget())
+    docs_to_generate_queries: List[Document] = search_engine.fetch_for_query_generation(
+        documents_filter=config.documents_filter,
+        number_of_docs=config.number_of_docs,
+        doc_fields=config.doc_fields
+    )
+    for doc in docs_to_generate_queries:
+        doc.is_used_to_generate_queries = True
+        data_store.add_document(doc)
+
+    remaining = max(0, config.num_queries_needed - data_store.num_queries())
+    if remaining == 0:
+        return
+    num_queries_per_doc: int = int((remaining // max(1, config.number_of_docs)) + 1)
+
+    settings_hash = llm_settings_hash(config)
+    keys = [f"{doc.id}\t{num_queries_per_doc}\t{config.max_query_terms}\t{settings_hash}"
+            for doc in docs_to_generate_queries]
+    queue.add_documents((doc.id, doc.model_dump()) for doc in docs_to_generate_queries)
+    added = queue.enqueue(
+        (GENERATE_QUERIES, key, {"doc_id": doc.id, "num_queries": num_queries_per_doc,
+                                 "max_query_terms": config.max_query_terms})
+        for key, doc in zip(keys, docs_to_generate_queries)
+    )
+    log.info(f"[coordinator] {added} query generation tasks enqueued, {len(keys) - added} reused")
+    _wait(queue, GENERATE_QUERIES, poll_seconds)
+
+    # results of this run's tasks only, in document order as in the local run
+    results = {key: (payload, result) for key, payload, result in queue.results(GENERATE_QUERIES, set(keys))}
+    for key in keys:
+        if key not in results:
+            continue
+        payload, result = results[key]
+        for query_ in result["queries"]:
+            if data_store.num_queries() >= config.num_queries_needed:
+                return
+            query_obj = data_store.add_query(query_)
+            data_store.create_rating_score(
+                query_obj.id, payload["doc_id"], max(config.relevance_label_set), GENERATED_QUERY_EXPLANATION
+            )
+
+
+def _score_tasks(config: Config, data_store: DataStore, search_engine: BaseSearchEngine,
+                 queue: WorkQueue) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """Unrated (query, doc) pairs of the cartesian product and of the search engine top-k, as score tasks."""
+    settings_hash = llm_settings_hash(config)
+
+    def task(query_id: str, query_text: str, doc: Document) -> Tuple[str, str, Dict[str, Any]]:
+        payload = {"query_id": query_id, "query_text": query_text, "doc_id": doc.id,
+                   "relevance_scale": config.relevance_scale, "explanation": config.save_llm_explanation}
+        key = (f"{query_id}\t{doc.id}\t{config.relevance_scale}\t{int(config.save_llm_explanation)}"
+               f"\t{settings_hash}")
+        return SCORE, key, payload
+
+    queries = data_store.get_queries()
+    if config.enable_cartesian_product:
+        cartesian_docs = data_store.get_cartesian_prod_docs()
+        queue.add_documents((doc.id, doc.model_dump()) for doc in cartesian_docs)
+        for query_obj in queries:
+            for doc_obj in cartesian_docs:
+                if not data_store.has_rating_score(query_obj.id, doc_obj.id):
+                    yield task(query_obj.id, query_obj.text, doc_obj)
+
+    if config.query_template is None:
+        log.warning("Query template not found. Skipping retrieval.")
+        return
+    for query_obj in queries:
+        docs_eval: List[Document] = search_engine.fetch_for_evaluation(
+            keyword=query_obj.text, query_template=config.query_template, doc_fields=config.doc_fields
+        )
+        queue.add_documents((doc.id, doc.model_dump()) for doc in docs_eval)
+        for doc_obj in docs_eval:
+            data_store.add_document(doc_obj)
+            if not data_store.has_rating_score(query_obj.id, doc_obj.id):
+                yield task(query_obj.id, query_obj.text, doc_obj)
+
+
+def score_distributed(config: Config, data_store: DataStore, search_engine: BaseSearchEngine, queue: WorkQueue,
+                      poll_seconds: float = DEFAULT_POLL_SECONDS) -> None:
+    """Same as main.add_cartesian_product_scores and main.expand_docset_with_search_engine_top_k together."""
+    # enqueued as they are found: workers start scoring while the coordinator is still querying the search engine
+    added = 0
+    keys: Set[str] = set()
+    batch: List[Tuple[str, str, Dict[str, Any]]] = []
+    for score_task in _score_tasks(config, data_store, search_engine, queue):
+        batch.append(score_task)
+        keys.add(score_task[1])
+        if len(batch) >= 1000:
+            added += queue.enqueue(batch)
+            batch = []
+    added += queue.enqueue(batch)
+    log.info(f"[coordinator] {added} scoring tasks enqueued, {len(keys) - added} reused")
+    _wait(queue, SCORE, poll_seconds)
+
+    for _, payload, result in queue.results(SCORE, keys):
+        if not data_store.has_rating_score(payload["query_id"], payload["doc_id"]):
+            data_store.create_rating_score(payload["query_id"], payload["doc_id"], result["score"],
+                                           result.get("explanation"))
+
+
+def run_coordinator(config: Config, data_store: DataStore, search_engine: BaseSearchEngine, queue: WorkQueue,
+                    poll_seconds: float = DEFAULT_POLL_SECONDS) -> None:
+    queue.open_queue()
+    try:
+        generate_queries_distributed(config, data_store, search_engine, queue, poll_seconds)
+        score_distributed(config, data_store, search_engine, queue, poll_seconds)
+    finally:
+        # workers exit once the queue is empty
+        queue.close_queue()
+
+
+# ────────────────────────────────────────────
+# Worker
+# ────────────────────────────────────────────
+def execute_task(llm_service: LLMService, task: Task, get_document: Any) -> Dict[str, Any]:
+    """Result of a task, from the LLM service; `get_document(doc_id)` returns the referenced Document."""
+    payload = task.payload
+    document: Document = get_document(payload["doc_id"])
+    if task.kind == GENERATE_QUERIES:
+        query_response = llm_service.generate_queries(document, payload["num_queries"], payload["max_query_terms"])
+        return {"queries": query_response.get_queries()}
+    if task.kind == SCORE:
+        score_resp = llm_service.generate_score(
+            document, payload["query_text"], payload["relevance_scale"], payload["explanation"]
+        )
+        return {"score": score_resp.get_score(),
+                "explanation": score_resp.explanation if payload["explanation"] else None}
+    log.error(f"Unknown task kind {task.kind}")
+    raise ValueError(f"Unknown task kind {task.kind}")
+
+
+def run_worker(llm_service: LLMService, queue: WorkQueue, worker_id: Optional[str] = None,
+               batch_size: int = DEFAULT_WORKER_BATCH_SIZE, poll_seconds: float = DEFAULT_POLL_SECONDS) -> int:
+    """Process tasks until the queue is closed and empty; returns the number of completed tasks."""
+    worker = worker_id or default_worker_id()
+
+    @lru_cache(maxsize=DOCUMENT_CACHE_SIZE)
+    def get_document(doc_id: str) -> Document:
+        body = queue.get_document(doc_id)
+        if body is None:
+            raise ValueError(f"Document {doc_id} not found in the work queue")
+        return Document.model_validate(body)
+
+    completed = 0
+    log.info(f"[worker] {worker} started on {queue.path}")
+    while True:
+        tasks = queue.lease(worker, batch_size)
+        if not tasks:
+            counts = queue.counts()
+            if queue.is_closed() and counts[PENDING] == 0 and counts[LEASED] == 0:
+                break
+            time.sleep(poll_seconds)
+            continue
+        for task in tasks:
+            try:
+                result = execute_task(llm_service, task, get_document)
+            except Exception as e:
+                log.warning(f"[worker] task {task.kind}:{task.key} attempt {task.attempts} failed: {e}")
+                queue.fail(task, worker, str(e))
+                continue
+            if queue.complete(task, worker, result):
+                completed += 1
+    log.info(f"[worker] {worker} done, {completed} tasks completed")
+    return completed
+
+
+# ────────────────────────────────────────────
+# CLI
+# ────────────────────────────────────────────
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Run dataset_generator as a coordinator or a worker.')
+    parser.add_argument('role', choices=['coordinator', 'worker'],
+                        help='coordinator: enqueue the LLM tasks and write the dataset; worker: process the tasks')
+    parser.add_argument('-c', '--config', type=str,
+                        help='Config file path to use for the application [default: "examples/configs/dataset_generator/dataset_generator_config.yaml"]',
+                        required=False, default="examples/configs/dataset_generator/dataset_generator_config.yaml")
+    parser.add_argument('-q', '--queue', type=Path, default=DEFAULT_QUEUE_PATH,
+                        help=f'SQLite work queue file, shared by the coordinator and the workers [default: "{DEFAULT_QUEUE_PATH}"]')
+    parser.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS,
+                        help=f'Time after which a task leased by a silent worker is given to another one [default: {DEFAULT_LEASE_SECONDS}]')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f'Attempts of a failing task before it is skipped [default: {DEFAULT_MAX_ATTEMPTS}]')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_WORKER_BATCH_SIZE,
+                        help=f'Tasks leased at once by a worker [default: {DEFAULT_WORKER_BATCH_SIZE}]')
+    parser.add_argument('--poll-seconds', type=float, default=DEFAULT_POLL_SECONDS,
+                        help=f'Pause between two checks of the queue [default: {DEFAULT_POLL_SECONDS}]')
+    parser.add_argument('--worker-id', type=str, default=None,
+                        help='Worker name in the queue [default: <hostname>-<pid>]')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Activate debug mode for logging [default: False]')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config: Config = Config.load(args.config)
+    setup_logging(args.verbose)
+    queue = WorkQueue(args.queue, lease_seconds=args.lease_seconds, max_attempts=args.max_attempts)
+
+    if args.role == "worker":
+        worker_id = args.worker_id or default_worker_id()
+        telemetry = build_telemetry(config, worker_id)
+        llm_config = LLMConfig.load(config.llm_configuration_file)
+        service = LLMService(chat_model=LLMServiceFactory.build_lazy(llm_config), telemetry=telemetry,
+                             document_formatter=build_document_formatter(config), max_retries=llm_config.max_retries)
+        run_worker(service, queue, worker_id, args.batch_size, args.poll_seconds)
+        telemetry.log_summary()
+        telemetry.close()
+        service.document_formatter.log_report()
+        return
+
+    if config.llm_calls_budget is not None:
+        log.warning("max_llm_calls and max_cost are not applied in distributed mode")
+    data_store = build_data_store(config)
+    search_engine = build_search_engine(config)
+    writer = WriterFactory.build(config.build_writer_config())
+    add_user_queries(config, data_store)
+    run_coordinator(config, data_store, search_engine, queue, args.poll_seconds)
+    write_outputs(config, data_store, writer, search_engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
+from llm_search_quality_evaluation.dataset_generator.llm.document_prompt import DocumentPromptFormatter
 from llm_search_quality_evaluation.dataset_generator.llm.llm_config import LLMConfig
 from llm_search_quality_evaluation.dataset_generator.llm.llm_provider_factory import LLMServiceFactory
 from llm_search_quality_evaluation.dataset_generator.llm.llm_service import LLMService
+from llm_search_quality_evaluation.dataset_generator.llm.telemetry import LLMCallMetrics, LLMTelemetry
 
 __all__ = [
     "LLMConfig",
     "LLMServiceFactory",
     "LLMService",
+    "LLMCallMetrics",
+    "LLMTelemetry",
+    "DocumentPromptFormatter",
 ]
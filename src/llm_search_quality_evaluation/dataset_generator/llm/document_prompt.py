@@ -0,0 +1,191 @@
+"""
+Document JSON of the LLM prompts, with a size budget per field.
+
+Text values longer than the budget of their field keep their head (2/3 of the budget) and their tail (1/3), cut at
+sentence boundaries when possible, joined by a marker, so the prompt keeps the title-like opening and the
+conclusion of long descriptions. The string items of a list (the adapters store text fields as lists) share the
+budget of their field: the item crossing it is truncated and the later ones dropped. Other values (numbers, objects)
+are kept as they are.
+
+With a budget set, the JSON of a document is built once and cached by id and field names: a document is scored
+against many queries.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from llm_search_quality_evaluation.shared.models.document import Document
+
+log = logging.getLogger(__name__)
+
+# rough average for English text with the OpenAI and Gemini tokenizers, used to convert token budgets
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = " [...] "
+HEAD_RATIO = 2 / 3
+DEFAULT_CACHE_SIZE = 10_000
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_WHITESPACE = re.compile(r"\s+")
+# a sentence boundary right before a position
+_SENTENCE_START = re.compile(r"(?:[.!?]\s+|\n+)$")
+
+
+def _last_cut(pattern: re.Pattern[str], text: str, minimum: int) -> Optional[int]:
+    cuts = [m.start() for m in pattern.finditer(text) if m.start() >= minimum]
+    return cuts[-1] if cuts else None
+
+
+def _head(text: str, size: int) -> str:
+    """At most `size` leading chars, ending at a sentence boundary (or a word one) if it keeps half of them."""
+    head = text[:size]
+    if size >= len(text) or _SENTENCE_END.match(text, size):
+        return head.rstrip()
+    cut = _last_cut(_SENTENCE_END, head, size // 2)
+    if cut is None and not text[size].isspace():
+        cut = _last_cut(_WHITESPACE, head, size // 2)
+    return head[:cut].rstrip()
+
+
+def _tail(text: str, size: int) -> str:
+    """At most `size` trailing chars, starting at a sentence boundary (or a word one) if it keeps half of them."""
+    start = len(text) - size
+    tail = text[start:]
+    if start <= 0 or _SENTENCE_START.search(text, max(0, start - 64), start):
+        return tail.lstrip()
+    match = _SENTENCE_END.search(tail)
+    if (match is None or match.end() > size // 2) and not text[start - 1].isspace():
+        match = _WHITESPACE.search(tail)
+    if match is not None and match.end() <= size // 2:
+        return tail[match.end():]
+    return tail.lstrip()
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Head and tail of `text` within `max_chars` (marker included), `text` itself if it fits."""
+    if len(text) <= max_chars:
+        return text
+    budget = max_chars - len(TRUNCATION_MARKER)
+    if budget < 2:
+        return text[:max_chars]
+    head_size = round(budget * HEAD_RATIO)
+    return _head(text, head_size) + TRUNCATION_MARKER + _tail(text, budget - head_size)
+
+
+def _truncate_items(items: List[Any], max_chars: int) -> List[Any]:
+    """String items within `max_chars` in total: the one crossing the budget is truncated, the later ones dropped."""
+    kept: List[Any] = []
+    remaining = max_chars
+    for item in items:
+        if not isinstance(item, str):
+            kept.append(item)
+        elif remaining > 0:
+            kept.append(truncate_text(item, remaining))
+            remaining -= len(item)
+    return kept
+
+
+def _text_chars(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, list):
+        return sum(len(item) for item in value if isinstance(item, str))
+    return 0
+
+
+class DocumentPromptFormatter:
+    """Truncated and cached document JSON for the prompts; `report` sums up what was truncated."""
+
+    def __init__(self, max_chars: Optional[int] = None, max_chars_by_field: Optional[Dict[str, int]] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        :param max_chars: budget of every text field, None for no limit
+        :param max_chars_by_field: budget of some fields, overriding max_chars
+        """
+        budgets = [max_chars, *(max_chars_by_field or {}).values()]
+        if any(budget is not None and budget <= 0 for budget in budgets):
+            log.error(f"Invalid document field budgets max_chars={max_chars} by_field={max_chars_by_field}")
+            raise ValueError("Document field budgets must be > 0")
+        self.max_chars = max_chars
+        self.max_chars_by_field = dict(max_chars_by_field or {})
+        self._cache_size = cache_size
+        self._cache: OrderedDict[Tuple[str, Tuple[str, ...]], str] = OrderedDict()
+        self._lock = threading.Lock()
+        # report, every document counted once
+        self._seen: Set[str] = set()
+        self._truncated_documents = 0
+        self._truncated_fields: Counter[str] = Counter()
+        self._chars_before = 0
+        self._chars_after = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_chars is not None or bool(self.max_chars_by_field)
+
+    def budget(self, field: str) -> Optional[int]:
+        return self.max_chars_by_field.get(field, self.max_chars)
+
+    def to_json(self, document: Document) -> str:
+        """JSON of the document as given to the LLM (without the is_used_to_generate_queries flag)."""
+        if not self.enabled:
+            return document.model_dump_json(exclude={"is_used_to_generate_queries"})
+        key = (document.id, tuple(document.fields))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        doc_json = self._serialize(document)
+        with self._lock:
+            self._cache[key] = doc_json
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return doc_json
+
+    def _serialize(self, document: Document) -> str:
+        fields: Dict[str, Any] = {}
+        truncated, before, after = [], 0, 0
+        for name, value in document.fields.items():
+            budget = self.budget(name)
+            chars = _text_chars(value)
+            before += chars
+            if budget is not None and chars > budget:
+                value = truncate_text(value, budget) if isinstance(value, str) else _truncate_items(value, budget)
+                truncated.append(name)
+            after += _text_chars(value)
+            fields[name] = value
+        with self._lock:
+            if document.id not in self._seen:
+                self._seen.add(document.id)
+                self._truncated_documents += bool(truncated)
+                self._truncated_fields.update(truncated)
+                self._chars_before += before
+                self._chars_after += after
+        if truncated:
+            document = document.model_copy(update={"fields": fields})
+        return document.model_dump_json(exclude={"is_used_to_generate_queries"})
+
+    def report(self) -> Dict[str, Any]:
+        """Truncation totals over the documents formatted so far (strings and string items of lists only)."""
+        with self._lock:
+            removed = self._chars_before - self._chars_after
+            return {
+                "documents": len(self._seen),
+                "truncated_documents": self._truncated_documents,
+                "truncated_fields": dict(self._truncated_fields),
+                "chars_before": self._chars_before,
+                "chars_after": self._chars_after,
+                "removed_ratio": round(removed / self._chars_before, 4) if self._chars_before else 0.0,
+            }
+
+    def log_report(self) -> None:
+        report = self.report()
+        if not report["documents"]:
+            return
+        log.info(f"Prompt truncation: {report['truncated_documents']} of {report['documents']} documents truncated "
+                 f"(fields: {report['truncated_fields']}), text fields {report['chars_before']} -> "
+                 f"{report['chars_after']} chars ({report['removed_ratio']:.1%} removed)")
@@ -15,6 +15,8 @@ class LLMConfig(BaseModel):
     model: str
     reasoning_effort: Optional[str] = Field(default=None, description="The reasoning effort of the model")
     api_key_env: Optional[str] = None
+    max_retries: int = Field(default=2, ge=0, description="Retries of a request failed by a rate limit, a timeout "
+                                                           "or a server error, with exponential backoff")
 
     @model_validator(mode="after")
     def set_reasoning_effort_defaults(self) -> "LLMConfig":
@@ -4,12 +4,16 @@ llm_provider_factory.py
 Provides a simple Factory for creating LangChain ChatModel instances
 with lazy initialization for the 2 currently supported LLMs - openai and gemini.
 
+The chat models are built without SDK retries: LLMService retries the transient errors (`RETRYABLE_ERRORS`) itself,
+so the retries go through LangChain and are counted by the telemetry.
+
 """
 
 import logging
 import os
-from typing import Optional
+from typing import List, Optional, Tuple, Type
 
+import openai
 from dotenv import load_dotenv
 from langchain_core.language_models import BaseChatModel
 from pydantic import SecretStr
@@ -21,6 +25,31 @@ from llm_search_quality_evaluation.dataset_generator.llm.llm_config import LLMCo
 log = logging.getLogger(__name__)
 
 
+def _retryable_errors() -> Tuple[Type[BaseException], ...]:
+    """Rate limit, timeout, connection and server errors of the providers, for the installed SDK versions."""
+    errors: List[Type[BaseException]] = [openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError]
+    try:
+        # langchain-core >= 1.x: raised by both integrations
+        from langchain_core.exceptions import (
+            ModelAPIError, ModelConnectionError, ModelRateLimitError, ModelTimeoutError
+        )
+        errors += [ModelAPIError, ModelConnectionError, ModelRateLimitError, ModelTimeoutError]
+    except ImportError:  # pragma: no cover
+        pass
+    try:
+        # langchain-google-genai 2.x
+        from google.api_core.exceptions import (
+            DeadlineExceeded, InternalServerError, ResourceExhausted, ServiceUnavailable
+        )
+        errors += [DeadlineExceeded, InternalServerError, ResourceExhausted, ServiceUnavailable]
+    except ImportError:  # pragma: no cover
+        pass
+    return tuple(errors)
+
+
+RETRYABLE_ERRORS = _retryable_errors()
+
+
 def build_openai(config: LLMConfig) -> BaseChatModel:
     load_dotenv()  # load .env file
     key = os.getenv(config.api_key_env or "OPENAI_API_KEY")
@@ -33,12 +62,14 @@ def build_openai(config: LLMConfig) -> BaseChatModel:
         return ChatOpenAI(
             model=config.model,
             api_key=SecretStr(key),
+            max_retries=0,
         )
     else:
         return ChatOpenAI(
             model=config.model,
             api_key=SecretStr(key),
             reasoning_effort=config.reasoning_effort,
+            max_retries=0,
         )
 
 
@@ -53,6 +84,7 @@ def build_gemini(config: LLMConfig) -> BaseChatModel:
     return ChatGoogleGenerativeAI(
         model=config.model,
         google_api_key=key,
+        max_retries=0,
         model_kwargs={
             "thinking_config": {
                 "thinking_budget": config.reasoning_effort,
@@ -1,11 +1,15 @@
 import json
 import logging
-from typing import Optional
+from contextlib import nullcontext
+from typing import Any, ContextManager, List, Optional, Tuple, Type
 
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, ValidationError
 
-from llm_search_quality_evaluation.dataset_generator.llm.llm_provider_factory import LazyLLM
+from llm_search_quality_evaluation.dataset_generator.llm.llm_provider_factory import LazyLLM, RETRYABLE_ERRORS
+from llm_search_quality_evaluation.dataset_generator.llm.document_prompt import DocumentPromptFormatter
+from llm_search_quality_evaluation.dataset_generator.llm.telemetry import LLMTelemetry
 from llm_search_quality_evaluation.dataset_generator.models.query_response import LLMQueryResponse
 from llm_search_quality_evaluation.dataset_generator.models.score_response import LLMScoreResponse
 from llm_search_quality_evaluation.shared.models.document import Document
@@ -14,10 +18,37 @@ from llm_search_quality_evaluation.dataset_generator.models.score_schema import
 
 log = logging.getLogger(__name__)
 
+# first wait before a retry, doubled at every retry (with jitter)
+RETRY_INITIAL_WAIT_SECONDS = 1.0
+
 
 class LLMService:
-    def __init__(self, chat_model: LazyLLM):
+    def __init__(self, chat_model: LazyLLM, telemetry: Optional[LLMTelemetry] = None,
+                 document_formatter: Optional[DocumentPromptFormatter] = None, max_retries: int = 0,
+                 retry_on: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS):
         self.chat_model = chat_model
+        # retries of the transient errors, made here (not by the SDK) so the telemetry counts them
+        self.max_retries = max_retries
+        self.retry_on = retry_on
+        # optional sink of the token usage, latency and outcome of every call
+        self.telemetry = telemetry
+        # document JSON of the prompts: cached per document, truncated to the field budgets if any
+        self.document_formatter = document_formatter or DocumentPromptFormatter()
+
+    def _track(self, operation: str, document: Document, messages: List[BaseMessage]) -> ContextManager[None]:
+        if self.telemetry is None:
+            return nullcontext()
+        prompt_chars = sum(len(str(message.content)) for message in messages)
+        return self.telemetry.track(operation, document.id, prompt_chars)
+
+    def _invoke(self, structured_llm: Runnable, messages: List[BaseMessage]) -> Any:
+        if self.max_retries > 0:
+            structured_llm = structured_llm.with_retry(
+                retry_if_exception_type=self.retry_on,
+                stop_after_attempt=self.max_retries + 1,
+                exponential_jitter_params={"initial": RETRY_INITIAL_WAIT_SECONDS},
+            )
+        return structured_llm.invoke(messages)
 
     @staticmethod
     def _build_query_generation_prompt(num_queries_generate_per_doc: int, max_query_terms: Optional[int]) -> str:
@@ -71,7 +102,7 @@ class LLMService:
         system_prompt = self._build_query_generation_prompt(num_queries_generate_per_doc=num_queries_generate_per_doc,
                                                             max_query_terms=max_query_terms)
 
-        doc_json = document.model_dump_json(exclude={"is_used_to_generate_queries"})
+        doc_json = self.document_formatter.to_json(document)
 
         messages = [
             SystemMessage(content=system_prompt),
@@ -81,7 +112,8 @@ class LLMService:
         # Use LangChain structured output
         structured_llm = self.chat_model.with_structured_output(schema)
         try:
-            model_response = structured_llm.invoke(messages)
+            with self._track("generate_queries", document, messages):
+                model_response = self._invoke(structured_llm, messages)
         except (ValidationError, KeyError) as e:
             log.debug("Invalid LLM response.")
             raise ValueError(f"Invalid LLM response: {e}")
@@ -133,7 +165,7 @@ class LLMService:
                 content=system_prompt
             ),
             HumanMessage(
-                content=f"Document: {document.model_dump_json(exclude={'is_used_to_generate_queries'})}\n"
+                content=f"Document: {self.document_formatter.to_json(document)}\n"
                         f"Query:{query}\n"
             )
         ]
@@ -141,7 +173,8 @@ class LLMService:
         # Use LangChain structured output
         structured_llm = self.chat_model.with_structured_output(schema)
         try:
-            model_response = structured_llm.invoke(messages)
+            with self._track("generate_score", document, messages):
+                model_response = self._invoke(structured_llm, messages)
         except (ValidationError, KeyError) as e:
             log.debug("Invalid LLM response.")
             raise ValueError(f"Invalid LLM response: {e}")
@@ -0,0 +1,225 @@
+"""
+Token and cost telemetry of the LLM calls.
+
+`LLMTelemetry.track` wraps one LLMService call: token usage, model and retries (the attempts tagged by
+`Runnable.with_retry`) are collected by a LangChain callback handler registered for the calls made inside the block
+(no change to the chat model or to the invoke arguments), latency and outcome are measured around it. Every call is appended as a JSON line to the metrics file (if any) and
+aggregated in memory for the end-of-run summary.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.tracers.context import register_configure_hook
+from pydantic import BaseModel, Field
+
+log = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+TOP_PROMPT_DOCUMENTS = 5
+RETRY_ATTEMPT_TAG = "retry:attempt:"
+
+
+class LLMCallMetrics(BaseModel):
+    """One LLM call, as written to the metrics file."""
+    timestamp: str = Field(..., description="UTC time of the end of the call, ISO 8601.")
+    operation: str = Field(..., description="LLMService method: generate_queries or generate_score.")
+    doc_id: str = Field(..., description="Document of the prompt.")
+    model: Optional[str] = Field(None, description="Model name reported by the provider.")
+    prompt_chars: int = Field(..., description="Characters of the prompt messages.")
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    reasoning_tokens: int = Field(0, description="Reasoning tokens, included in the completion tokens.")
+    total_tokens: int = 0
+    latency_ms: float = 0.0
+    retries: int = Field(0, description="Retries of the request after a transient error.")
+    success: bool = True
+    error: Optional[str] = None
+    cost: Optional[float] = Field(None, description="Cost from the token prices, if configured.")
+
+
+class _UsageCollector(BaseCallbackHandler):
+    """Sums the usage metadata of the chat model runs of one tracked call."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.reasoning_tokens = 0
+        self.total_tokens = 0
+        self.retries = 0
+        self.model: Optional[str] = None
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                if not isinstance(generation, ChatGeneration) or not isinstance(generation.message, AIMessage):
+                    continue
+                message = generation.message
+                self.model = message.response_metadata.get("model_name") or self.model
+                usage = message.usage_metadata
+                if usage:
+                    self.prompt_tokens += usage.get("input_tokens", 0)
+                    self.completion_tokens += usage.get("output_tokens", 0)
+                    self.total_tokens += usage.get("total_tokens", 0)
+                    self.reasoning_tokens += (usage.get("output_token_details") or {}).get("reasoning", 0)
+
+    def on_chain_start(self, serialized: Optional[Dict[str, Any]], inputs: Any, *,
+                       tags: Optional[List[str]] = None, **kwargs: Any) -> None:
+        # Runnable.with_retry tags the runs of its attempts after the first one, nested runs inherit the tag
+        for tag in tags or []:
+            if tag.startswith(RETRY_ATTEMPT_TAG):
+                self.retries = max(self.retries, int(tag[len(RETRY_ATTEMPT_TAG):]) - 1)
+
+    def on_retry(self, retry_state: Any, **kwargs: Any) -> Any:
+        # retries made with the LangChain retry decorator of the LLM integrations
+        self.retries += 1
+
+
+# every LangChain run started while a collector is set reports to it (inherited by the nested runs)
+_current_collector: ContextVar[Optional[_UsageCollector]] = ContextVar("llm_usage_collector", default=None)
+register_configure_hook(_current_collector, inheritable=True)
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of sorted values (0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class LLMTelemetry:
+    """Metrics sink of the LLM calls: JSONL file (optional) and in-memory aggregates for `summary`."""
+
+    def __init__(self, path: Optional[Path] = None, input_token_cost: Optional[float] = None,
+                 output_token_cost: Optional[float] = None):
+        """
+        :param path: JSON lines file the calls are appended to, None to keep only the summary
+        :param input_token_cost: price of one million prompt tokens
+        :param output_token_cost: price of one million completion tokens (reasoning tokens included)
+        """
+        self.path = path
+        self.input_token_cost = input_token_cost
+        self.output_token_cost = output_token_cost
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = path.open("a", encoding="utf-8")
+        # aggregates
+        self._calls: Dict[str, int] = {}
+        self._failures = 0
+        self._retries = 0
+        self._totals = {"prompt_tokens": 0, "completion_tokens": 0, "reasoning_tokens": 0, "total_tokens": 0}
+        self._cost = 0.0
+        self._latencies_ms = array("d")
+        self._prompt_tokens = array("q")
+        self._models: Dict[str, int] = {}
+        # largest prompts, as (prompt_tokens, prompt_chars, doc_id), sorted descending
+        self._top_prompts: List[Tuple[int, int, str]] = []
+
+    def _cost_of(self, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        if self.input_token_cost is None and self.output_token_cost is None:
+            return None
+        return (prompt_tokens * (self.input_token_cost or 0.0)
+                + completion_tokens * (self.output_token_cost or 0.0)) / 1_000_000
+
+    @contextmanager
+    def track(self, operation: str, doc_id: str, prompt_chars: int) -> Iterator[None]:
+        """Record the LLM call(s) made inside the block as one call; exceptions are recorded and re-raised."""
+        collector = _UsageCollector()
+        token = _current_collector.set(collector)
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_collector.reset(token)
+            self.record(LLMCallMetrics(
+                timestamp=datetime.now(timezone.utc).isoformat(),
+                operation=operation,
+                doc_id=doc_id,
+                model=collector.model,
+                prompt_chars=prompt_chars,
+                prompt_tokens=collector.prompt_tokens,
+                completion_tokens=collector.completion_tokens,
+                reasoning_tokens=collector.reasoning_tokens,
+                total_tokens=collector.total_tokens,
+                latency_ms=round((time.perf_counter() - start) * 1000, 3),
+                retries=collector.retries,
+                success=error is None,
+                error=None if error is None else f"{type(error).__name__}: {error}",
+                cost=self._cost_of(collector.prompt_tokens, collector.completion_tokens),
+            ))
+
+    def record(self, metrics: LLMCallMetrics) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.write(metrics.model_dump_json() + "\n")
+                self._file.flush()
+            self._calls[metrics.operation] = self._calls.get(metrics.operation, 0) + 1
+            self._failures += not metrics.success
+            self._retries += metrics.retries
+            for name in self._totals:
+                self._totals[name] += getattr(metrics, name)
+            self._cost += metrics.cost or 0.0
+            self._latencies_ms.append(metrics.latency_ms)
+            self._prompt_tokens.append(metrics.prompt_tokens)
+            if metrics.model is not None:
+                self._models[metrics.model] = self._models.get(metrics.model, 0) + 1
+            prompt = (metrics.prompt_tokens, metrics.prompt_chars, metrics.doc_id)
+            if len(self._top_prompts) < TOP_PROMPT_DOCUMENTS or prompt > self._top_prompts[-1]:
+                self._top_prompts = sorted(self._top_prompts + [prompt], reverse=True)[:TOP_PROMPT_DOCUMENTS]
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals and percentiles of the calls recorded so far."""
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            prompt_tokens = sorted(self._prompt_tokens)
+            calls = sum(self._calls.values())
+            return {
+                "calls": calls,
+                "calls_by_operation": dict(self._calls),
+                "failures": self._failures,
+                "retries": self._retries,
+                "models": dict(self._models),
+                **self._totals,
+                "cost": None if self._cost_of(0, 0) is None else round(self._cost, 6),
+                "cost_per_call": None if self._cost_of(0, 0) is None or not calls else round(self._cost / calls, 6),
+                "latency_ms": {f"p{p}": percentile(latencies, p) for p in PERCENTILES}
+                | {"max": latencies[-1] if latencies else 0.0},
+                "prompt_tokens_per_call": {f"p{p}": percentile(prompt_tokens, p) for p in PERCENTILES}
+                | {"max": prompt_tokens[-1] if prompt_tokens else 0},
+                "largest_prompts": [{"doc_id": doc_id, "prompt_tokens": tokens, "prompt_chars": chars}
+                                    for tokens, chars, doc_id in self._top_prompts],
+            }
+
+    def log_summary(self) -> None:
+        summary = self.summary()
+        if not summary["calls"]:
+            return
+        log.info(f"LLM calls summary: {json.dumps(summary)}")
+        if self.path is not None:
+            log.info(f"LLM calls metrics are saved into: {self.path}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -9,12 +9,15 @@ from llm_search_quality_evaluation.shared.utils import _to_string
 import argparse
 # -------------------------------------------------------------
 
-from typing import List
+from typing import Dict, List, Optional
 from logging import Logger, getLogger
 
 # project imports
 from llm_search_quality_evaluation.shared.logger import setup_logging
-from llm_search_quality_evaluation.dataset_generator.llm import LLMConfig, LLMService, LLMServiceFactory
+from llm_search_quality_evaluation.dataset_generator.llm import (
+    DocumentPromptFormatter, LLMConfig, LLMService, LLMServiceFactory, LLMTelemetry
+)
+from llm_search_quality_evaluation.dataset_generator.llm.document_prompt import CHARS_PER_TOKEN
 from llm_search_quality_evaluation.shared.models import Document, Query
 from llm_search_quality_evaluation.shared.writers import WriterFactory, AbstractWriter, WriterConfig
 from llm_search_quality_evaluation.shared.search_engines import SearchEngineFactory, BaseSearchEngine
@@ -23,9 +26,14 @@ from llm_search_quality_evaluation.shared.utils import join_fields_as_text
 
 from llm_search_quality_evaluation.dataset_generator.models import LLMQueryResponse, LLMScoreResponse
 from llm_search_quality_evaluation.dataset_generator.config import Config
+from llm_search_quality_evaluation.dataset_generator.budget import (
+    JudgmentBudget, candidate_pairs, log_projection, plan_pairs, project_llm_calls
+)
 
 log: Logger = getLogger(__name__)
 
+GENERATED_QUERY_EXPLANATION = "Default max rating is assigned because the query is generated by the document"
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description='Parse arguments for CLI.')
@@ -52,8 +60,9 @@ def add_user_queries(config: Config, data_store: DataStore) -> None:
 
 
 def generate_and_add_queries(config: Config, data_store: DataStore, llm_service: LLMService,
-                             search_engine: BaseSearchEngine) -> None:
+                             search_engine: BaseSearchEngine, budget: Optional[JudgmentBudget] = None) -> None:
     """Retrieve docs and generate queries with LLM Service. Adds docs, queries and ratings to the datastore."""
+    log_projection(config, project_llm_calls(config, data_store), budget or JudgmentBudget())
     docs_to_generate_queries: List[Document] = search_engine.fetch_for_query_generation(
         documents_filter=config.documents_filter,
         number_of_docs=config.number_of_docs,
@@ -64,7 +73,7 @@ def generate_and_add_queries(config: Config, data_store: DataStore, llm_service:
         doc.is_used_to_generate_queries = True
         data_store.add_document(doc)
 
-    remaining = max(0, config.num_queries_needed - len(data_store.get_queries()))
+    remaining = max(0, config.num_queries_needed - data_store.num_queries())
     if remaining == 0:
         return
 
@@ -74,15 +83,17 @@ def generate_and_add_queries(config: Config, data_store: DataStore, llm_service:
     log.debug(f"Number of queries per document: {num_queries_per_doc}")
 
     for doc in docs_to_generate_queries:
+        if budget is not None and not budget.spend():
+            log.warning("LLM calls budget exhausted during query generation")
+            return
         query_response: LLMQueryResponse = llm_service.generate_queries(doc, num_queries_per_doc,
                                                                         config.max_query_terms)
         for query_ in query_response.get_queries():
-            if len(data_store.get_queries()) >= config.num_queries_needed:
+            if data_store.num_queries() >= config.num_queries_needed:
                 return
             query_obj: Query = data_store.add_query(query_)
             data_store.create_rating_score(
-                query_obj.id, doc.id, max(config.relevance_label_set),
-                "Default max rating is assigned because the query is generated by the document"
+                query_obj.id, doc.id, max(config.relevance_label_set), GENERATED_QUERY_EXPLANATION
             )
 
 
@@ -91,14 +102,18 @@ def add_cartesian_product_scores(config: Config, data_store: DataStore, llm_serv
     log.debug("Cartesian product is enabled, so adding cartesian product scores")
     for query_obj in data_store.get_queries():
         for doc_obj in data_store.get_cartesian_prod_docs():
-            if not data_store.has_rating_score(query_obj.id, doc_obj.id):
-                score_resp: LLMScoreResponse = llm_service.generate_score(
-                    doc_obj, query_obj.text, config.relevance_scale, config.save_llm_explanation
-                )
-                data_store.create_rating_score(
-                    query_obj.id, doc_obj.id, score_resp.get_score(),
-                    score_resp.explanation if config.save_llm_explanation else None
-                )
+            # reserved pairs are scored once, even by concurrent producers
+            if data_store.reserve_rating(query_obj.id, doc_obj.id):
+                try:
+                    score_resp: LLMScoreResponse = llm_service.generate_score(
+                        doc_obj, query_obj.text, config.relevance_scale, config.save_llm_explanation
+                    )
+                    data_store.create_rating_score(
+                        query_obj.id, doc_obj.id, score_resp.get_score(),
+                        score_resp.explanation if config.save_llm_explanation else None
+                    )
+                finally:
+                    data_store.release_rating(query_obj.id, doc_obj.id)
 
 
 def expand_docset_with_search_engine_top_k(config: Config, data_store: DataStore,
@@ -112,17 +127,94 @@ def expand_docset_with_search_engine_top_k(config: Config, data_store: DataStore
             )
             for doc_obj in docs_eval:
                 data_store.add_document(doc_obj)
-                if not data_store.has_rating_score(query_obj.id, doc_obj.id):
-                    score_resp: LLMScoreResponse = llm_service.generate_score(
-                        doc_obj, query_obj.text, config.relevance_scale, config.save_llm_explanation
-                    )
-                    data_store.create_rating_score(
-                        query_obj.id, doc_obj.id, score_resp.score,
-                        score_resp.explanation if config.save_llm_explanation else None
-                    )
+                if data_store.reserve_rating(query_obj.id, doc_obj.id):
+                    try:
+                        score_resp: LLMScoreResponse = llm_service.generate_score(
+                            doc_obj, query_obj.text, config.relevance_scale, config.save_llm_explanation
+                        )
+                        data_store.create_rating_score(
+                            query_obj.id, doc_obj.id, score_resp.score,
+                            score_resp.explanation if config.save_llm_explanation else None
+                        )
+                    finally:
+                        data_store.release_rating(query_obj.id, doc_obj.id)
+    else:
+        log.warning("Query template not found. Skipping retrieval.")
+
+
+def score_within_budget(config: Config, data_store: DataStore, llm_service: LLMService,
+                        search_engine: BaseSearchEngine, budget: JudgmentBudget) -> None:
+    """Score the (query, doc) pairs chosen by the budget planner, instead of all the cartesian and top-k pairs."""
+    top_k: Dict[str, List[Document]] = {}
+    if config.query_template is not None:
+        for query_obj in data_store.get_queries():
+            docs_eval: List[Document] = search_engine.fetch_for_evaluation(
+                keyword=query_obj.text, query_template=config.query_template, doc_fields=config.doc_fields
+            )
+            for doc_obj in docs_eval:
+                data_store.add_document(doc_obj)
+            top_k[query_obj.id] = docs_eval
     else:
         log.warning("Query template not found. Skipping retrieval.")
 
+    candidates = candidate_pairs(config, data_store, top_k)
+    planned = plan_pairs(candidates, budget.remaining)
+    message = (f"Scoring {len(planned)} of {sum(len(docs) for _, docs in candidates)} candidate pairs, "
+               f"{budget.remaining} LLM calls left in the budget")
+    if config.llm_cost_per_call is not None:
+        message += f", projected cost {len(planned) * config.llm_cost_per_call:.4f}"
+    log.info(message)
+
+    for query_obj, doc_obj in planned:
+        if data_store.reserve_rating(query_obj.id, doc_obj.id):
+            try:
+                if not budget.spend():
+                    break
+                score_resp: LLMScoreResponse = llm_service.generate_score(
+                    doc_obj, query_obj.text, config.relevance_scale, config.save_llm_explanation
+                )
+                data_store.create_rating_score(
+                    query_obj.id, doc_obj.id, score_resp.get_score(),
+                    score_resp.explanation if config.save_llm_explanation else None
+                )
+            finally:
+                data_store.release_rating(query_obj.id, doc_obj.id)
+    log.info(f"LLM calls used: {budget.used} of {budget.limit}")
+
+
+def build_data_store(config: Config) -> DataStore:
+    return DataStore(
+        autosave_every_n_updates=config.datastore_autosave_every_n_updates,
+        storage_format=config.datastore_format,
+        background_autosave=config.datastore_background_autosave,
+        near_duplicate_threshold=config.query_near_duplicate_threshold
+    )
+
+
+def build_telemetry(config: Config, worker_id: Optional[str] = None) -> LLMTelemetry:
+    """LLM calls telemetry; every worker of a distributed run writes its own metrics file."""
+    path = config.llm_metrics_destination
+    if path is not None and worker_id is not None:
+        path = path.with_name(f"{path.stem}-{worker_id}{path.suffix}")
+    return LLMTelemetry(path, config.llm_input_token_cost, config.llm_output_token_cost)
+
+
+def build_document_formatter(config: Config) -> DocumentPromptFormatter:
+    """Document JSON of the prompts, within the smallest of the character and token budgets."""
+    budgets = []
+    if config.doc_field_max_chars is not None:
+        budgets.append(config.doc_field_max_chars)
+    if config.doc_field_max_tokens is not None:
+        budgets.append(config.doc_field_max_tokens * CHARS_PER_TOKEN)
+    return DocumentPromptFormatter(min(budgets) if budgets else None, config.doc_field_max_chars_by_field)
+
+
+def build_search_engine(config: Config) -> BaseSearchEngine:
+    return SearchEngineFactory.build(
+        search_engine_type=config.search_engine_type,
+        endpoint=config.search_engine_collection_endpoint
+    )
+
 
 def main() -> None:
     # configuration and logger definition
@@ -132,31 +224,43 @@ def main() -> None:
     setup_logging(args.verbose)
 
     # setup
-    data_store: DataStore = DataStore(
-        autosave_every_n_updates=config.datastore_autosave_every_n_updates
-    )
-    search_engine: BaseSearchEngine = SearchEngineFactory.build(
-        search_engine_type=config.search_engine_type,
-        endpoint=config.search_engine_collection_endpoint
-    )
-    llm: LazyLLM = LLMServiceFactory.build_lazy(LLMConfig.load(config.llm_configuration_file))
-    service: LLMService = LLMService(chat_model=llm)
+    data_store: DataStore = build_data_store(config)
+    search_engine: BaseSearchEngine = build_search_engine(config)
+    llm_config: LLMConfig = LLMConfig.load(config.llm_configuration_file)
+    llm: LazyLLM = LLMServiceFactory.build_lazy(llm_config)
+    telemetry: LLMTelemetry = build_telemetry(config)
+    service: LLMService = LLMService(chat_model=llm, telemetry=telemetry,
+                                     document_formatter=build_document_formatter(config),
+                                     max_retries=llm_config.max_retries)
     writer: AbstractWriter = WriterFactory.build(writer_config)
+    budget: JudgmentBudget = JudgmentBudget.from_config(config)
 
     # load user queries
     add_user_queries(config, data_store)
 
     # generate more queries with LLM service if needed
-    generate_and_add_queries(config, data_store, service, search_engine)
+    generate_and_add_queries(config, data_store, service, search_engine, budget)
+
+    if budget.limit is not None:
+        # score the pairs chosen by the planner until the budget is exhausted
+        score_within_budget(config, data_store, service, search_engine, budget)
+    else:
+        # score initial docset
+        if config.enable_cartesian_product:
+            add_cartesian_product_scores(config, data_store, service)
+
+        # expand the docset with search engine topK (adding direct ratings)
+        expand_docset_with_search_engine_top_k(config, data_store, service, search_engine)
 
-    # score initial docset
-    if config.enable_cartesian_product:
-        add_cartesian_product_scores(config, data_store, service)
+    write_outputs(config, data_store, writer, search_engine)
+    telemetry.log_summary()
+    telemetry.close()
+    service.document_formatter.log_report()
 
-    # expand the docset with search engine topK (adding direct ratings)
-    expand_docset_with_search_engine_top_k(config, data_store, service, search_engine)
 
-    # write results
+def write_outputs(config: Config, data_store: DataStore, writer: AbstractWriter,
+                  search_engine: BaseSearchEngine) -> None:
+    """Save the datastore and write the dataset (and the explanations, if enabled)."""
     output_destination = config.output_destination
     log.info(f"Synthetic Dataset has been generated in: {output_destination}")
     data_store.save()
@@ -0,0 +1,232 @@
+"""
+SQLite work queue with leases, shared by the coordinator and the workers of a distributed dataset generation.
+
+- A task has a kind, a unique key (enqueueing the same key twice is a no-op, so a restarted coordinator does not
+  duplicate work) and a JSON payload; a done task keeps its JSON result.
+- Workers lease pending tasks for `lease_seconds`. A task whose lease expired (crashed or stuck worker) is leased
+  again by the next worker; a late result of the expired lease is ignored.
+- A failed task, or one whose lease expired, goes back to pending until it reaches `max_attempts`, then it is marked
+  failed.
+- Documents referenced by many tasks are stored once, in their own table, instead of in every payload.
+
+Every process opens its own connection. The default rollback journal works on any filesystem with POSIX locks
+(e.g. a shared volume for workers on several nodes); lease times use the wall clock, so the nodes clocks must agree
+within a small fraction of `lease_seconds`.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BUSY_TIMEOUT_SECONDS = 60.0
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires);
+CREATE TABLE IF NOT EXISTS documents (id TEXT PRIMARY KEY, body TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+class Task(NamedTuple):
+    id: int
+    kind: str
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    def __init__(self, path: Path, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        if lease_seconds <= 0 or max_attempts < 1:
+            log.error(f"Invalid work queue settings lease_seconds={lease_seconds} max_attempts={max_attempts}")
+            raise ValueError("lease_seconds must be > 0 and max_attempts >= 1")
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # connections must not cross a fork: every process opens its own
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=DEFAULT_BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            self._connection.executescript(_SCHEMA)
+            self._pid = os.getpid()
+        return self._connection
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """Takes the database write lock upfront, so concurrent read-then-update sequences cannot interleave."""
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, tasks: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """Add (kind, key, payload) tasks, skipping already known keys; returns the number of new tasks."""
+        with self._write_transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO tasks (kind, key, payload) VALUES (?, ?, ?)",
+                ((kind, key, json.dumps(payload, ensure_ascii=False)) for kind, key, payload in tasks),
+            )
+            return connection.total_changes - before
+
+    def add_documents(self, documents: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Store (id, body) documents for the tasks to reference; a known id keeps its first body."""
+        with self._write_transaction() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO documents (id, body) VALUES (?, ?)",
+                ((doc_id, json.dumps(body, ensure_ascii=False)) for doc_id, body in documents),
+            )
+
+    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        row = self.connection.execute("SELECT body FROM documents WHERE id = ?", (doc_id,)).fetchone()
+        return None if row is None else dict(json.loads(row[0]))
+
+    def _fail_expired_leases(self, connection: sqlite3.Connection, now: float) -> None:
+        """Mark failed the expired leases of tasks that already had `max_attempts` attempts."""
+        expired = connection.execute(
+            "SELECT id, kind, key, attempts FROM tasks WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (LEASED, now, self.max_attempts),
+        ).fetchall()
+        for task_id, kind, key, attempts in expired:
+            connection.execute(
+                "UPDATE tasks SET status = ?, error = ?, worker = NULL, lease_expires = NULL WHERE id = ?",
+                (FAILED, "lease expired", task_id),
+            )
+            log.error(f"[work_queue] task {kind}:{key} failed after {attempts} attempts: lease expired")
+
+    def lease(self, worker: str, limit: int = 1) -> List[Task]:
+        """Atomically lease up to `limit` pending (or expired) tasks to `worker`, oldest first."""
+        now = time.time()
+        with self._write_transaction() as connection:
+            self._fail_expired_leases(connection, now)
+            rows = connection.execute(
+                "SELECT id, kind, key, payload, attempts FROM tasks "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) ORDER BY id LIMIT ?",
+                (PENDING, LEASED, now, limit),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                ((LEASED, worker, now + self.lease_seconds, row[0]) for row in rows),
+            )
+        return [Task(task_id, kind, key, json.loads(payload), attempts + 1)
+                for task_id, kind, key, payload, attempts in rows]
+
+    def complete(self, task: Task, worker: str, result: Dict[str, Any]) -> bool:
+        """Store the result of a task leased by `worker`; False (result dropped) if the lease was lost."""
+        cursor = self.connection.execute(
+            "UPDATE tasks SET status = ?, result = ?, lease_expires = NULL WHERE id = ? AND status = ? AND worker = ?",
+            (DONE, json.dumps(result, ensure_ascii=False), task.id, LEASED, worker),
+        )
+        if cursor.rowcount == 0:
+            log.warning(f"[work_queue] lease lost task={task.kind}:{task.key} worker={worker}, result dropped")
+        return cursor.rowcount == 1
+
+    def fail(self, task: Task, worker: str, error: str) -> None:
+        """Release a task leased by `worker` after an error: pending again, or failed after max_attempts."""
+        status = FAILED if task.attempts >= self.max_attempts else PENDING
+        self.connection.execute(
+            "UPDATE tasks SET status = ?, error = ?, worker = NULL, lease_expires = NULL "
+            "WHERE id = ? AND status = ? AND worker = ?",
+            (status, error, task.id, LEASED, worker),
+        )
+        if status == FAILED:
+            log.error(f"[work_queue] task {task.kind}:{task.key} failed after {task.attempts} attempts: {error}")
+
+    def counts(self, kind: Optional[str] = None) -> Dict[str, int]:
+        """Number of tasks by status (expired leases count as pending, or as failed after max_attempts)."""
+        now = time.time()
+        sql = ("SELECT CASE WHEN status = ? AND lease_expires < ? THEN (CASE WHEN attempts >= ? THEN ? ELSE ? END) "
+               "ELSE status END, COUNT(*) FROM tasks"
+               + (" WHERE kind = ?" if kind is not None else "") + " GROUP BY 1")
+        params: Tuple[Any, ...] = ((LEASED, now, self.max_attempts, FAILED, PENDING)
+                                   + ((kind,) if kind is not None else ()))
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(self.connection.execute(sql, params).fetchall()))
+        return counts
+
+    def results(self, kind: str, keys: Optional[Collection[str]] = None
+                ) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """(key, payload, result) of the done tasks of `kind` (only those of `keys`, if given), in enqueue order."""
+        rows = self.connection.execute(
+            "SELECT key, payload, result FROM tasks WHERE kind = ? AND status = ? ORDER BY id", (kind, DONE)
+        )
+        for key, payload, result in rows:
+            if keys is None or key in keys:
+                yield key, json.loads(payload), json.loads(result)
+
+    def wait_until_drained(self, kind: Optional[str] = None, poll_seconds: float = 1.0,
+                           timeout_seconds: Optional[float] = None) -> Dict[str, int]:
+        """Block until no task (of `kind`) is pending or leased; returns the final counts."""
+        deadline = None if timeout_seconds is None else time.monotonic() + timeout_seconds
+        last_log = 0.0
+        while True:
+            counts = self.counts(kind)
+            if counts[PENDING] == 0 and counts[LEASED] == 0:
+                return counts
+            if deadline is not None and time.monotonic() > deadline:
+                log.error(f"[work_queue] timeout waiting for the workers, counts={counts}")
+                raise TimeoutError(f"Work queue {self.path} not drained: {counts}")
+            if time.monotonic() - last_log > 30:
+                log.info(f"[work_queue] waiting for the workers: {counts}")
+                last_log = time.monotonic()
+            time.sleep(poll_seconds)
+
+    def open_queue(self) -> None:
+        """Tell the workers more tasks may be enqueued: they wait for them when the queue is empty."""
+        self.connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('closed', '0')")
+
+    def close_queue(self) -> None:
+        """Tell the workers no more tasks will be enqueued: they exit once the queue is empty."""
+        self.connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('closed', '1')")
+
+    def is_closed(self) -> bool:
+        row = self.connection.execute("SELECT value FROM meta WHERE name = 'closed'").fetchone()
+        return row is not None and row[0] == "1"
+
+    def close(self) -> None:
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+import gc
+import threading
+from array import array
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Optional, Tuple, List
+from typing import Any, Dict, Iterator, Generator, Mapping, NamedTuple, Optional, Set, Tuple, List, TypeGuard
 
 import json
 import logging
-from uuid import uuid4
 from pydantic import ValidationError
+from llm_search_quality_evaluation.shared.data_store_format import (
+    JSON_FORMAT, Records, check_format, detect_format, read_records, write_records
+)
 from llm_search_quality_evaluation.shared.models.document import Document
 from llm_search_quality_evaluation.shared.models.query import Query
 from llm_search_quality_evaluation.shared.models.rating import Rating
+from llm_search_quality_evaluation.shared.near_duplicates import NearDuplicateIndex
 from llm_search_quality_evaluation.shared.utils import clean_text
 
 log = logging.getLogger(__name__)
@@ -17,32 +26,203 @@ log = logging.getLogger(__name__)
 TMP_FILE = Path("resources/tmp/datastore.json")
 ENCODING = "utf-8"
 
+# a (query, doc) pair is packed in a single int: query row in the high bits, doc row in the low bits
+_PAIR_SHIFT = 32
+_PAIR_MASK = (1 << _PAIR_SHIFT) - 1
+
+def _is_id(value: Any) -> TypeGuard[str]:
+    return isinstance(value, str) and value != ""
+
+
+def _trusted_document(record: Any) -> Optional[Document]:
+    """Document of a saved record with the expected types, None if it needs pydantic validation."""
+    if not isinstance(record, dict):
+        return None
+    doc_id, fields = record.get("id"), record.get("fields")
+    flag = record.get("is_used_to_generate_queries", False)
+    if not _is_id(doc_id) or not isinstance(fields, dict) or not fields or "" in fields or not isinstance(flag, bool):
+        return None
+    return Document.model_construct(id=doc_id, fields=fields, is_used_to_generate_queries=flag)
+
+
+def _trusted_query(record: Any) -> Optional[Tuple[str, str]]:
+    """(id, text) of a saved query record with the expected types, None if it needs pydantic validation."""
+    if not isinstance(record, dict):
+        return None
+    query_id, text = record.get("id"), record.get("text")
+    if not _is_id(query_id) or not _is_id(text):
+        return None
+    return query_id, text
+
+
+def _trusted_rating(record: Any) -> Optional[Tuple[str, str, int, Optional[str]]]:
+    """(query_id, doc_id, score, explanation) of a saved rating record with the expected types, None if it needs
+    pydantic validation."""
+    # hot loop of the load: exact type checks, no helper calls
+    try:
+        query_id, doc_id, score = record["query_id"], record["doc_id"], record["score"]
+        explanation = record.get("explanation")
+    except (KeyError, TypeError, AttributeError):
+        return None
+    if (type(query_id) is str and query_id and type(doc_id) is str and doc_id and type(score) is int and score >= 0
+            and (explanation is None or type(explanation) is str)):
+        return query_id, doc_id, score, explanation
+    return None
+
+
+@contextmanager
+def _gc_paused() -> Generator[None, None, None]:
+    """Pause the cyclic GC while building many (acyclic) objects: its passes would dominate the allocation time."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+class _Snapshot(NamedTuple):
+    """Point-in-time copy of the store columns, written to disk while the store keeps changing.
+
+    Lists and arrays are shallow copies (pointer/memcpy copies, a few ms for millions of rows). Explanations are
+    shared with the store: rows are appended, and only rewritten (replace_rating_score) once no save is in flight,
+    so the first `len(scores)` rows are stable.
+    """
+    docs: List[Document]
+    query_ids: List[str]
+    query_texts: List[str]
+    doc_ids: List[str]
+    pairs: array
+    scores: array
+    explanations: Dict[int, str]
+
+    def records(self) -> Records:
+        doc_ids, query_ids, explanations = self.doc_ids, self.query_ids, self.explanations
+        return {
+            "docs": (d.model_dump() for d in self.docs),
+            "queries": ({"id": query_id, "text": text} for query_id, text in zip(query_ids, self.query_texts)),
+            "ratings": (
+                {
+                    "doc_id": doc_ids[key & _PAIR_MASK],
+                    "query_id": query_ids[key >> _PAIR_SHIFT],
+                    "score": score,
+                    "explanation": explanations.get(row),
+                }
+                for row, (key, score) in enumerate(zip(self.pairs, self.scores))
+            ),
+        }
+
+
+class _RatingsByPair(Mapping[Tuple[str, str], Rating]):
+    """Read-only (query_id, doc_id) → Rating view of the rating columns; Ratings are built on access."""
+
+    def __init__(self, store: DataStore):
+        self._store = store
+
+    def __getitem__(self, pair: Tuple[str, str]) -> Rating:
+        row = self._store._rating_row_of(*pair)
+        if row is None:
+            raise KeyError(pair)
+        return self._store._rating_at(row)
+
+    def __contains__(self, pair: object) -> bool:
+        return isinstance(pair, tuple) and len(pair) == 2 and self._store._rating_row_of(*pair) is not None
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        store = self._store
+        for key in store._rating_pairs:
+            yield store._query_ids[key >> _PAIR_SHIFT], store._doc_ids[key & _PAIR_MASK]
+
+    def __len__(self) -> int:
+        return len(self._store._rating_pairs)
+
+
+class _QueryIdByText(Mapping[str, str]):
+    """Read-only clean_text(query_text) → query_id view."""
+
+    def __init__(self, store: DataStore):
+        self._store = store
+
+    def __getitem__(self, key: str) -> str:
+        return self._store._query_ids[self._store._query_row_by_key[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store._query_row_by_key)
+
+    def __len__(self) -> int:
+        return len(self._store._query_row_by_key)
+
 
 class DataStore:
     """In-memory store for documents, queries, and ratings with O(1) indices.
 
+    Queries and ratings are stored in compact form: query and doc ids are interned to int rows, a rating is a
+    packed 64-bit (query row, doc row) key plus a score in array columns, explanations live in a side table.
+    `Query`/`Rating` objects are only built at the API boundaries (getters, `rating_by_pair` view).
+
+    Thread safety: mutators, bulk getters and persistence hold a single re-entrant store lock (every operation
+    under it is O(1), or a snapshot copy); single lookups are plain dict reads. Concurrent producers claim a pair
+    with `reserve_rating` before paying for its judgment.
+
+    Queries are deduplicated on their `clean_text`; with a `near_duplicate_threshold`, a query whose text is similar
+    enough to a stored one (see near_duplicates) is suppressed too, so its row of ratings is never paid for.
+
     Invariants:
     - A (query_id, doc_id) pair is unique within `rating_by_pair`.
-    - `has_rating_score` is True only if a `Rating` object exists for the pair (query_id, document_id).
+    - `has_rating_score` is True only if a rating exists for the pair (query_id, document_id).
+    - A pair is reserved by at most one caller at a time, and never once it is rated.
     """
 
-    def __init__(self, path: Path = TMP_FILE, ignore_saved_data: bool = False, autosave_every_n_updates: Optional[int] = None):
+    def __init__(self, path: Path = TMP_FILE, ignore_saved_data: bool = False, autosave_every_n_updates: Optional[int] = None,
+                 storage_format: Optional[str] = None, background_autosave: bool = False,
+                 near_duplicate_threshold: Optional[float] = None):
         self.path = path
+        # On-disk format used by save (see data_store_format); None keeps the format of the loaded file
+        if storage_format is not None:
+            check_format(storage_format)
+        self.storage_format: Optional[str] = storage_format
         # Autosave configuration: when >0, save to disk every N successful mutations
         self._autosave_every_n_updates: Optional[int] = (
             autosave_every_n_updates if isinstance(autosave_every_n_updates, int) and autosave_every_n_updates > 0 else None
         )
         self._updates_since_last_save: int = 0
+        self._lock = threading.RLock()
+        # (query_id, doc_id) pairs being scored by some caller, see reserve_rating
+        self._reserved_pairs: Set[Tuple[str, str]] = set()
+        # Background autosave: a snapshot is written by a single saver thread, at most one save in flight
+        self._background_autosave = background_autosave
+        self._saver: Optional[ThreadPoolExecutor] = None
+        self._pending_save: Optional[Future] = None
+        self._pending_save_updates: int = 0
 
         # Primary (id → object)
         self.docs: Dict[str, Document] = {}
-        self.queries: Dict[str, Query] = {}
-
-        # Ratings storage
-        self.rating_by_pair: Dict[Tuple[str, str], Rating] = {}    # (query_id, doc_id) → Rating 
 
+        # Queries columns, by query row
+        self._query_ids: List[str] = []
+        self._query_texts: List[str] = []
+        self._query_row: Dict[str, int] = {}                       # query_id → query row
         # Text based deduplication for queries
-        self.query_text_to_query_id: Dict[str, str] = {}           # query_text → query_id 
+        self._query_row_by_key: Dict[str, int] = {}                # clean_text(query_text) → query row
+        # Optional near-duplicate suppression: query rows indexed by text similarity
+        self._near_duplicates: Optional[NearDuplicateIndex] = (
+            NearDuplicateIndex(near_duplicate_threshold) if near_duplicate_threshold is not None else None
+        )
+        # Counters of the suppressed inserts (duplicated_queries, near_duplicate_queries)
+        self.stats: Counter[str] = Counter()
+
+        # Ratings columns, by rating row
+        self._doc_ids: List[str] = []                              # interned ids of the rated docs
+        self._doc_row: Dict[str, int] = {}                         # doc_id → doc row
+        self._rating_row: Dict[int, int] = {}                      # pair key → rating row
+        self._rating_pairs: array = array("q")                     # pair keys
+        self._rating_scores: array = array("q")
+        self._explanations: Dict[int, str] = {}                    # rating row → explanation, when given
+
+        # Read-only views kept for compatibility
+        self.rating_by_pair: Mapping[Tuple[str, str], Rating] = _RatingsByPair(self)
+        self.query_text_to_query_id: Mapping[str, str] = _QueryIdByText(self)
 
         if not ignore_saved_data:
             log.info(f"Loading data from {path}")
@@ -57,11 +237,18 @@ class DataStore:
 
     def has_query(self, query_id: str) -> bool:
         """Checks for query existence."""
-        return query_id in self.queries
+        return query_id in self._query_row
 
     def has_rating_score(self, query_id: str, doc_id: str) -> bool:
         """Checks for a rating by (query, doc) pair."""
-        return (query_id, doc_id) in self.rating_by_pair
+        return self._rating_row_of(query_id, doc_id) is not None
+
+    def _rating_row_of(self, query_id: str, doc_id: str) -> Optional[int]:
+        query_row = self._query_row.get(query_id)
+        doc_row = self._doc_row.get(doc_id)
+        if query_row is None or doc_row is None:
+            return None
+        return self._rating_row.get(query_row << _PAIR_SHIFT | doc_row)
 
     # ────────────────────────────────────────────
     # Getters
@@ -72,23 +259,49 @@ class DataStore:
 
     def get_documents(self) -> List[Document]:
         """Gets all documents."""
-        return list(self.docs.values())
+        with self._lock:
+            return list(self.docs.values())
 
     def get_cartesian_prod_docs(self) -> List[Document]:
         """Gets only documents used to generate queries."""
-        return [doc for doc in self.docs.values() if doc.is_used_to_generate_queries]
+        with self._lock:
+            return [doc for doc in self.docs.values() if doc.is_used_to_generate_queries]
 
     def get_query(self, query_id: str) -> Optional[Query]:
         """Gets a single query by its ID, or None if not found."""
-        return self.queries.get(query_id)
+        row = self._query_row.get(query_id)
+        return None if row is None else self._query_at(row)
 
     def get_queries(self) -> List[Query]:
         """Gets all queries."""
-        return list(self.queries.values())
+        with self._lock, _gc_paused():
+            return [self._query_at(row) for row in range(len(self._query_ids))]
 
     def get_ratings(self) -> List[Rating]:
         """Gets all ratings."""
-        return list(self.rating_by_pair.values())
+        with self._lock, _gc_paused():
+            return [self._rating_at(row) for row in range(len(self._rating_pairs))]
+
+    def num_queries(self) -> int:
+        """Number of queries, without building them."""
+        return len(self._query_ids)
+
+    def num_ratings(self) -> int:
+        """Number of ratings, without building them."""
+        return len(self._rating_pairs)
+
+    def _query_at(self, row: int) -> Query:
+        # stored values were validated when the query was added
+        return Query.model_construct(id=self._query_ids[row], text=self._query_texts[row])
+
+    def _rating_at(self, row: int) -> Rating:
+        key = self._rating_pairs[row]
+        return Rating.model_construct(
+            doc_id=self._doc_ids[key & _PAIR_MASK],
+            query_id=self._query_ids[key >> _PAIR_SHIFT],
+            score=self._rating_scores[row],
+            explanation=self._explanations.get(row),
+        )
 
 
     # ────────────────────────────────────────────
@@ -96,63 +309,139 @@ class DataStore:
     # ────────────────────────────────────────────
     def add_document(self, doc: Document) -> None:
         """Adds a document."""
-        if self.has_document(doc.id):
-            log.debug(f"[add_document] exists doc_id={doc.id}")
-            return
-        self.docs[doc.id] = doc
-        log.debug(f"[add_document] added doc_id={doc.id}")
-        self._count_update_and_maybe_autosave()
+        with self._lock:
+            if self.has_document(doc.id):
+                log.debug(f"[add_document] exists doc_id={doc.id}")
+                return
+            self.docs[doc.id] = doc
+            log.debug(f"[add_document] added doc_id={doc.id}")
+            self._count_update_and_maybe_autosave()
 
     def add_query(self, query_text_str: str, query_id: Optional[str] = None) -> Query:
         """Adds a new query. If text is cached, returns existing Query. If id is given, it's used."""
         key = clean_text(query_text_str) # Apply general filtering
-        if existing_id := self.query_text_to_query_id.get(key):
-            log.debug(f"[add_query] exists text='{query_text_str}' key='{key}' existing_id={existing_id}")
-            query = self.queries[existing_id]
-        else:
+        # check-then-insert on the text key must be atomic
+        with self._lock:
+            existing_row = self._query_row_by_key.get(key)
+            if existing_row is not None:
+                log.debug(f"[add_query] exists text='{query_text_str}' key='{key}' "
+                          f"existing_id={self._query_ids[existing_row]}")
+                self.stats["duplicated_queries"] += 1
+                return self._query_at(existing_row)
+            if self._near_duplicates is not None:
+                similar_row = self._near_duplicates.find(key)
+                if isinstance(similar_row, int):
+                    log.info(f"[add_query] near_duplicate suppressed text='{query_text_str}' "
+                             f"existing_text='{self._query_texts[similar_row]}'")
+                    self.stats["near_duplicate_queries"] += 1
+                    return self._query_at(similar_row)
+
             query = Query(id=query_id, text=query_text_str) if query_id else Query(text=query_text_str)
-            self.queries[query.id] = query
-            self.query_text_to_query_id[key] = query.id
+            row = self._query_row.get(query.id)
+            if row is None:
+                row = len(self._query_ids)
+                self._query_ids.append(query.id)
+                self._query_texts.append(query.text)
+                self._query_row[query.id] = row
+            else:
+                # same id, new text: the id keeps its row (and its ratings)
+                self._query_texts[row] = query.text
+            self._query_row_by_key[key] = row
+            if self._near_duplicates is not None:
+                self._near_duplicates.add(row, key)
             log.debug(f"[add_query] added query_id={query.id}")
             self._count_update_and_maybe_autosave()
-
-        return query
+            return query
 
     def _add_rating(self, rating: Rating) -> None:
         """Adds a rating."""
-        if not self.has_query(rating.query_id):
-            log.warning(f"[add_rating] query_not_found query_id={rating.query_id}")
-            return
-        if not self.has_document(rating.doc_id):
-            log.warning(f"[add_rating] doc_not_found doc_id={rating.doc_id}")
-            return
-
-        key = (rating.query_id, rating.doc_id)
-        if key in self.rating_by_pair:
-            log.warning(f"[add_rating] exists q={rating.query_id} d={rating.doc_id}")
-            return
-
-        self.rating_by_pair[key] = rating 
-        log.debug(f"[add_rating] added q={rating.query_id} d={rating.doc_id}")
-        self._count_update_and_maybe_autosave()
+        with self._lock:
+            query_row = self._query_row.get(rating.query_id)
+            if query_row is None:
+                log.warning(f"[add_rating] query_not_found query_id={rating.query_id}")
+                return
+            if not self.has_document(rating.doc_id):
+                log.warning(f"[add_rating] doc_not_found doc_id={rating.doc_id}")
+                return
+
+            doc_row = self._doc_row.get(rating.doc_id)
+            if doc_row is None:
+                doc_row = self._doc_row[rating.doc_id] = len(self._doc_ids)
+                self._doc_ids.append(rating.doc_id)
+            key = query_row << _PAIR_SHIFT | doc_row
+            if key in self._rating_row:
+                log.warning(f"[add_rating] exists q={rating.query_id} d={rating.doc_id}")
+                return
+
+            row = len(self._rating_pairs)
+            self._rating_row[key] = row
+            self._rating_pairs.append(key)
+            self._rating_scores.append(rating.score)
+            if rating.explanation is not None:
+                self._explanations[row] = rating.explanation
+            log.debug(f"[add_rating] added q={rating.query_id} d={rating.doc_id}")
+            self._count_update_and_maybe_autosave()
 
     def create_rating_score(
         self, query_id: str, doc_id: str, score: int, explanation: Optional[str] = None
     ) -> Optional[Rating]:
-        """Create rating (if not exists) and add via `add_rating`."""
+        """Create rating (if not exists) and add via `add_rating`. Releases the pair reservation, if any."""
+        with self._lock:
+            self._reserved_pairs.discard((query_id, doc_id))
+            existing_row = self._rating_row_of(query_id, doc_id)
+            if existing_row is not None:
+                log.warning(f"[create_rating_score] existing q={query_id} d={doc_id}")
+                return self._rating_at(existing_row)
 
-        key = (query_id, doc_id)
-        if (existing_rating := self.rating_by_pair.get(key)):
-            log.warning(f"[create_rating_score] existing q={query_id} d={doc_id}")
-            return existing_rating
+            try:
+                rating = Rating(doc_id=doc_id, query_id=query_id, score=score, explanation=explanation)
+                self._add_rating(rating)
+                return rating
+            except ValidationError as e:
+                log.warning(f"[create_rating_score] validation_failed q={query_id} d={doc_id} score={score} error={e}")
+                return None
 
-        try:
-            rating = Rating(doc_id=doc_id, query_id=query_id, score=score, explanation=explanation)
-            self._add_rating(rating)
+    def replace_rating_score(
+        self, query_id: str, doc_id: str, score: int, explanation: Optional[str] = None
+    ) -> Optional[Rating]:
+        """Overwrite the score and explanation of an existing rating (created if missing)."""
+        with self._lock:
+            row = self._rating_row_of(query_id, doc_id)
+            if row is None:
+                return self.create_rating_score(query_id, doc_id, score, explanation)
+            try:
+                rating = Rating(doc_id=doc_id, query_id=query_id, score=score, explanation=explanation)
+            except ValidationError as e:
+                log.warning(f"[replace_rating_score] validation_failed q={query_id} d={doc_id} score={score} error={e}")
+                return None
+            # a snapshot in flight shares the explanations and expects its rows unchanged
+            self._wait_for_pending_save()
+            self._rating_scores[row] = rating.score
+            if rating.explanation is None:
+                self._explanations.pop(row, None)
+            else:
+                self._explanations[row] = rating.explanation
+            log.debug(f"[replace_rating_score] replaced q={query_id} d={doc_id}")
+            self._count_update_and_maybe_autosave()
             return rating
-        except ValidationError as e:
-            log.warning(f"[create_rating_score] validation_failed q={query_id} d={doc_id} score={score} error={e}")
-            return None
+
+    def reserve_rating(self, query_id: str, doc_id: str) -> bool:
+        """Atomically claim the (query, doc) pair for scoring.
+
+        True when the pair has no rating and no other reservation: the caller scores it, then calls
+        `create_rating_score` (which releases the reservation), or `release_rating` if the scoring failed.
+        """
+        pair = (query_id, doc_id)
+        with self._lock:
+            if pair in self._reserved_pairs or self._rating_row_of(query_id, doc_id) is not None:
+                return False
+            self._reserved_pairs.add(pair)
+            return True
+
+    def release_rating(self, query_id: str, doc_id: str) -> None:
+        """Drop the reservation of a pair (no-op if it is not reserved)."""
+        with self._lock:
+            self._reserved_pairs.discard((query_id, doc_id))
 
     # ────────────────────────────────────────────
     # Autosave helper
@@ -161,99 +450,238 @@ class DataStore:
         """Increment mutation counter and autosave if threshold reached.
         
         If autosave fails, the counter is not reset to allow retrying on next update.
+        With background autosave, the snapshot is written by the saver thread; if the previous save is still running,
+        the caller waits for it (back-pressure) before submitting the next one.
         """
         if self._autosave_every_n_updates is None:
             return
         
         self._updates_since_last_save += 1
         
-        if self._updates_since_last_save >= self._autosave_every_n_updates:
-            try:
-                self.save()
-                log.debug(f"[autosave] ok path={self.path} updates={self._updates_since_last_save}")
-                # OK -> reset counter
-                self._updates_since_last_save = 0  
-            except Exception as e:
-                # Error logged but not raised -> main execution continues without saving
-                log.error(
-                    f"[autosave] failed to save {self.path}."
-                    f"Will retry. Error: {str(e)}",
-                    exc_info=True
-                )
+        if self._updates_since_last_save < self._autosave_every_n_updates:
+            return
+        if self._background_autosave:
+            self._wait_for_pending_save()
+            if self._saver is None:
+                self._saver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="datastore-autosave")
+            self._pending_save = self._saver.submit(self._write, self._snapshot())
+            self._pending_save_updates = self._updates_since_last_save
+            self._updates_since_last_save = 0
+            return
+        try:
+            self.save()
+            log.debug(f"[autosave] ok path={self.path} updates={self._updates_since_last_save}")
+            # OK -> reset counter
+            self._updates_since_last_save = 0  
+        except Exception as e:
+            # Error logged but not raised -> main execution continues without saving
+            log.error(
+                f"[autosave] failed to save {self.path}."
+                f"Will retry. Error: {str(e)}",
+                exc_info=True
+            )
+
+    def wait_for_pending_save(self) -> None:
+        """Block until the background autosave in flight (if any) is written.
+
+        A failed save is logged and its updates are counted again, so the next update retries.
+        """
+        with self._lock:
+            self._wait_for_pending_save()
+
+    def _wait_for_pending_save(self) -> None:
+        pending, self._pending_save = self._pending_save, None
+        if pending is None:
+            return
+        try:
+            pending.result()
+            log.debug(f"[autosave] ok path={self.path} updates={self._pending_save_updates}")
+        except Exception as e:
+            log.error(
+                f"[autosave] failed to save {self.path}."
+                f"Will retry. Error: {str(e)}",
+                exc_info=True
+            )
+            self._updates_since_last_save += self._pending_save_updates
+
+    def close(self) -> None:
+        """Wait for the background autosave and stop the saver thread (the store stays usable)."""
+        with self._lock:
+            self._wait_for_pending_save()
+            if self._saver is not None:
+                self._saver.shutdown()
+                self._saver = None
 
     # ────────────────────────────────────────────
     # Persistence
     # ────────────────────────────────────────────
     def save(self) -> None:
+        # a pending background save holds an older snapshot: it must not replace this one
+        with self._lock:
+            self._wait_for_pending_save()
+            self._write(self._snapshot())
+
+    def _snapshot(self) -> _Snapshot:
+        num_ratings = len(self._rating_pairs)
+        return _Snapshot(
+            docs=list(self.docs.values()),
+            query_ids=self._query_ids[:],
+            query_texts=self._query_texts[:],
+            doc_ids=self._doc_ids[:],
+            pairs=self._rating_pairs[:num_ratings],
+            scores=self._rating_scores[:num_ratings],
+            explanations=self._explanations,
+        )
+
+    def _write(self, snapshot: _Snapshot) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        data = {
-            "docs": [d.model_dump() for d in self.docs.values()],
-            "queries": [q.model_dump() for q in self.queries.values()],
-            "ratings": [r.model_dump() for r in self.rating_by_pair.values()],
-        }
-        tmp_path = self.path.with_name(self.path.name + f".{uuid4().hex}.tmp")
-        tmp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding=ENCODING)
-        # override previous
-        tmp_path.replace(self.path)
-        
+        write_records(self.path, snapshot.records(), self.storage_format or JSON_FORMAT)
+
     def load(self) -> None:
         if not self.path.exists():
             return
 
-        # Clear previous data
-        self._clear_all_data()
+        with self._lock:
+            # Clear previous data (a snapshot being written shares the explanations)
+            self._wait_for_pending_save()
+            self._clear_all_data()
+
+            if self.storage_format is None:
+                self.storage_format = detect_format(self.path)
+
+            # decoding and ingestion allocate millions of acyclic objects
+            with _gc_paused():
+                try:
+                    data = read_records(self.path)
+                except json.JSONDecodeError as e:
+                    log.warning(f"Could not read datastore {self.path} (JSON). Starting clean. Error: {e}")
+                    return
+                self._bulk_load(data)
+            log.info(f"Loaded {len(self.docs)} documents, {self.num_queries()} queries and "
+                     f"{self.num_ratings()} ratings from {self.path}")
+
+    def _bulk_load(self, data: Dict[str, Any]) -> None:
+        """Ingest saved records, same outcome as add_document/add_query/_add_rating one by one.
+
+        The indexes are filled directly in one pass, without autosave or per-record logging. Records passing cheap
+        structural checks are trusted (values decoded from JSON are always JSON-serializable); the others go through
+        pydantic validation, which either fixes them (coercion) or rejects them with a warning.
+        """
+        skipped: Dict[str, int] = {}
 
-        try:
-            data = json.loads(self.path.read_text(encoding=ENCODING))
-        except json.JSONDecodeError as e:
-            log.warning(f"Could not read datastore {self.path} (JSON). Starting clean. Error: {e}")
-            return
+        def skip(reason: str) -> None:
+            skipped[reason] = skipped.get(reason, 0) + 1
 
         # docs
+        docs = self.docs
         for doc_as_dict in data.get("docs", []):
-            try:
-                self.add_document(Document.model_validate(doc_as_dict))
-            except ValidationError as e:
-                log.warning(f"[load] skip_doc_invalid data={doc_as_dict} error={e}")
+            doc = _trusted_document(doc_as_dict)
+            if doc is None:
+                try:
+                    doc = Document.model_validate(doc_as_dict)
+                except ValidationError as e:
+                    log.warning(f"[load] skip_doc_invalid data={doc_as_dict} error={e}")
+                    continue
+            if doc.id not in docs:
+                docs[doc.id] = doc
 
         # queries
+        query_ids, query_texts = self._query_ids, self._query_texts
+        query_row, query_row_by_key = self._query_row, self._query_row_by_key
         for query_as_dict in data.get("queries", []):
-            try:
-                tmp_query = Query.model_validate(query_as_dict)                # Create a new tmp query with loaded dict 
-                self.add_query(query_text_str=tmp_query.text, query_id=tmp_query.id) # Pass (text, ID) values to keep ID consistent
-            except ValidationError as e:
-                log.warning(f"[load] skip_query_invalid data={query_as_dict} error={e}")
+            query_values = _trusted_query(query_as_dict)
+            if query_values is None:
+                try:
+                    query = Query.model_validate(query_as_dict)
+                except ValidationError as e:
+                    log.warning(f"[load] skip_query_invalid data={query_as_dict} error={e}")
+                    continue
+                query_values = (query.id, query.text)
+            query_id, text = query_values
+            text_key = clean_text(text)
+            if text_key in query_row_by_key:
+                skip("duplicated_query_text")
+                continue
+            row = query_row.get(query_id)
+            if row is None:
+                row = query_row[query_id] = len(query_ids)
+                query_ids.append(query_id)
+                query_texts.append(text)
+            else:
+                query_texts[row] = text
+            query_row_by_key[text_key] = row
+            if self._near_duplicates is not None:
+                # saved queries are kept as they are, only new queries are suppressed
+                self._near_duplicates.add(row, text_key)
 
         # ratings
+        doc_ids, doc_row = self._doc_ids, self._doc_row
+        rating_row, pairs, scores = self._rating_row, self._rating_pairs, self._rating_scores
+        explanations = self._explanations
         for rating_as_dict in data.get("ratings", []):
-            try:
-                robj = Rating.model_validate(rating_as_dict)
-                self._add_rating(robj)
-            except ValidationError as e:
-                log.warning(f"[load] skip_rating_invalid data={rating_as_dict} error={e}")
+            rating_values = _trusted_rating(rating_as_dict)
+            if rating_values is None:
+                try:
+                    rating = Rating.model_validate(rating_as_dict)
+                except ValidationError as e:
+                    log.warning(f"[load] skip_rating_invalid data={rating_as_dict} error={e}")
+                    continue
+                rating_values = (rating.query_id, rating.doc_id, rating.score, rating.explanation)
+            query_id, doc_id, score, explanation = rating_values
+            q_row = query_row.get(query_id)
+            if q_row is None:
+                skip("query_not_found")
+                continue
+            if doc_id not in docs:
+                skip("doc_not_found")
+                continue
+            d_row = doc_row.get(doc_id)
+            if d_row is None:
+                d_row = doc_row[doc_id] = len(doc_ids)
+                doc_ids.append(doc_id)
+            pair_key = q_row << _PAIR_SHIFT | d_row
+            if pair_key in rating_row:
+                skip("duplicated_rating")
+                continue
+            rating_row_index = rating_row[pair_key] = len(pairs)
+            pairs.append(pair_key)
+            scores.append(score)
+            if explanation is not None:
+                explanations[rating_row_index] = explanation
+
+        if skipped:
+            log.warning(f"[load] skipped records: {', '.join(f'{k}={v}' for k, v in skipped.items())}")
 
     def _clear_all_data(self) -> None:
         """Reset state."""
         self.docs.clear()
-        self.queries.clear()
-        self.rating_by_pair.clear()
-        self.query_text_to_query_id.clear()
+        self._query_ids.clear()
+        self._query_texts.clear()
+        self._query_row.clear()
+        self._query_row_by_key.clear()
+        if self._near_duplicates is not None:
+            self._near_duplicates.clear()
+        self._doc_ids.clear()
+        self._doc_row.clear()
+        self._rating_row.clear()
+        self._rating_pairs = array("q")
+        self._rating_scores = array("q")
+        self._explanations.clear()
+        self._reserved_pairs.clear()
 
 
     def export_all_records_with_explanation(self, output_path: str | Path) -> None:
         """Export (query_text, doc_id, rating, explanation) to JSON."""
-        records = []
-        for rating_obj in self.rating_by_pair.values():
-            # Guard against dangling references (defensive)
-            query_obj = self.queries.get(rating_obj.query_id)
-            if not query_obj:
-                continue
-            records.append({
-                "query": query_obj.text,
-                "doc_id": rating_obj.doc_id,
-                "rating": rating_obj.score,
-                "explanation": rating_obj.explanation or ""
-            })
+        with self._lock:
+            records = [
+                {
+                    "query": self._query_texts[key >> _PAIR_SHIFT],
+                    "doc_id": self._doc_ids[key & _PAIR_MASK],
+                    "rating": score,
+                    "explanation": self._explanations.get(row) or ""
+                }
+                for row, (key, score) in enumerate(zip(self._rating_pairs, self._rating_scores))
+            ]
 
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
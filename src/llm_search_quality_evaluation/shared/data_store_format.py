@@ -0,0 +1,266 @@
+"""
+On-disk formats of the DataStore, detected from the first bytes of the file.
+
+- json: a single object {"docs": [...], "queries": [...], "ratings": [...]}, indented (human readable).
+- binary: the same records, in frames of up to `frame_size` records of one section:
+
+    magic (8 bytes) | header length (uint32 LE) | header (JSON) | body
+    body = frames, zstd-compressed as one stream when the header says so
+    frame = section tag (1 byte: D, Q or R) | payload length (uint32 LE) | payload (list of records, encoded)
+    the last frame is an empty end tag (E), so a truncated file is detected
+
+  The header carries the schema version, the record codec (msgpack, or compact JSON) and the body compression
+  (zstd, or none). Files are written with msgpack and zstd; the other values are still read.
+
+Run as a module to convert a datastore file from one format to the other.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import struct
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
+from uuid import uuid4
+
+import msgpack
+import zstandard
+
+from llm_search_quality_evaluation.shared.logger import setup_logging
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+ENCODING = "utf-8"
+JSON_FORMAT = "json"
+BINARY_FORMAT = "binary"
+FORMATS = (JSON_FORMAT, BINARY_FORMAT)
+
+BINARY_MAGIC = b"\x89LSQEDS\n"
+SCHEMA_VERSION = 1
+DEFAULT_FRAME_SIZE = 10_000
+DEFAULT_CODEC = "msgpack"
+DEFAULT_COMPRESSION = "zstd"
+DEFAULT_ZSTD_LEVEL = 3
+
+SECTIONS = ("docs", "queries", "ratings")
+_TAG_BY_SECTION = {"docs": b"D", "queries": b"Q", "ratings": b"R"}
+_SECTION_BY_TAG = {tag: section for section, tag in _TAG_BY_SECTION.items()}
+_END_TAG = b"E"
+_LENGTH = struct.Struct("<I")
+_FRAME_HEAD = struct.Struct("<cI")
+
+Records = Mapping[str, Iterable[Dict[str, Any]]]
+
+
+def detect_format(path: Path) -> str:
+    with Path(path).open("rb") as file:
+        return BINARY_FORMAT if file.read(len(BINARY_MAGIC)) == BINARY_MAGIC else JSON_FORMAT
+
+
+def check_format(storage_format: str) -> None:
+    if storage_format not in FORMATS:
+        log.error(f"Unknown datastore format {storage_format!r}, expected one of {FORMATS}")
+        raise ValueError(f"Unknown datastore format {storage_format!r}, expected one of {FORMATS}")
+
+
+# ────────────────────────────────────────────
+# JSON
+# ────────────────────────────────────────────
+def _json_dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode(ENCODING)
+
+
+def _json_loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode(ENCODING))
+
+
+def read_json(path: Path) -> Dict[str, Any]:
+    """Raises json.JSONDecodeError on a malformed file."""
+    data: Dict[str, Any] = _json_loads(Path(path).read_bytes())
+    return data
+
+
+def _write_json(file: IO[bytes], records: Records) -> None:
+    data = {section: list(records.get(section, ())) for section in SECTIONS}
+    file.write(json.dumps(data, indent=2, ensure_ascii=False).encode(ENCODING))
+
+
+# ────────────────────────────────────────────
+# Binary
+# ────────────────────────────────────────────
+def _codec(name: str) -> tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    if name == "json":
+        return _json_dumps, _json_loads
+    if name == "msgpack":
+        return (lambda value: msgpack.packb(value, use_bin_type=True)), (lambda raw: msgpack.unpackb(raw, raw=False))
+    log.error(f"Unknown datastore record codec {name!r}")
+    raise ValueError(f"Unknown datastore record codec {name!r}")
+
+
+def _check_compression(name: str) -> None:
+    if name not in ("zstd", "none"):
+        log.error(f"Unknown datastore compression {name!r}")
+        raise ValueError(f"Unknown datastore compression {name!r}")
+
+
+def _chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _write_binary(file: IO[bytes], records: Records, frame_size: int = DEFAULT_FRAME_SIZE,
+                  codec: str = DEFAULT_CODEC, compression: str = DEFAULT_COMPRESSION) -> None:
+    _check_compression(compression)
+    encode, _ = _codec(codec)
+
+    header = _json_dumps({"schema_version": SCHEMA_VERSION, "codec": codec, "compression": compression})
+    file.write(BINARY_MAGIC + _LENGTH.pack(len(header)) + header)
+    body: IO[bytes] = file
+    if compression == "zstd":
+        body = zstandard.ZstdCompressor(level=DEFAULT_ZSTD_LEVEL).stream_writer(file, closefd=False)
+    for section in SECTIONS:
+        for chunk in _chunks(records.get(section, ()), frame_size):
+            payload = encode(chunk)
+            body.write(_FRAME_HEAD.pack(_TAG_BY_SECTION[section], len(payload)))
+            body.write(payload)
+    body.write(_FRAME_HEAD.pack(_END_TAG, 0))
+    if body is not file:
+        body.close()
+
+
+def _read_exact(stream: IO[bytes], size: int, path: Path) -> bytes:
+    data = stream.read(size)
+    while 0 < len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            break
+        data += more
+    if len(data) < size:
+        log.error(f"Truncated datastore {path}")
+        raise ValueError(f"Truncated datastore {path}")
+    return data
+
+
+def _iter_binary_frames(path: Path) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """(section, records) of every frame of a binary datastore file, decoded one at a time."""
+    path = Path(path)
+    with path.open("rb") as file:
+        if file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            log.error(f"{path} is not a binary datastore")
+            raise ValueError(f"{path} is not a binary datastore")
+        (header_length,) = _LENGTH.unpack(_read_exact(file, _LENGTH.size, path))
+        header = _json_loads(_read_exact(file, header_length, path))
+        version = header.get("schema_version")
+        if not isinstance(version, int) or version > SCHEMA_VERSION:
+            log.error(f"Unsupported datastore schema version {version} in {path} (supported: <= {SCHEMA_VERSION})")
+            raise ValueError(f"Unsupported datastore schema version {version} in {path}")
+        _, decode = _codec(header.get("codec", ""))
+        compression = header.get("compression", "")
+        _check_compression(compression)
+
+        body: IO[bytes] = file
+        if compression == "zstd":
+            body = zstandard.ZstdDecompressor().stream_reader(file, closefd=False)
+        while True:
+            tag, length = _FRAME_HEAD.unpack(_read_exact(body, _FRAME_HEAD.size, path))
+            if tag == _END_TAG:
+                return
+            section = _SECTION_BY_TAG.get(tag)
+            if section is None:
+                log.error(f"Corrupt datastore {path}: unknown section tag {tag!r}")
+                raise ValueError(f"Corrupt datastore {path}: unknown section tag {tag!r}")
+            yield section, decode(_read_exact(body, length, path))
+
+
+def read_binary(path: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """Decode a binary datastore file into the same structure as the JSON format."""
+    data: Dict[str, List[Dict[str, Any]]] = {section: [] for section in SECTIONS}
+    for section, records in _iter_binary_frames(path):
+        data[section].extend(records)
+    return data
+
+
+# ────────────────────────────────────────────
+# Format-independent API
+# ────────────────────────────────────────────
+def read_records(path: Path) -> Dict[str, Any]:
+    """The docs/queries/ratings records of a datastore file, whatever its format."""
+    if detect_format(path) == BINARY_FORMAT:
+        return read_binary(path)
+    return read_json(path)
+
+
+def iter_records(path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(section, record) pairs of a datastore file, docs then queries then ratings.
+
+    Binary files are decoded frame by frame, so only one frame is in memory at a time; JSON files are parsed whole.
+    """
+    if detect_format(path) == BINARY_FORMAT:
+        for section, records in _iter_binary_frames(path):
+            for record in records:
+                yield section, record
+        return
+    data = read_json(path)
+    for section in SECTIONS:
+        for record in data.get(section, []):
+            yield section, record
+
+
+def write_records(path: Path, records: Records, storage_format: str = JSON_FORMAT) -> None:
+    """Write the records atomically (temporary file, then replaced) in the given format."""
+    check_format(storage_format)
+    path = Path(path)
+    tmp_path = path.with_name(path.name + f".{uuid4().hex}.tmp")
+    try:
+        with tmp_path.open("wb") as file:
+            if storage_format == BINARY_FORMAT:
+                _write_binary(file, records)
+            else:
+                _write_json(file, records)
+        # override previous
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def convert(source: Path, target: Path, storage_format: str) -> None:
+    """Copy the records of a datastore file into `target` with the given format (records are not validated)."""
+    check_format(storage_format)
+    data = read_records(source)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    write_records(target, {section: data.get(section, []) for section in SECTIONS}, storage_format)
+    counts = ", ".join(f"{len(data.get(section, []))} {section}" for section in SECTIONS)
+    log.info(f"Converted {source} ({detect_format(source)}) to {target} ({storage_format}): {counts}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Convert a datastore file between the JSON and binary formats.')
+    parser.add_argument('-i', '--input', type=Path, required=True, help='Datastore file to convert')
+    parser.add_argument('-o', '--output', type=Path, required=True, help='Converted datastore file')
+    parser.add_argument('-f', '--format', type=str, choices=FORMATS, default=BINARY_FORMAT,
+                        help=f'Format of the output file [default: "{BINARY_FORMAT}"]')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Activate debug mode for logging [default: False]')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging(args.verbose)
+    convert(args.input, args.output, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Merge of the datastores written by several workers (e.g. one dataset generation run per query shard).
+
+Inputs are read one at a time, in the given order, and their records are streamed into a single DataStore:
+- docs: union by id, the first occurrence wins;
+- queries: union with the same clean_text deduplication as `DataStore.add_query`; a query whose text is already
+  merged takes the merged id, a query whose id is taken by another text gets a new id; ratings follow the remapping;
+- ratings: a (query, doc) pair rated by several inputs is resolved by the merge policy:
+  - first: the first rating wins;
+  - latest: the rating of the last input wins;
+  - majority: the most frequent score wins (the current score is only replaced by a strictly more frequent one),
+    with the explanation of its first occurrence.
+
+Only the merged store and one input at a time are in memory (binary inputs are even decoded frame by frame).
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from llm_search_quality_evaluation.shared.data_store import DataStore
+from llm_search_quality_evaluation.shared.data_store_format import FORMATS, check_format, detect_format, iter_records
+from llm_search_quality_evaluation.shared.logger import setup_logging
+from llm_search_quality_evaluation.shared.models.document import Document
+from llm_search_quality_evaluation.shared.models.rating import Rating
+
+log = logging.getLogger(__name__)
+
+MERGE_POLICIES = ("first", "latest", "majority")
+DEFAULT_MERGE_POLICY = "first"
+
+
+class DataStoreMerger:
+    """Streams datastore files into `store`, see the module docstring for the merge rules."""
+
+    def __init__(self, store: DataStore, policy: str = DEFAULT_MERGE_POLICY):
+        if policy not in MERGE_POLICIES:
+            log.error(f"Unknown merge policy {policy!r}, expected one of {MERGE_POLICIES}")
+            raise ValueError(f"Unknown merge policy {policy!r}, expected one of {MERGE_POLICIES}")
+        self.store = store
+        self.policy = policy
+        self.stats: Counter[str] = Counter()
+        # majority policy, conflicting pairs only: score votes, and the first explanation of every score
+        self._votes: Dict[Tuple[str, str], Counter[int]] = {}
+        self._vote_explanations: Dict[Tuple[str, str, int], Optional[str]] = {}
+
+    def merge(self, path: Path) -> None:
+        # input query id -> merged query id, for this input only
+        query_ids: Dict[str, str] = {}
+        for section, record in iter_records(path):
+            if section == "docs":
+                self._merge_doc(record)
+            elif section == "queries":
+                self._merge_query(record, query_ids)
+            else:
+                self._merge_rating(record, query_ids)
+        self.stats["inputs"] += 1
+        log.info(f"[merge] merged {path}: {len(self.store.docs)} documents, {self.store.num_queries()} queries, "
+                 f"{self.store.num_ratings()} ratings so far")
+
+    def _merge_doc(self, record: Any) -> None:
+        try:
+            doc = Document.model_validate(record)
+        except ValidationError as e:
+            log.warning(f"[merge] skip_doc_invalid data={record} error={e}")
+            self.stats["invalid_docs"] += 1
+            return
+        if self.store.has_document(doc.id):
+            self.stats["duplicated_docs"] += 1
+            return
+        self.store.add_document(doc)
+        self.stats["docs"] += 1
+
+    def _merge_query(self, record: Any, query_ids: Dict[str, str]) -> None:
+        query_id, text = (record.get("id"), record.get("text")) if isinstance(record, dict) else (None, None)
+        if not isinstance(query_id, str) or not isinstance(text, str) or not query_id or not text:
+            log.warning(f"[merge] skip_query_invalid data={record}")
+            self.stats["invalid_queries"] += 1
+            return
+        num_queries = self.store.num_queries()
+        # a taken id is not passed: add_query would give the new text to the existing query
+        taken = self.store.has_query(query_id)
+        query = self.store.add_query(text, None if taken else query_id)
+        query_ids[query_id] = query.id
+        if self.store.num_queries() == num_queries:
+            self.stats["duplicated_queries"] += 1
+        else:
+            self.stats["queries"] += 1
+            if taken:
+                self.stats["reassigned_query_ids"] += 1
+
+    def _merge_rating(self, record: Any, query_ids: Dict[str, str]) -> None:
+        try:
+            rating = Rating.model_validate(record)
+        except ValidationError as e:
+            log.warning(f"[merge] skip_rating_invalid data={record} error={e}")
+            self.stats["invalid_ratings"] += 1
+            return
+        query_id, doc_id = query_ids.get(rating.query_id), rating.doc_id
+        if query_id is None or not self.store.has_document(doc_id):
+            self.stats["dangling_ratings"] += 1
+            return
+
+        if not self.store.has_rating_score(query_id, doc_id):
+            self.store.create_rating_score(query_id, doc_id, rating.score, rating.explanation)
+            self.stats["ratings"] += 1
+            return
+
+        self.stats["conflicting_ratings"] += 1
+        if self.policy == "latest":
+            self.store.replace_rating_score(query_id, doc_id, rating.score, rating.explanation)
+        elif self.policy == "majority":
+            self._vote(query_id, doc_id, rating.score, rating.explanation)
+
+    def _vote(self, query_id: str, doc_id: str, score: int, explanation: Optional[str]) -> None:
+        pair = (query_id, doc_id)
+        current = self.store.rating_by_pair[pair]
+        votes = self._votes.get(pair)
+        if votes is None:
+            votes = self._votes[pair] = Counter({current.score: 1})
+            self._vote_explanations[(query_id, doc_id, current.score)] = current.explanation
+        votes[score] += 1
+        self._vote_explanations.setdefault((query_id, doc_id, score), explanation)
+
+        # ties keep the current score
+        winner = max(votes, key=lambda s: (votes[s], s == current.score))
+        if winner != current.score:
+            self.store.replace_rating_score(query_id, doc_id, winner,
+                                            self._vote_explanations[(query_id, doc_id, winner)])
+
+
+def merge_datastores(
+        inputs: List[Path],
+        output: Path,
+        policy: str = DEFAULT_MERGE_POLICY,
+        storage_format: Optional[str] = None,
+) -> Counter[str]:
+    """
+    Merge the datastore files `inputs` (in this order) into `output` and return the merge counters.
+
+    :param storage_format: format of the output, the format of the first input if not given
+    """
+    if not inputs:
+        log.error("No datastore to merge")
+        raise ValueError("No datastore to merge")
+    if storage_format is not None:
+        check_format(storage_format)
+    store = DataStore(path=output, ignore_saved_data=True,
+                      storage_format=storage_format or detect_format(inputs[0]))
+    merger = DataStoreMerger(store, policy)
+    for path in inputs:
+        merger.merge(path)
+    store.save()
+    log.info(f"[merge] wrote {output} ({store.storage_format}): "
+             f"{', '.join(f'{k}={v}' for k, v in sorted(merger.stats.items()))}")
+    return merger.stats
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Merge the datastores of several dataset generation runs.')
+    parser.add_argument('-i', '--input', type=Path, nargs='+', required=True,
+                        help='Datastore files to merge, in priority order')
+    parser.add_argument('-o', '--output', type=Path, required=True, help='Merged datastore file')
+    parser.add_argument('-p', '--policy', type=str, choices=MERGE_POLICIES, default=DEFAULT_MERGE_POLICY,
+                        help=f'How to resolve a (query, doc) pair rated by several inputs '
+                             f'[default: "{DEFAULT_MERGE_POLICY}"]')
+    parser.add_argument('-f', '--format', type=str, choices=FORMATS, default=None,
+                        help='Format of the output file [default: the format of the first input]')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Activate debug mode for logging [default: False]')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging(args.verbose)
+    merge_datastores(args.input, args.output, args.policy, args.format)
+
+
+if __name__ == "__main__":
+    main()
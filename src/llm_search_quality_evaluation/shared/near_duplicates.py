@@ -0,0 +1,114 @@
+"""
+Near-duplicate detection of short texts (queries) with MinHash LSH.
+
+A text is represented by its set of character shingles (lowercased, punctuation removed, word boundaries kept), so
+inflections and typos ("best hiking boots" / "best hiking boot") share most shingles while word-level shingles of
+a 3-word query would share almost none. MinHash signatures are split in bands: texts sharing a band are candidates,
+and a candidate is only returned if the exact Jaccard similarity of the shingle sets reaches the threshold, so the
+LSH parameters trade speed for recall but never produce false positives.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import zlib
+from itertools import repeat
+from typing import Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 64
+DEFAULT_SHINGLE_SIZE = 3
+# the LSH band threshold is set below the similarity threshold, to favour recall (candidates are verified)
+_LSH_RECALL_MARGIN = 0.2
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> FrozenSet[int]:
+    """Hashes of the character shingles of the normalized text."""
+    normalized = " " + " ".join(_NON_WORD.sub(" ", text.lower()).split()) + " "
+    if len(normalized) <= size:
+        grams = {normalized}
+    else:
+        grams = {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+    return frozenset(zlib.crc32(gram.encode("utf-8")) for gram in grams)
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows per band): the most selective split whose candidate threshold (1/b)^(1/r) stays below
+    `threshold` minus a recall margin."""
+    target = max(0.0, threshold - _LSH_RECALL_MARGIN)
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= target:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index of texts by item key; `find` returns the most similar indexed item above the threshold."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 shingle_size: int = DEFAULT_SHINGLE_SIZE):
+        if not 0 < threshold <= 1 or num_perm < 1 or shingle_size < 1:
+            log.error(f"Invalid near-duplicate index settings threshold={threshold} num_perm={num_perm} "
+                      f"shingle_size={shingle_size}")
+            raise ValueError("threshold must be in (0, 1], num_perm and shingle_size must be >= 1")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        # the i-th permutation of a shingle hash h is hash((i, h)): int tuples hash in C, and are not salted
+        self._seeds = range(self.bands * self.rows)
+        self._buckets: List[Dict[Tuple[int, ...], List[Hashable]]] = [{} for _ in range(self.bands)]
+        self._shingles: Dict[Hashable, FrozenSet[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def _signature(self, hashes: FrozenSet[int]) -> List[int]:
+        if not hashes:
+            return [0] * len(self._seeds)
+        return [min(map(hash, zip(repeat(seed), hashes))) for seed in self._seeds]
+
+    def _band_keys(self, hashes: FrozenSet[int]) -> List[Tuple[int, ...]]:
+        signature, rows = self._signature(hashes), self.rows
+        return [tuple(signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def add(self, item: Hashable, text: str) -> None:
+        """Index `text` under `item`; indexing an item again replaces its text."""
+        hashes = shingles(text, self.shingle_size)
+        self._shingles[item] = hashes
+        for bucket, band_key in zip(self._buckets, self._band_keys(hashes)):
+            items = bucket.setdefault(band_key, [])
+            if item not in items:
+                items.append(item)
+
+    def find(self, text: str) -> Optional[Hashable]:
+        """Indexed item most similar to `text` with Jaccard similarity >= threshold, or None."""
+        hashes = shingles(text, self.shingle_size)
+        best: Optional[Hashable] = None
+        best_similarity = self.threshold
+        seen = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(hashes)):
+            for item in bucket.get(band_key, ()):
+                if item in seen:
+                    continue
+                seen.add(item)
+                similarity = jaccard(hashes, self._shingles[item])
+                if similarity > best_similarity or (similarity == best_similarity and best is None):
+                    best, best_similarity = item, similarity
+        return best
+
+    def clear(self) -> None:
+        for bucket in self._buckets:
+            bucket.clear()
+        self._shingles.clear()
@@ -9,7 +9,7 @@ from typing import List, Dict, Any, Union, Optional
 
 from llm_search_quality_evaluation.shared.search_engines.search_engine_base import BaseSearchEngine
 from llm_search_quality_evaluation.shared.models.document import Document
-from llm_search_quality_evaluation.shared.utils import clean_text
+from llm_search_quality_evaluation.shared.utils import clean_text_cached
 
 import logging
 log = logging.getLogger(__name__)
@@ -152,7 +152,7 @@ class ElasticsearchSearchEngine(BaseSearchEngine):
                 if key != "id"
             }
 
-            result.append(Document(id=doc_id, fields=fields))
+            result.append(self._build_document(doc_id, fields))
         log.info(f"Fetched {len(result)} documents from the engine")
         return result
 
@@ -164,14 +164,14 @@ class ElasticsearchSearchEngine(BaseSearchEngine):
                 return []
 
             if isinstance(value, str):
-                return [clean_text(value)]
+                return [clean_text_cached(value)]
 
             if isinstance(value, list):
-                return [clean_text(v) if isinstance(v, str) else str(v) for v in value]
+                return [clean_text_cached(v) if isinstance(v, str) else str(v) for v in value]
 
             if isinstance(value, dict):
                 cleaned_dict = {
-                    k: clean_text(v) if isinstance(v, str) else v
+                    k: clean_text_cached(v) if isinstance(v, str) else v
                     for k, v in value.items()
                 }
                 return [json.dumps(cleaned_dict)]
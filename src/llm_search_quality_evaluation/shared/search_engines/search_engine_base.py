@@ -1,4 +1,5 @@
 import json
+import logging
 from abc import ABC, abstractmethod
 from json import JSONDecodeError
 from pathlib import Path
@@ -6,7 +7,12 @@ from typing import List, Dict, Any, Union, Iterator
 from pydantic import HttpUrl
 from llm_search_quality_evaluation.shared.models.document import Document
 
+log = logging.getLogger(__name__)
+
 NUMBER_OF_DOCS_EACH_FETCH = 100
+# documents built from the engine hits skip pydantic validation, except one every N (0: never) and all of them
+# when debug logging is enabled
+DOCUMENT_VALIDATION_SAMPLE_RATE = 1000
 
 class BaseSearchEngine(ABC):
 
@@ -18,6 +24,8 @@ class BaseSearchEngine(ABC):
         self.endpoint = HttpUrl(endpoint)
         self.QUERY_PLACEHOLDER = "$query"
         self.UNIQUE_KEY = 'id'
+        self.document_validation_sample_rate = DOCUMENT_VALIDATION_SAMPLE_RATE
+        self._built_documents = 0
 
     @staticmethod
     def escape(string: str) -> str:
@@ -60,6 +68,21 @@ class BaseSearchEngine(ABC):
             start += NUMBER_OF_DOCS_EACH_FETCH
 
 
+    def _build_document(self, doc_id: Any, fields: Dict[str, Any]) -> Document:
+        """Build a Document from a hit normalized by the adapter.
+
+        The fields values are lists of cleaned strings built by the adapter, so the (recursive) pydantic validation is
+        skipped with `model_construct`; only the cheap id/keys checks are kept, falling back to the validated
+        constructor (and its error) when they fail. A sample of the documents is still fully validated.
+        """
+        self._built_documents += 1
+        sample_rate = self.document_validation_sample_rate
+        if (not isinstance(doc_id, str) or not doc_id or not fields or "" in fields
+                or (sample_rate and self._built_documents % sample_rate == 0)
+                or log.isEnabledFor(logging.DEBUG)):
+            return Document(id=doc_id, fields=fields)
+        return Document.model_construct(id=doc_id, fields=fields)
+
     def _parse_query_template(self, path: Path | str) -> Dict[str, Any]:
         """Return the payload"""
         path = Path(path)
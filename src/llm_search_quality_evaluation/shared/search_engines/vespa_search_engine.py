@@ -10,7 +10,7 @@ from pydantic import HttpUrl
 
 from llm_search_quality_evaluation.shared.search_engines.search_engine_base import BaseSearchEngine
 from llm_search_quality_evaluation.shared.models.document import Document
-from llm_search_quality_evaluation.shared.utils import clean_text
+from llm_search_quality_evaluation.shared.utils import clean_text_cached
 
 
 log = logging.getLogger(__name__)
@@ -106,7 +106,7 @@ class VespaSearchEngine(BaseSearchEngine):
         """
         Normalize field values for `Document.fields` to List[str], matching Solr behavior:
         - None -> []
-        - str -> [clean_text(str)]
+        - str -> [clean_text_cached(str)]
         - list -> each element cleaned if str, else cast to str
         - dict -> JSON-dumped with string values cleaned
         - other -> [str(value)]
@@ -116,13 +116,13 @@ class VespaSearchEngine(BaseSearchEngine):
             return []
 
         if isinstance(v, str):
-            return [clean_text(v)]
+            return [clean_text_cached(v)]
 
         if isinstance(v, list):
-            return [clean_text(i) if isinstance(i, str) else str(i) for i in v]
+            return [clean_text_cached(i) if isinstance(i, str) else str(i) for i in v]
 
         if isinstance(v, dict):
-            cleaned_dict = {k: (clean_text(val) if isinstance(val, str) else val) for k, val in v.items()}
+            cleaned_dict = {k: (clean_text_cached(val) if isinstance(val, str) else val) for k, val in v.items()}
             return [json.dumps(cleaned_dict)]
 
         return [str(v)]
@@ -247,7 +247,7 @@ class VespaSearchEngine(BaseSearchEngine):
             fields = hit.get("fields", {}) or {}
 
             normalized_fields = {k: self._normalize_field_value(v) for k, v in fields.items()}
-            docs.append(Document(id=doc_id, fields=normalized_fields))
+            docs.append(self._build_document(doc_id, normalized_fields))
         log.info(f"Fetched {len(docs)} documents from the engine")
         return docs
 
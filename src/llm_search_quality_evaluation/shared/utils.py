@@ -1,4 +1,5 @@
 from typing import Any
+import functools
 import re
 import html
 import unicodedata
@@ -24,8 +25,13 @@ def _to_string(value: Any) -> str:
 # ────────────────────────────────────────────
 
 _TAG_REGEX = re.compile(r"<.*?>")
-_CTRL_REGEX = re.compile(r"[\u0000-\u001F\u007F-\u009F]")
-_WS_REGEX = re.compile(r"\s+")
+# control chars and whitespace runs in one pass: controls become spaces, then whitespace runs one space
+_CTRL_WS_REGEX = re.compile(r"[\s\u0000-\u001F\u007F-\u009F]+")
+_ASCII_CTRL_REGEX = re.compile(r"[\u0000-\u0008\u000E-\u001F\u007F]")
+
+CLEAN_TEXT_CACHE_SIZE = 65536
+# only short values (categories, tags, brands...) tend to repeat across documents
+CLEAN_TEXT_CACHE_MAX_LENGTH = 256
 
 def clean_text(text: str) -> str:
     """Safe text cleaning used for document field values.
@@ -38,20 +44,34 @@ def clean_text(text: str) -> str:
     - Collapse all whitespace to single spaces and strip
 
     Intentionally does NOT change case, remove punctuation, or strip accents.
+    Pure-ASCII text without '&' or '<' is unchanged by the first three steps, so they are skipped.
     """
     if text is None:
         return ""
+    if text.isascii() and "&" not in text and "<" not in text:
+        # ASCII whitespace other than " " is a control char too: only spaces are left after the replacement
+        if _ASCII_CTRL_REGEX.search(text):
+            text = _ASCII_CTRL_REGEX.sub(" ", text)
+        return " ".join(text.split())
     # Unescape entities to expose tags like &lt;tag&gt;
-    t = html.unescape(text)
+    t = html.unescape(text) if "&" in text else text
     # Remove naive HTML tags
-    t = re.sub(_TAG_REGEX, "", t)
+    if "<" in t:
+        t = _TAG_REGEX.sub("", t)
     # Normalize unicode (compatibility composition)
     t = unicodedata.normalize("NFKC", t)
-    # Replace control characters with spaces
-    t = _CTRL_REGEX.sub(" ", t)
-    # Normalize whitespace
-    t = _WS_REGEX.sub(" ", t).strip()
-    return t
+    # Replace control characters with spaces and normalize whitespace
+    return _CTRL_WS_REGEX.sub(" ", t).strip()
+
+@functools.lru_cache(maxsize=CLEAN_TEXT_CACHE_SIZE)
+def _clean_text_memo(text: str) -> str:
+    return clean_text(text)
+
+def clean_text_cached(text: str) -> str:
+    """clean_text with a bounded LRU cache of the short values, for field values repeated across documents."""
+    if text is not None and len(text) <= CLEAN_TEXT_CACHE_MAX_LENGTH:
+        return _clean_text_memo(text)
+    return clean_text(text)
 
 def join_fields_as_text(fields: dict[str, Any], exclude: set[str] | str) -> str:
     if isinstance(exclude, str):
@@ -0,0 +1,290 @@
+"""
+Columnar loading of the corpus/queries/candidates jsonl files.
+
+- Files are parsed by the pyarrow JSON reader into Arrow tables (only the needed fields), with a jsonlines fallback
+  for rows pyarrow cannot type (e.g. mixed int/str ids).
+- The parsed table is cached in a binary sidecar (Arrow IPC) under COLUMNAR_CACHE_PATH, keyed by the file path and
+  schema, and reused while the file size/mtime are unchanged: the dataset folder is never written to. Writing a
+  sidecar evicts the other ones of the same file and those whose file no longer exists.
+- Candidates are stored in CSR form: query offsets -> doc indices/ratings NumPy arrays, with ids mapped to integers,
+  and read through lazy per-query mappings (`Candidates.view`) instead of nested dicts.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+from jsonlines import jsonlines
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import COLUMNAR_CACHE_PATH
+
+log = logging.getLogger(__name__)
+
+SIDECAR_VERSION = 2
+_SIDECAR_METADATA_KEY = b"llm_search_quality_evaluation"
+
+CORPUS_SCHEMA = pa.schema([("id", pa.string()), ("title", pa.string()), ("text", pa.string())])
+QUERIES_SCHEMA = pa.schema([("id", pa.string()), ("text", pa.string())])
+CANDIDATES_SCHEMA = pa.schema([("query_id", pa.string()), ("doc_id", pa.string()), ("rating", pa.int64())])
+
+
+def _sidecar_path(path: Path, schema: pa.Schema) -> Path:
+    key = hashlib.sha256(f"{path.resolve()}\n{schema.to_string()}".encode()).hexdigest()[:16]
+    return COLUMNAR_CACHE_PATH / f"{path.name}.{key}.arrow"
+
+
+def _source_metadata(path: Path, schema: pa.Schema) -> dict[str, Any]:
+    stat = path.stat()
+    return {
+        "version": SIDECAR_VERSION,
+        "source": str(path.resolve()),
+        "schema": schema.to_string(),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _read_metadata(sidecar: Path) -> dict[str, Any]:
+    with pa.memory_map(str(sidecar)) as source:
+        schema_metadata = pa.ipc.open_file(source).schema.metadata or {}
+    metadata: dict[str, Any] = json.loads(schema_metadata[_SIDECAR_METADATA_KEY])
+    return metadata
+
+
+def _evict_stale_sidecars(path: Path, keep: Path) -> None:
+    """Delete the sidecars (other than `keep`) of the file `path`, of removed files, or unreadable."""
+    source = str(path.resolve())
+    for sidecar in COLUMNAR_CACHE_PATH.glob("*.arrow"):
+        if sidecar == keep:
+            continue
+        try:
+            sidecar_source = _read_metadata(sidecar).get("source")
+        except (pa.ArrowInvalid, OSError, KeyError, ValueError):
+            sidecar_source = None
+        if sidecar_source is None or sidecar_source == source or not Path(sidecar_source).exists():
+            log.debug(f"Evicting stale sidecar {sidecar}")
+            try:
+                sidecar.unlink()
+            except OSError as e:
+                log.debug(f"Could not evict sidecar {sidecar}: {e}")
+
+
+def _read_sidecar(path: Path, schema: pa.Schema) -> Optional[pa.Table]:
+    sidecar = _sidecar_path(path, schema)
+    if not sidecar.exists():
+        return None
+    try:
+        # memory-mapped: the table buffers point into the sidecar file, nothing is copied
+        table = pa.ipc.open_file(pa.memory_map(str(sidecar))).read_all()
+        metadata = json.loads((table.schema.metadata or {})[_SIDECAR_METADATA_KEY])
+    except (pa.ArrowInvalid, OSError, KeyError, ValueError) as e:
+        log.debug(f"Ignoring unreadable sidecar {sidecar}: {e}")
+        return None
+
+    if metadata != _source_metadata(path, schema):
+        log.debug(f"Sidecar {sidecar} is outdated")
+        return None
+    return table
+
+
+def _write_sidecar(path: Path, schema: pa.Schema, table: pa.Table) -> None:
+    sidecar = _sidecar_path(path, schema)
+    metadata = json.dumps(_source_metadata(path, schema)).encode()
+    table = table.replace_schema_metadata({_SIDECAR_METADATA_KEY: metadata})
+    tmp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+    try:
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, sidecar)
+    except OSError as e:
+        # read-only cache folder: the sidecar is an optimization only
+        log.debug(f"Could not write sidecar {sidecar}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return
+    _evict_stale_sidecars(path, keep=sidecar)
+
+
+def _read_with_jsonlines(path: Path, schema: pa.Schema) -> pa.Table:
+    columns: dict[str, list] = {name: [] for name in schema.names}
+    with jsonlines.open(path) as rows:
+        for row in rows:
+            for field in schema:
+                value = row.get(field.name)
+                if value is not None:
+                    value = int(value) if pa.types.is_integer(field.type) else str(value)
+                columns[field.name].append(value)
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def _parse(path: Path, schema: pa.Schema) -> pa.Table:
+    if path.stat().st_size == 0:
+        return schema.empty_table()
+    try:
+        table = pa_json.read_json(
+            path,
+            parse_options=pa_json.ParseOptions(explicit_schema=schema, unexpected_field_behavior="ignore"),
+        )
+        return table.select(schema.names)
+    except pa.ArrowInvalid as e:
+        log.debug(f"Falling back to jsonlines parsing of {path}: {e}")
+        return _read_with_jsonlines(path, schema)
+
+
+def read_jsonl_table(
+        path: Path, schema: pa.Schema, use_cache: bool = True, dictionary_columns: tuple[str, ...] = ()
+) -> pa.Table:
+    """
+    Read the `schema` fields of a jsonl file as an Arrow table (missing fields are null), from the sidecar when it is
+    up to date.
+
+    :param dictionary_columns: string columns stored dictionary-encoded (each distinct value once), for repeated ids
+    """
+    path = Path(path)
+    if use_cache:
+        cached = _read_sidecar(path, schema)
+        if cached is not None:
+            log.debug(f"Loaded {path} from its sidecar")
+            return cached.replace_schema_metadata(None)
+
+    table = _parse(path, schema).combine_chunks()
+    for name in dictionary_columns:
+        table = table.set_column(table.schema.get_field_index(name), name,
+                                 pc.dictionary_encode(table.column(name)))
+    if use_cache:
+        _write_sidecar(path, schema, table)
+    return table
+
+
+def _codes(column: pa.ChunkedArray) -> tuple[np.ndarray, list[str]]:
+    """Integer code of every value (in order of first appearance) and the distinct values."""
+    encoded = column.combine_chunks()
+    if not pa.types.is_dictionary(encoded.type):
+        encoded = pc.dictionary_encode(encoded)
+    return encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64), encoded.dictionary.to_pylist()
+
+
+class Candidates:
+    """
+    Candidates ratings in CSR form: the candidates of query `query_ids[i]` are
+    `doc_ids[doc_index[offsets[i]:offsets[i + 1]]]` with `ratings[offsets[i]:offsets[i + 1]]`.
+    Queries and their candidates keep the file order; a repeated (query, doc) pair keeps its first position and its
+    last rating.
+    """
+
+    def __init__(self, query_ids: list[str], doc_ids: list[str], offsets: np.ndarray, doc_index: np.ndarray,
+                 ratings: np.ndarray):
+        self.query_ids = query_ids
+        self.doc_ids = doc_ids
+        self.offsets = offsets
+        self.doc_index = doc_index
+        self.ratings = ratings
+        self._rows: Optional[dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_index)
+
+    def row(self, query_id: str) -> int:
+        """Row of `query_id` in the CSR arrays, KeyError if it has no candidates."""
+        if self._rows is None:
+            self._rows = {query_id: row for row, query_id in enumerate(self.query_ids)}
+        return self._rows[query_id]
+
+    def view(self, min_rating: Optional[int] = None) -> CandidatesView:
+        """Lazy query id -> {doc id: rating} mapping, same content as `to_dict(min_rating)`."""
+        return CandidatesView(self, min_rating)
+
+    @classmethod
+    def from_table(cls, table: pa.Table) -> Candidates:
+        q_codes, query_ids = _codes(table.column("query_id"))
+        d_codes, doc_ids = _codes(table.column("doc_id"))
+        ratings = table.column("rating").to_numpy(zero_copy_only=False).astype(np.int64)
+
+        keys = q_codes * max(len(doc_ids), 1) + d_codes
+        _, first = np.unique(keys, return_index=True)
+        _, last_reversed = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last_reversed
+        # queries codes follow their first appearance, candidates their first position in the file
+        order = np.lexsort((first, q_codes[first]))
+        first, last = first[order], last[order]
+
+        offsets = np.zeros(len(query_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(q_codes[first], minlength=len(query_ids)), out=offsets[1:])
+        return cls(query_ids, doc_ids, offsets, d_codes[first].astype(np.int32), ratings[last])
+
+    def to_dict(self, min_rating: Optional[int] = None) -> dict[str, dict[str, int]]:
+        """query id -> {doc id: rating}; with `min_rating`, only ratings >= min_rating (queries left empty dropped)."""
+        doc_ids, doc_index, ratings = self.doc_ids, self.doc_index.tolist(), self.ratings.tolist()
+        offsets = self.offsets.tolist()
+        result: dict[str, dict[str, int]] = {}
+        for row, query_id in enumerate(self.query_ids):
+            start, end = offsets[row], offsets[row + 1]
+            if min_rating is None:
+                result[query_id] = {doc_ids[d]: r for d, r in zip(doc_index[start:end], ratings[start:end])}
+            else:
+                docs = {doc_ids[d]: r for d, r in zip(doc_index[start:end], ratings[start:end]) if r >= min_rating}
+                if docs:
+                    result[query_id] = docs
+        return result
+
+
+class CandidatesView(Mapping[str, dict[str, int]]):
+    """
+    Read-only query id -> {doc id: rating} mapping over the CSR arrays: the dict of a query is built when it is
+    accessed, so no nested dicts are kept in memory. With `min_rating`, only ratings >= min_rating are kept and the
+    queries left empty are not in the mapping.
+    """
+
+    def __init__(self, candidates: Candidates, min_rating: Optional[int] = None):
+        self._candidates = candidates
+        self._min_rating = min_rating
+        num_queries = len(candidates.query_ids)
+        self._kept: Optional[np.ndarray] = None
+        self._query_rows: np.ndarray
+        if min_rating is None:
+            self._query_rows = np.arange(num_queries)
+        else:
+            rows = np.repeat(np.arange(num_queries), np.diff(candidates.offsets))
+            self._kept = np.bincount(rows[candidates.ratings >= min_rating], minlength=num_queries)
+            self._query_rows = np.flatnonzero(self._kept)
+
+    def _has_row(self, row: int) -> bool:
+        return self._kept is None or bool(self._kept[row])
+
+    def __getitem__(self, query_id: str) -> dict[str, int]:
+        row = self._candidates.row(query_id)
+        if not self._has_row(row):
+            raise KeyError(query_id)
+        candidates = self._candidates
+        start, end = int(candidates.offsets[row]), int(candidates.offsets[row + 1])
+        docs = zip(candidates.doc_index[start:end].tolist(), candidates.ratings[start:end].tolist())
+        doc_ids = candidates.doc_ids
+        if self._min_rating is None:
+            return {doc_ids[d]: r for d, r in docs}
+        return {doc_ids[d]: r for d, r in docs if r >= self._min_rating}
+
+    def __contains__(self, query_id: object) -> bool:
+        try:
+            return isinstance(query_id, str) and self._has_row(self._candidates.row(query_id))
+        except KeyError:
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        query_ids = self._candidates.query_ids
+        return (query_ids[row] for row in self._query_rows.tolist())
+
+    def __len__(self) -> int:
+        return len(self._query_rows)
+
+
+def load_candidates(path: Path, use_cache: bool = True) -> Candidates:
+    table = read_jsonl_table(path, CANDIDATES_SCHEMA, use_cache, dictionary_columns=("query_id", "doc_id"))
+    return Candidates.from_table(table)
@@ -2,16 +2,20 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Optional, Any, Literal
+from typing import Optional, Any, Literal, Union
 
 import yaml
-from pydantic import BaseModel, Field, field_validator, FilePath, model_validator
+from pydantic import BaseModel, Field, field_validator, FilePath, model_validator, PositiveInt
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import DEFAULT_LEADERBOARD_TTL_HOURS
 
 log = logging.getLogger(__name__)
 
 
 class Config(BaseModel):
-    model_id: str = Field(..., description="Model id from HuggingFace models")
+    model_id: Union[str, list[str]] = Field(
+        ..., description="Model id from HuggingFace models, or a list of model ids to compare in a single run"
+    )
     task_to_evaluate: Literal["retrieval", "reranking"]
     corpus_path: FilePath = Field(..., description="Corpus jsonl file path")
     queries_path: FilePath = Field(..., description="Queries jsonl file path")
@@ -26,6 +30,49 @@ class Config(BaseModel):
         None,
         description="Path to save mteb embeddings, by default saved in <resources/embeddings> folder.",
     )
+    leaderboard_ttl_hours: float = Field(
+        DEFAULT_LEADERBOARD_TTL_HOURS, ge=0,
+        description="Hours before the local MTEB leaderboard snapshot is refreshed from the results repository.",
+    )
+    offline: bool = Field(
+        False, description="Never fetch the MTEB leaderboard results, use the local snapshot only."
+    )
+    num_model_workers: int = Field(
+        1, ge=1, description="Number of worker processes evaluating models in parallel, 1 means in sequence."
+    )
+
+    encode_workers: int = Field(
+        1, ge=1, description="Number of worker processes encoding the corpus shards in parallel (CPU), 1 disables it."
+    )
+    encode_threads_per_worker: Optional[int] = Field(
+        None, ge=1, description="Torch/BLAS threads per encoding worker, by default CPU cores / encode_workers."
+    )
+    quantizations: list[Literal["float16", "int8", "binary"]] = Field(
+        default_factory=list,
+        description="Embedding precisions to evaluate against float32 on the cached embeddings (retrieval only).",
+    )
+    truncate_dims: list[PositiveInt] = Field(
+        default_factory=list,
+        description="Truncated (Matryoshka) dimensions to evaluate on the cached embeddings (retrieval only).",
+    )
+
+    @property
+    def model_ids(self) -> list[str]:
+        """Models to evaluate, in the order given in the configuration."""
+        if isinstance(self.model_id, str):
+            return [self.model_id]
+        return list(self.model_id)
+
+    @field_validator("model_id")
+    @classmethod
+    def check_model_ids(cls, val: Union[str, list[str]]) -> Union[str, list[str]]:
+        model_ids = [val] if isinstance(val, str) else val
+        if not model_ids or any(not model_id.strip() for model_id in model_ids):
+            log.error("model_id must be a non-empty model id or a non-empty list of model ids")
+            raise ValueError("model_id must be a non-empty model id or a non-empty list of model ids")
+        if len(set(model_ids)) != len(model_ids):
+            raise ValueError("model_id list contains duplicated model ids")
+        return val
 
     @classmethod
     @field_validator("corpus_path", "queries_path", "candidates_path", mode="before")
@@ -38,6 +85,13 @@ class Config(BaseModel):
             raise ValueError(f"{val} must have .jsonl extension")
         return path
 
+    @model_validator(mode="after")
+    def check_workers(self) -> Config:
+        if self.num_model_workers > 1 and self.encode_workers > 1:
+            log.error("num_model_workers and encode_workers cannot be both greater than 1")
+            raise ValueError("num_model_workers and encode_workers cannot be both greater than 1")
+        return self
+
     @model_validator(mode="after")
     def create_default_output_dest(self) -> Config:
         if self.output_dest is None:
@@ -7,3 +7,23 @@ TASKS_NAME_MAPPING = {
 }
 
 CACHE_PATH = Path("resources/cache")
+# Arrow sidecars of the parsed corpus/queries/candidates jsonl files
+COLUMNAR_CACHE_PATH = CACHE_PATH / "columnar"
+
+# MTEB leaderboard snapshot (aggregated avg_main_score per model, reused across runs)
+LEADERBOARD_BENCHMARK = "MTEB(eng, v2)"
+LEADERBOARD_SNAPSHOT_PATH = CACHE_PATH / "leaderboard"
+LEADERBOARD_SNAPSHOT_VERSION = 1
+DEFAULT_LEADERBOARD_TTL_HOURS = 24 * 7
+
+# Sharded encoding: inputs smaller than this are encoded in-process
+DEFAULT_MIN_SHARD_SIZE = 1024
+
+# Exact retrieval scoring: similarity is computed one (query block × doc block) at a time
+DEFAULT_QUERY_BLOCK_SIZE = 256
+DEFAULT_DOC_BLOCK_SIZE = 65536
+# cutoffs of the MTEB retrieval evaluator
+RETRIEVAL_K_VALUES = (1, 3, 5, 10, 20, 100, 1000)
+
+# Reranking samples: rows per Arrow record batch while streaming the queries
+DEFAULT_ARROW_BATCH_SIZE = 1024
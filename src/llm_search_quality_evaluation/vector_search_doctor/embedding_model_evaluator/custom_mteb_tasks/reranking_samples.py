@@ -0,0 +1,177 @@
+"""
+Reranking samples of the CustomRerankingTask, stored as Arrow tables instead of a HF Dataset of texts.
+
+- documents: one row per unique document text.
+- samples: one row per query, with its positive/negative documents as row indices into the documents table.
+
+Every document text is stored once, however many queries reference it, and the samples table is built from a
+generator of record batches over the (columnar) queries.
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Optional, Union
+
+import pyarrow as pa
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.columnar_loader import (
+    CORPUS_SCHEMA, QUERIES_SCHEMA, read_jsonl_table
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import DEFAULT_ARROW_BATCH_SIZE
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.utils import compose_text, read_candidates
+
+log = logging.getLogger(__name__)
+
+SAMPLES_SCHEMA = pa.schema([
+    ("query", pa.string()),
+    ("positive", pa.list_(pa.int32())),
+    ("negative", pa.list_(pa.int32())),
+])
+DOCUMENTS_SCHEMA = pa.schema([("text", pa.string())])
+
+
+class RerankingSamples:
+    """
+    Read-only view of the samples with the interface MTEB expects from the reranking dataset split: len(), rows as
+    {"query": str, "positive": list[str], "negative": list[str]}, iteration, column access and `column_names`.
+    Texts are materialized once from the documents table and shared by all the rows referencing them.
+    """
+
+    column_names = ["query", "positive", "negative"]
+
+    def __init__(self, samples: pa.Table, documents: pa.Table):
+        self.samples = samples
+        self.documents = documents
+        self._texts: Optional[list[str]] = None
+
+    @property
+    def texts(self) -> list[str]:
+        if self._texts is None:
+            self._texts = self.documents.column("text").to_pylist()
+        return self._texts
+
+    def __len__(self) -> int:
+        return int(self.samples.num_rows)
+
+    def _row(self, query: str, positive: list[int], negative: list[int]) -> dict[str, Any]:
+        texts = self.texts
+        return {
+            "query": query,
+            "positive": [texts[i] for i in positive],
+            "negative": [texts[i] for i in negative],
+        }
+
+    def __getitem__(self, key: Union[int, str]) -> Any:
+        if isinstance(key, str):
+            if key not in self.column_names:
+                raise KeyError(key)
+            return [row[key] for row in self]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        row = self.samples.slice(key, 1).to_pylist()[0]
+        return self._row(row["query"], row["positive"], row["negative"])
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for batch in self.samples.to_batches():
+            columns = batch.to_pydict()
+            for query, positive, negative in zip(columns["query"], columns["positive"], columns["negative"]):
+                yield self._row(query, positive, negative)
+
+
+def _read_documents(corpus_path: Path, doc_ids: set[str]) -> tuple[dict[str, int], list[str]]:
+    """
+    Read the corpus and keep the (composed) text of the referenced documents only, deduplicated.
+    Return the document id -> text row mapping and the unique texts.
+    """
+    doc_rows: dict[str, int] = {}
+    text_rows: dict[str, int] = {}
+    texts: list[str] = []
+    table = read_jsonl_table(corpus_path, CORPUS_SCHEMA)
+    for batch in table.to_batches():
+        for doc_id, title, text in zip(*(batch.column(name).to_pylist() for name in ("id", "title", "text"))):
+            if doc_id not in doc_ids or (not title and not text):
+                continue
+            composed_text = compose_text(title, text)
+            text_row = text_rows.setdefault(composed_text, len(texts))
+            if text_row == len(texts):
+                texts.append(composed_text)
+            doc_rows[doc_id] = text_row
+    return doc_rows, texts
+
+
+def _split_candidates(
+        query_candidates: dict[str, int], doc_rows: dict[str, int], relevance_scale: str
+) -> tuple[list[int], list[int]]:
+    positive: list[int] = []
+    negative: list[int] = []
+    for doc_id, rating in query_candidates.items():
+        text_row = doc_rows.get(doc_id)
+        if text_row is None:
+            log.warning(f"{doc_id} has no description and no title")
+            continue
+        if relevance_scale == "binary":
+            if rating > 0:
+                positive.append(text_row)
+            else:
+                negative.append(text_row)
+        elif relevance_scale == "graded":
+            # In case of rating=1, we drop it as it might bring noise for reranking task
+            if rating == 2:
+                positive.append(text_row)
+            elif rating == 0:
+                negative.append(text_row)
+    return positive, negative
+
+
+def _sample_batches(
+        queries_path: Path,
+        candidates: Mapping[str, dict[str, int]],
+        doc_rows: dict[str, int],
+        relevance_scale: str,
+        batch_size: int,
+) -> Iterator[pa.RecordBatch]:
+    columns: dict[str, list] = {name: [] for name in SAMPLES_SCHEMA.names}
+    for queries in read_jsonl_table(queries_path, QUERIES_SCHEMA).to_batches():
+        for query_id, query in zip(queries.column("id").to_pylist(), queries.column("text").to_pylist()):
+            query_candidates = candidates.get(query_id)
+            if query_candidates is None:
+                continue
+            positive, negative = _split_candidates(query_candidates, doc_rows, relevance_scale)
+            if not (positive and negative):
+                log.warning("Empty positive_text and negative_text lists")
+                continue
+            columns["query"].append(query)
+            columns["positive"].append(positive)
+            columns["negative"].append(negative)
+            if len(columns["query"]) == batch_size:
+                yield pa.RecordBatch.from_pydict(columns, schema=SAMPLES_SCHEMA)
+                columns = {name: [] for name in SAMPLES_SCHEMA.names}
+    if columns["query"]:
+        yield pa.RecordBatch.from_pydict(columns, schema=SAMPLES_SCHEMA)
+
+
+def build_reranking_samples(
+        corpus_path: Path,
+        queries_path: Path,
+        candidates_path: Path,
+        relevance_scale: str,
+        batch_size: int = DEFAULT_ARROW_BATCH_SIZE,
+) -> RerankingSamples:
+    """
+    Build the reranking samples: a query is kept when it has at least one positive and one negative document
+    (binary scale: rating > 0 is positive; graded scale: 2 is positive, 0 negative, 1 is dropped).
+    Queries and candidates keep their file order.
+    """
+    candidates = read_candidates(candidates_path)
+    # the doc ids of the candidates are the distinct ids of the file
+    doc_rows, texts = _read_documents(corpus_path, set(candidates.doc_ids))
+    log.debug(f"{len(doc_rows)} referenced documents, {len(texts)} unique texts")
+
+    samples = pa.Table.from_batches(
+        _sample_batches(queries_path, candidates.view(), doc_rows, relevance_scale, batch_size), schema=SAMPLES_SCHEMA
+    )
+    documents = pa.Table.from_pydict({"text": texts}, schema=DOCUMENTS_SCHEMA)
+    return RerankingSamples(samples, documents)
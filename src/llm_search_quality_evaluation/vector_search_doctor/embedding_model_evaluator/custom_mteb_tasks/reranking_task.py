@@ -1,68 +1,18 @@
 import logging
-from typing import Dict, Optional, Any
+from typing import Any
 
-from datasets import Dataset, DatasetDict
 from mteb.abstasks.AbsTask import TaskMetadata
 from mteb.abstasks.AbsTaskReranking import AbsTaskReranking
 from mteb.overview import TASKS_REGISTRY
 
 from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.config import Config
-from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.utils import read_corpus_reranking, read_queries, read_candidates
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.custom_mteb_tasks.reranking_samples import (
+    build_reranking_samples
+)
 
 log = logging.getLogger(__name__)
 
 
-def compose_text(title: Optional[str], description: Optional[str]) -> str:
-    if title and description:
-        return f"{title}\n\n{description}"
-    return title or description or ""
-
-
-def _build_dataset(
-    corpus: Dict[str, Dict],
-    queries: Dict[str, str],
-    candidates: Dict[str, Dict[str, int]],
-    relevance_scale: str,
-) -> list[dict]:
-    dataset = []
-    for query_id, query in queries.items():
-        candidate_map = candidates.get(query_id)
-        if candidate_map is None:
-            continue
-        positive_text = []
-        negative_text = []
-
-        for doc_id, rating in candidate_map.items():
-            doc = corpus.get(doc_id, {})
-            title = doc.get("title")
-            text = doc.get("text")
-
-            if not title and not text:
-                log.warning(f"{doc_id} has no description and no title")
-                continue
-            composed_context = compose_text(title, text)
-            if relevance_scale == "binary":
-                if rating > 0:
-                    positive_text.append(composed_context)
-                else:
-                    negative_text.append(composed_context)
-            elif relevance_scale == "graded":
-                # In case of rating=1, we drop it as it might bring noise for reranking task
-                if rating == 2:
-                    positive_text.append(composed_context)
-                elif rating == 0:
-                    negative_text.append(composed_context)
-
-        if positive_text and negative_text:
-            dataset.append(
-                {"query": query, "positive": positive_text, "negative": negative_text}
-            )
-        else:
-            log.warning("Empty positive_text and negative_text lists")
-
-    return dataset
-
-
 class CustomRerankingTask(AbsTaskReranking):
     metadata = TaskMetadata(
         name="CustomRerankingTask",
@@ -86,6 +36,9 @@ class CustomRerankingTask(AbsTaskReranking):
         Override AbsTask.load_data. By default, AbsTask.load_data fetches datasets from the Hugging Face Hub.
         In our case, we want to use local data files (paths defined in Config), so we override this method.
         """
+        if self.data_loaded:  # type: ignore[has-type]
+            # already loaded (e.g. shared by several models in the same run)
+            return
         log.debug("Loading data for CustomRerankingTask")
 
         if config is None:
@@ -93,13 +46,11 @@ class CustomRerankingTask(AbsTaskReranking):
                 "Pass your internal Config via MTEB.run(..., config=Config)."
             )
 
-        corpus = read_corpus_reranking(config.corpus_path)
-        queries = read_queries(config.queries_path)
-        candidates = read_candidates(config.candidates_path)["candidates"]
-
-        dataset = _build_dataset(corpus, queries, candidates, config.relevance_scale)
+        # documents are referenced by row id and their texts stored once (see reranking_samples)
+        samples = build_reranking_samples(config.corpus_path, config.queries_path, config.candidates_path,
+                                          config.relevance_scale)
 
-        self.dataset = DatasetDict({"test": Dataset.from_list(dataset)})
+        self.dataset = {"test": samples}
         self.data_loaded = True
 
 # the tasks need to be added to the official registry, otherwise are not seen from CachedEmbeddingWrapper class
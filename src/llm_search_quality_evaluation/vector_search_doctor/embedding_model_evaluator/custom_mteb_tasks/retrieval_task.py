@@ -46,6 +46,9 @@ class CustomRetrievalTask(AbsTaskRetrieval):
         Override AbsTask.load_data. By default, AbsTask.load_data fetches datasets from the Hugging Face Hub.
         In our case, we want to use local data files (paths defined in Config), so we override this method.
         """
+        if self.data_loaded:  # type: ignore[has-type]
+            # already loaded (e.g. shared by several models in the same run)
+            return
         log.debug("Loading data for CustomRetrievalTask")
 
         if config is None:
@@ -56,7 +59,8 @@ class CustomRetrievalTask(AbsTaskRetrieval):
         self.corpus = {"test": read_corpus_retrieval(config.corpus_path)}
         self.queries = {"test": read_queries(config.queries_path)}
         self.relevant_docs = {
-            "test": read_candidates(config.candidates_path)["relevant_docs"]
+            # a real dict: the MTEB evaluator hands it to pytrec_eval
+            "test": read_candidates(config.candidates_path).to_dict(min_rating=1)
         }
         self.data_loaded = True
 
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from mteb.encoder_interface import PromptType
+from mteb.models.cache_wrapper import TextVectorMap
+
+log = logging.getLogger(__name__)
+
+
+def _hash_text(text: str) -> str:
+    # same key as mteb TextVectorMap
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def open_cache_map(cached: Any, cache_path: Path, task_name: str) -> Optional[TextVectorMap]:
+    """Text → vector map of the task, as already opened by the cached wrapper or read from the cache files."""
+    cache_dict = getattr(cached, "cache_dict", None)
+    if isinstance(cache_dict, dict) and task_name in cache_dict and cache_dict[task_name].vectors is not None:
+        cache_map: TextVectorMap = cache_dict[task_name]
+        return cache_map
+
+    cache_dir = cache_path / task_name
+    if not (cache_dir / "index.json").exists():
+        return None
+    cache_map = TextVectorMap(cache_dir)
+    cache_map.load(name=task_name)
+    return cache_map
+
+
+def encode_with_cache(
+        cached: Any,
+        cache_path: Path,
+        task_name: str,
+        texts: list[str],
+        batch_size: int,
+        label: str,
+        prompt_type: Optional[PromptType] = None,
+) -> np.ndarray:
+    """
+    Verify how many texts are already in the embedding cache and log the hit rate. If all of them are, vectors are
+    gathered from the cache files without calling the model, otherwise the cached wrapper encodes the missing ones.
+    """
+    cache_map = open_cache_map(cached, cache_path, task_name)
+    if cache_map is not None and cache_map.vectors is not None and texts:
+        indexes = [cache_map.hash_to_index.get(_hash_text(text)) for text in texts]
+        hits = sum(index is not None for index in indexes)
+        log.info(f"Embedding cache hit rate for {label}: {hits}/{len(texts)} ({100 * hits / len(texts):.1f}%)")
+        if hits == len(texts):
+            return np.asarray(cache_map.vectors[np.asarray(indexes, dtype=np.int64)])
+    else:
+        log.info(f"Embedding cache hit rate for {label}: 0/{len(texts)} (no cache found)")
+
+    # the prompt type is only passed when given, as in the MTEB evaluators (query/document prompts)
+    kwargs: dict[str, Any] = {"prompt_type": prompt_type} if prompt_type is not None else {}
+    vectors: np.ndarray = cached.encode(
+        texts=texts,
+        task_name=task_name,
+        batch_size=batch_size,
+        **kwargs,
+    )
+    return vectors
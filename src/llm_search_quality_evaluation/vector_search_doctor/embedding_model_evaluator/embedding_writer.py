@@ -6,11 +6,8 @@ import numpy as np
 import jsonlines
 from mteb.models.cache_wrapper import CachedEmbeddingWrapper
 
-from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.custom_mteb_tasks.reranking_task import compose_text
-from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.utils import (
-    read_corpus_retrieval, read_corpus_reranking, read_queries
-)
-from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import TASKS_NAME_MAPPING
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.embedding_cache import encode_with_cache
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.utils import read_corpus_texts, read_queries
 
 log = logging.getLogger(__name__)
 
@@ -32,6 +29,9 @@ class EmbeddingWriter:
     jsonl files:
     <embeddings_path>/documents_embeddings.jsonl
     <embeddings_path>/queries_embeddings.jsonl
+
+    Texts are composed exactly as the custom task composes them, so the embeddings cached during the MTEB evaluation
+    are reused. When every text is cached, vectors are read straight from the cache files without calling the model.
     """
 
     def __init__(
@@ -65,38 +65,18 @@ class EmbeddingWriter:
 
         # documents
         documents_path = path / "documents_embeddings.jsonl"
-        if self.task_name == TASKS_NAME_MAPPING["retrieval"]:
-            doc_dict_retrieval = read_corpus_retrieval(Path(self.corpus_path))
-            doc_ids = list(doc_dict_retrieval.keys())
-            doc_texts = list(doc_dict_retrieval.values())
-        elif self.task_name == TASKS_NAME_MAPPING["reranking"]:
-            doc_dict_reranking = read_corpus_reranking(Path(self.corpus_path))
-            doc_ids = list(doc_dict_reranking.keys())
-            doc_texts = [
-                compose_text(doc_dict_reranking[_id].get("title"), doc_dict_reranking[_id].get("text"))
-                for _id in doc_ids
-            ]
-        else:
-            raise ValueError(f"Unknown task: {self.task_name}")
-
-        doc_vectors = self.cached.encode(
-            texts=doc_texts,
-            task_name=self.task_name,
-            batch_size=self.batch_size,
-        )
+        doc_dict = read_corpus_texts(Path(self.corpus_path), self.task_name)
+        doc_ids = list(doc_dict.keys())
+        doc_vectors = encode_with_cache(self.cached, self.cache_path, self.task_name,
+                                        [doc_dict[_id] for _id in doc_ids], self.batch_size, "documents")
         _write_embeddings_jsonl(documents_path, zip(doc_ids, doc_vectors))
 
         # queries
         queries_path = path / "queries_embeddings.jsonl"
         query_dict = read_queries(Path(self.queries_path))
         query_ids = list(query_dict.keys())
-        query_texts = [query_dict[qid] for qid in query_ids]
-
-        query_vectors = self.cached.encode(
-            texts=query_texts,
-            task_name=self.task_name,
-            batch_size=self.batch_size,
-        )
+        query_vectors = encode_with_cache(self.cached, self.cache_path, self.task_name,
+                                          [query_dict[qid] for qid in query_ids], self.batch_size, "queries")
         _write_embeddings_jsonl(queries_path, zip(query_ids, query_vectors))
 
         self.cached.close()
@@ -0,0 +1,58 @@
+"""
+In-process evaluation of the CustomRetrievalTask, bypassing the MTEB retrieval evaluator.
+
+The corpus/query matrices come from the embedding cache (missing texts are encoded by the cached wrapper), top-k is
+computed with blocked similarity and the metrics in vectorized form. Scores, ranking ties and rounding follow the MTEB
+path (torch similarity, trec_eval ordering, 5 decimals), so the task result file has the same metrics.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+from mteb.load_results.task_results import TaskResult
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.config import Config
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import RETRIEVAL_K_VALUES
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.retrieval_scorer import (
+    evaluate_rankings, load_retrieval_data, model_similarity, top_k, trec_order
+)
+
+log = logging.getLogger(__name__)
+
+
+def score_retrieval(cached: Any, cache_path: Path, task_name: str, config: Config) -> dict[str, float]:
+    """
+    Compute the MTEB retrieval scores (ndcg/map/recall/precision/mrr at every k, main_score) of the cached model.
+    """
+    data = load_retrieval_data(cached, cache_path, task_name, config.corpus_path, config.queries_path,
+                               config.candidates_path)
+    indices, scores = top_k(data.query_vectors, data.doc_vectors, max(RETRIEVAL_K_VALUES),
+                            similarity=model_similarity(cached))
+    ranked = trec_order(indices, scores, data.doc_ids)
+    metrics = evaluate_rankings(ranked, data.query_ids, data.doc_ids, data.relevant_docs, RETRIEVAL_K_VALUES)
+
+    # MTEB rounds the pytrec_eval metrics, not MRR
+    rounded = {name: value if name.startswith("mrr") else round(value, 5) for name, value in metrics.items()}
+    return {**rounded, "main_score": rounded["ndcg_at_10"]}
+
+
+def run_fast_retrieval_evaluation(
+        task: Any, cached: Any, cache_path: Path, task_name: str, config: Config, task_result_path: Path
+) -> Path:
+    """
+    Evaluate the retrieval task in-process and write the result where MTEB would,
+    {output_folder}/{model_name}/{model_revision}/{task_name}.json.
+    """
+    start = time.time()
+    scores = score_retrieval(cached, cache_path, task_name, config)
+    evaluation_time = time.time() - start
+
+    task_result_path.parent.mkdir(parents=True, exist_ok=True)
+    result = TaskResult.from_task_results(task, {config.split: {"default": scores}}, evaluation_time)
+    result.to_disk(task_result_path)
+    log.info(f"In-process retrieval evaluation: main_score={scores['main_score']:.5f} "
+             f"({evaluation_time:.2f} seconds), saved into {task_result_path}")
+    return task_result_path
@@ -0,0 +1,192 @@
+"""
+Hard-negative mining for the exported retrieval datasets: the top-ranked documents of a local index over the corpus
+that are not already candidates of the query.
+
+- BM25Index: in-memory inverted index (lowercased word tokens, Okapi BM25), postings weights precomputed at build.
+- VectorIndex: normalized document embeddings, exact top-k by dot product (see retrieval_scorer.top_k).
+
+Queries are ranked in parallel batches, equal scores are ordered by a seeded permutation of the documents and the
+results are collected in query order, so the negatives only depend on the inputs and the seed.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence, Union
+
+import numpy as np
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.retrieval_scorer import (
+    normalize, top_k
+)
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BM25_K1 = 0.9
+DEFAULT_BM25_B = 0.4
+DEFAULT_ENCODE_CHUNK_SIZE = 4096
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+Encoder = Callable[[list[str]], np.ndarray]
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _ranked_rows(rows: np.ndarray, scores: np.ndarray, tie_rank: np.ndarray, depth: int) -> np.ndarray:
+    """`depth` best rows by score desc, then by seeded tie rank."""
+    order = np.lexsort((tie_rank[rows], -scores))[:depth]
+    ranked: np.ndarray = rows[order]
+    return ranked
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the documents added with `add`, in memory: term -> (doc rows, BM25 weights) arrays.
+    Only documents sharing at least one term with the query are ranked.
+    """
+
+    def __init__(self, k1: float = DEFAULT_BM25_K1, b: float = DEFAULT_BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: list[str] = []
+        self._doc_lengths: list[int] = []
+        self._term_rows: dict[str, list[int]] = {}
+        self._term_freqs: dict[str, list[int]] = {}
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, doc_id: str, text: str) -> None:
+        row = len(self.doc_ids)
+        tokens = tokenize(text)
+        self.doc_ids.append(doc_id)
+        self._doc_lengths.append(len(tokens))
+        for term, freq in Counter(tokens).items():
+            self._term_rows.setdefault(term, []).append(row)
+            self._term_freqs.setdefault(term, []).append(freq)
+
+    def build(self) -> None:
+        """Turn the postings lists into arrays of precomputed per-(term, doc) BM25 weights."""
+        num_docs = len(self.doc_ids)
+        lengths = np.asarray(self._doc_lengths, dtype=np.float32)
+        avg_length = float(lengths.mean()) if num_docs else 0.0
+        norms = self.k1 * (1 - self.b + self.b * lengths / (avg_length or 1.0))
+        for term in list(self._term_rows):
+            rows = np.asarray(self._term_rows.pop(term), dtype=np.int32)
+            freqs = np.asarray(self._term_freqs.pop(term), dtype=np.float32)
+            idf = math.log(1 + (num_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            weights = idf * freqs * (self.k1 + 1) / (freqs + norms[rows])
+            self._postings[term] = (rows, weights.astype(np.float32))
+        log.debug(f"BM25 index: {num_docs} documents, {len(self._postings)} terms")
+
+    def rank(self, texts: list[str], depth: int, tie_rank: np.ndarray) -> list[np.ndarray]:
+        ranked: list[np.ndarray] = []
+        for text in texts:
+            postings = [self._postings[term] for term in set(tokenize(text)) if term in self._postings]
+            if not postings:
+                ranked.append(np.empty(0, dtype=np.int32))
+                continue
+            rows, inverse = np.unique(np.concatenate([p[0] for p in postings]), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate([p[1] for p in postings]))
+            ranked.append(_ranked_rows(rows, scores, tie_rank, depth))
+        return ranked
+
+
+class VectorIndex:
+    """
+    Exact vector index: documents added with `add` are encoded in chunks of `chunk_size` texts (the texts are not
+    kept), queries are encoded per batch; vectors are L2-normalized, so the dot product is the cosine similarity.
+    """
+
+    def __init__(self, encode: Encoder, chunk_size: int = DEFAULT_ENCODE_CHUNK_SIZE):
+        self.encode = encode
+        self.chunk_size = chunk_size
+        self.doc_ids: list[str] = []
+        self._pending: list[str] = []
+        self._chunks: list[np.ndarray] = []
+        self._vectors: Optional[np.ndarray] = None
+        # the model is shared by the worker threads
+        self._encode_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._chunks.append(normalize(np.asarray(self.encode(self._pending), dtype=np.float32)))
+            self._pending = []
+
+    def add(self, doc_id: str, text: str) -> None:
+        self.doc_ids.append(doc_id)
+        self._pending.append(text)
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def build(self) -> None:
+        self._flush()
+        self._vectors = np.concatenate(self._chunks) if self._chunks else np.empty((0, 0), dtype=np.float32)
+        self._chunks = []
+        log.debug(f"Vector index: {len(self.doc_ids)} documents, dimension {self._vectors.shape[1]}")
+
+    def rank(self, texts: list[str], depth: int, tie_rank: np.ndarray) -> list[np.ndarray]:
+        if self._vectors is None:
+            log.error("VectorIndex.rank called before build")
+            raise ValueError("VectorIndex.rank called before build")
+        with self._encode_lock:
+            queries = normalize(np.asarray(self.encode(texts), dtype=np.float32))
+        indices, scores = top_k(queries, self._vectors, depth)
+        return [_ranked_rows(rows, row_scores, tie_rank, depth) for rows, row_scores in zip(indices, scores)]
+
+
+NegativeIndex = Union[BM25Index, VectorIndex]
+
+
+def mine_hard_negatives(
+        index: NegativeIndex,
+        query_texts: Sequence[str],
+        banned: Sequence[set[str]],
+        needs: Sequence[int],
+        seed: int,
+        batch_size: int,
+        workers: int,
+) -> list[list[str]]:
+    """
+    For every query, the `needs[i]` best-ranked documents of the (built) index that are not in `banned[i]`.
+    A query gets fewer documents when fewer share terms with it (BM25) or the corpus is too small.
+
+    :param batch_size: queries ranked together (a vector index encodes and scores them as one block)
+    :param workers: batches ranked in parallel threads
+    """
+    num_docs = len(index)
+    tie_rank = np.random.default_rng(seed).permutation(num_docs)
+    batches = [range(start, min(start + batch_size, len(query_texts)))
+               for start in range(0, len(query_texts), batch_size)]
+
+    def mine_batch(batch: range) -> list[list[str]]:
+        depth = min(num_docs, max((needs[i] + len(banned[i]) for i in batch), default=0))
+        if depth <= 0:
+            return [[] for _ in batch]
+        ranked = index.rank([query_texts[i] for i in batch], depth, tie_rank)
+        picks: list[list[str]] = []
+        for i, rows in zip(batch, ranked):
+            docs: list[str] = []
+            for row in rows.tolist():
+                if len(docs) >= needs[i]:
+                    break
+                doc_id = index.doc_ids[row]
+                if doc_id not in banned[i]:
+                    docs.append(doc_id)
+            picks.append(docs)
+        return picks
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map yields the batches in submission order, whatever order they complete in
+        return [docs for batch_picks in executor.map(mine_batch, batches) for docs in batch_picks]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Optional
+from uuid import uuid4
+
+import mteb
+import numpy as np
+import pandas as pd
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import (
+    LEADERBOARD_BENCHMARK, LEADERBOARD_SNAPSHOT_PATH, LEADERBOARD_SNAPSHOT_VERSION, DEFAULT_LEADERBOARD_TTL_HOURS
+)
+
+log = logging.getLogger(__name__)
+
+# include "mostly complete" tasks for the models, so excluding models which are run on a few tasks
+MIN_TASKS_RATIO = 0.7
+
+
+def _snapshot_file(snapshot_dir: Path, benchmark_name: str, task_type: str) -> Path:
+    slug = "".join(c if c.isalnum() else "_" for c in f"{benchmark_name}__{task_type}")
+    return snapshot_dir / f"{slug}.json"
+
+
+def aggregate_model_averages(scores: pd.DataFrame, task_names: list[str]) -> dict[str, float]:
+    """
+    Average the per-task main scores of every model in a single grouped reduction.
+
+    :param scores: long-format dataframe with `model_name`, `task_name` and `score` columns
+    :param task_names: benchmark tasks to consider
+    :return: <model_name, avg_main_score> for models evaluated on at least 70% of the tasks
+    """
+    if scores.empty:
+        return {}
+
+    scores = scores[scores["task_name"].isin(task_names)].dropna(subset=["score"])
+    # a model may appear once per revision, the first result for a task wins
+    scores = scores.drop_duplicates(subset=["model_name", "task_name"], keep="first")
+
+    values = scores["score"].to_numpy(dtype=np.float64)
+    # in case if task's main_score is in [0, 1] ratio
+    values = np.where(values <= 1.0, values * 100, values)
+
+    grouped = (
+        scores.assign(score=values)
+        .groupby("model_name", sort=False)["score"]
+        .agg(["sum", "count"])
+    )
+    grouped = grouped[grouped["count"] >= len(task_names) * MIN_TASKS_RATIO]
+    averages = grouped["sum"] / grouped["count"]
+    return {str(name): float(score) for name, score in averages.items()}
+
+
+def _fetch_leaderboard_scores(benchmark_name: str, task_type: str) -> tuple[list[str], pd.DataFrame]:
+    """
+    Fetch mteb model results from https://github.com/embeddings-benchmark/results (into ~/.cache/mteb/results) and
+    return the benchmark task names with a long-format (model_name, task_name, score) dataframe.
+    """
+    benchmark = mteb.get_benchmark(benchmark_name)
+    tasks = [t for t in benchmark.tasks if t.metadata.type == task_type]
+    task_names = [t.metadata.name for t in tasks]
+
+    all_results = mteb.load_results(tasks=tasks)
+    # revisions are joined and main scores averaged over splits/subsets by mteb itself
+    scores = all_results.to_dataframe(aggregation_level="task", format="long")
+    return task_names, scores
+
+
+def _read_snapshot(path: Path, benchmark_name: str, task_type: str) -> Optional[dict[str, Any]]:
+    if not path.exists():
+        return None
+    try:
+        snapshot: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        log.warning(f"Could not read leaderboard snapshot {path}. Ignoring it. Error: {e}")
+        return None
+
+    if (snapshot.get("schema_version") != LEADERBOARD_SNAPSHOT_VERSION
+            or snapshot.get("benchmark") != benchmark_name
+            or snapshot.get("task_type") != task_type):
+        log.debug(f"Leaderboard snapshot {path} is outdated or does not match, ignoring it")
+        return None
+    return snapshot
+
+
+def _write_snapshot(path: Path, snapshot: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + f".{uuid4().hex}.tmp")
+    tmp_path.write_text(json.dumps(snapshot, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(path)
+    log.debug(f"Leaderboard snapshot saved to {path}")
+
+
+def load_leaderboard_averages(
+        task_type: str,
+        benchmark_name: str = LEADERBOARD_BENCHMARK,
+        snapshot_dir: Path = LEADERBOARD_SNAPSHOT_PATH,
+        ttl_hours: float = DEFAULT_LEADERBOARD_TTL_HOURS,
+        offline: bool = False,
+) -> dict[str, float]:
+    """
+    Return the MTEB leaderboard avg_main_score per model for the given task type.
+
+    The aggregated table is stored as a local snapshot and reused while younger than `ttl_hours`.
+    In offline mode the snapshot is used regardless of its age and the results repository is never fetched.
+    If fetching fails, a stale snapshot is used as fallback.
+    """
+    path = _snapshot_file(snapshot_dir, benchmark_name, task_type)
+    snapshot = _read_snapshot(path, benchmark_name, task_type)
+
+    if snapshot is not None:
+        age_hours = (time.time() - float(snapshot.get("created_at", 0))) / 3600
+        if offline or age_hours <= ttl_hours:
+            log.info(f"Using MTEB leaderboard snapshot {path} (age={age_hours:.1f}h)")
+            return {str(k): float(v) for k, v in snapshot["model_averages"].items()}
+
+    if offline:
+        log.warning(f"Offline mode and no MTEB leaderboard snapshot found in {path}, skipping comparison")
+        return {}
+
+    try:
+        task_names, scores = _fetch_leaderboard_scores(benchmark_name, task_type)
+    except Exception as e:
+        if snapshot is None:
+            raise
+        log.warning(f"Could not fetch MTEB leaderboard results, using stale snapshot {path}. Error: {e}")
+        return {str(k): float(v) for k, v in snapshot["model_averages"].items()}
+
+    model_averages = aggregate_model_averages(scores, task_names)
+    _write_snapshot(path, {
+        "schema_version": LEADERBOARD_SNAPSHOT_VERSION,
+        "benchmark": benchmark_name,
+        "task_type": task_type,
+        "mteb_version": getattr(mteb, "__version__", None),
+        "created_at": time.time(),
+        "model_averages": model_averages,
+    })
+    return model_averages
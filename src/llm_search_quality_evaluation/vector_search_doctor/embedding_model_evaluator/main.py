@@ -3,9 +3,10 @@
 MTEB execution pipeline entrypoint for Module 2.
 
 - Loads MTEB tasks in-memory (no export to disk required).
-- Evaluates either Retrieval or Re-ranking using a cached-embedding wrapper.
+- Evaluates either Retrieval or Re-ranking using a cached-embedding wrapper, for one or more models.
 - Compute MTEB Leaderboard model comparison and add them to the custom task result file.
 - Writes embeddings to disk only after evaluation (optional but kept as before).
+- Writes a comparison table of all evaluated models.
 - Dataset/split/model/task are driven by Config.
 """
 
@@ -13,10 +14,12 @@ from __future__ import annotations
 
 import argparse
 import logging
+import multiprocessing
 import time
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import mteb
 from mteb.models.cache_wrapper import CachedEmbeddingWrapper
@@ -29,6 +32,16 @@ from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluato
 )
 from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.embedding_writer import EmbeddingWriter
 from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import TASKS_NAME_MAPPING, CACHE_PATH
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.fast_retrieval_evaluator import (
+    run_fast_retrieval_evaluation
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.leaderboard import load_leaderboard_averages
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.matryoshka import evaluate_truncations
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.quantization import evaluate_quantizations
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.retrieval_scorer import (
+    load_retrieval_data
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.sharded_encoder import ShardedEncoder
 from llm_search_quality_evaluation.shared.logger import setup_logging  # type: ignore[import]
 
 log = logging.getLogger(__name__)
@@ -48,6 +61,9 @@ def _parse_args() -> argparse.Namespace:
     )
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='Activate debug mode for logging [default: False]')
+    parser.add_argument('--scorer', choices=["mteb", "fast"], default="mteb",
+                        help='Retrieval evaluator: "mteb" runs the MTEB evaluator, "fast" scores the cached embeddings '
+                             'in-process with the same metrics (retrieval task only) [default: mteb]')
 
     return parser.parse_args()
 
@@ -75,7 +91,7 @@ def _build_task(task_name: str, dataset_name: str, split: str) -> Any:
         return task
 
 
-def _add_mteb_leaderboard_comparison_metrics(file_path: Path, mteb_comparison_metrics: dict) -> None:
+def _add_mteb_leaderboard_comparison_metrics(file_path: Path, mteb_comparison_metrics: dict) -> dict:
     """
     1. Read from custom task result json file (file_path)
     2. Get custom task main_score
@@ -123,43 +139,18 @@ def _add_mteb_leaderboard_comparison_metrics(file_path: Path, mteb_comparison_me
         json.dump(data, file, indent=2, ensure_ascii=False)
         log.debug(f"Added MTEB leaderboard comparison metrics to {file_path}")
 
+    return mteb_comparison_metrics
+
 
-def compute_mteb_leaderboard_comparison(model_name: str, task_type: str) -> dict:
+def compute_mteb_leaderboard_comparison(model_name: str, model_averages: dict[str, float]) -> dict:
     """
-    1. Fetch mteb model results from https://github.com/embeddings-benchmark/results
-    2. Calculate averages for all models.
-    3. Find the top #1 model for the given task based on avg_main_score.
-    4. Return user model (model_name), top model avg_main_scores.
+    1. Take MTEB leaderboard avg_main_score for all models (see leaderboard.load_leaderboard_averages, loaded once
+       per run and shared by every evaluated model).
+    2. Find the top #1 model for the given task based on avg_main_score.
+    3. Return user model (model_name), top model avg_main_scores.
     """
 
-    benchmark = mteb.get_benchmark("MTEB(eng, v2)")
-    tasks = [t for t in benchmark.tasks if t.metadata.type == task_type]
-    # include "mostly complete" tasks for the models, so excluding models which are run on a few tasks
-    num_tasks = len(tasks) * 0.7
-
-    # 1. Fetch mteb results from https://github.com/embeddings-benchmark/results into ~/.cache/mteb/results
-    all_results = mteb.load_results(tasks=tasks).join_revisions()
-
-    # 2. Calculate averages for all models.
-    model_averages = {}  # <model_name, avg_main_score>
-    for model_res in all_results.model_results:
-        total_score = 0
-        count = 0
-        for task_obj in tasks:
-            task_name = task_obj.metadata.name
-            task_result = next((res for res in model_res.task_results if res.task_name == task_name), None)
-            if task_result:
-                main_score = task_result.get_score()
-                if main_score <= 1.0:  # in case if task's main_score is in [0, 1] ratio
-                    main_score *= 100
-                total_score += main_score
-                count += 1
-            else:
-                pass
-        if count >= num_tasks:
-            model_averages[model_res.model_name] = float(total_score / count)
-
-    # 3. Find the top #1 model for the given task based on avg_main_score.
+    # 2. Find the top #1 model for the given task based on avg_main_score.
     top_model_name: str = "None"
     top_avg_main_score: float = 0.0
     for name, score in model_averages.items():
@@ -177,17 +168,151 @@ def compute_mteb_leaderboard_comparison(model_name: str, task_type: str) -> dict
     }
 
 
+def _evaluate_model(model_id: str, task: Any, task_name: str, config: Config, model_averages: dict[str, float],
+                    embeddings_dest: Optional[Path], verbose: bool = False, scorer: str = "mteb") -> dict:
+    """
+    Evaluate a single model on the (already loaded) task, add the MTEB leaderboard comparison to its result file
+    and write its embeddings. Every model has its own CachedEmbeddingWrapper cache.
+    With scorer="fast", the retrieval task is evaluated in-process (see fast_retrieval_evaluator) instead of MTEB.
+    Runs in the main process or in a pool worker, so it must stay importable at module level.
+    """
+    setup_logging(verbose)
+    if config.output_dest is None:
+        raise ValueError("config.output_dest is not set, default_dir must be `resources`")
+
+    # --- Model + caching wrapper ---
+    model: Any
+    if config.encode_workers > 1:
+        model = ShardedEncoder(model_id, num_workers=config.encode_workers,
+                               threads_per_worker=config.encode_threads_per_worker)
+    else:
+        model = mteb.get_model(model_id, trust_remote_code=True)
+
+    model_name_additional_path = model_id.replace("/", "__").replace(" ", "_")
+    model_with_cache_path = CACHE_PATH / model_name_additional_path
+
+    log.debug(f"Using embedding cache at {model_with_cache_path}")
+    model_with_cache = CachedEmbeddingWrapper(model, cache_path=model_with_cache_path)
+
+    try:
+        # task result is in {output_folder} / {model_name} / {model_revision} / {task_name}.json
+        task_result_path: Path = (config.output_dest / model_name_additional_path /
+                                  mteb.get_model_meta(model_id).revision / f"{task_name}.json")
+
+        start = time.time()
+        if scorer == "fast":
+            # --- In-process evaluation ---
+            log.info(f"Starting in-process retrieval evaluation of model={model_id}...")
+            run_fast_retrieval_evaluation(task, model_with_cache, model_with_cache_path, task_name, config,
+                                          task_result_path)
+        else:
+            # --- MTEB Evaluation ---
+            log.info(f"Starting MTEB evaluation of model={model_id}...")
+            evaluation = mteb.MTEB(tasks=[task])
+            evaluation.run(
+                model=model_with_cache,
+                output_folder=str(config.output_dest),
+                overwrite_results=True,
+                config=config,
+            )
+
+        end = time.time()
+        log.info(f"Finished evaluation of model={model_id}.")
+        log.info(f"Time took for evaluation: {(end - start) / 60:.2f} minutes")
+
+        log.info("Computing MTEB Leaderboard comparison metrics...")
+
+        # --- Compute MTEB Leaderboard model comparison and add them to the custom task result file ---
+        mteb_comparison_metrics: dict = compute_mteb_leaderboard_comparison(model_id, model_averages)
+        mteb_comparison_metrics = _add_mteb_leaderboard_comparison_metrics(task_result_path, mteb_comparison_metrics)
+
+        # --- Quantization / truncated dimensions, on the cached embeddings (before the writer closes the cache) ---
+        if config.quantizations or config.truncate_dims:
+            _write_cached_embedding_reports(config, model_with_cache, model_with_cache_path, task_name,
+                                            task_result_path)
+
+        # --- Write embeddings ---
+        writer = EmbeddingWriter(
+            corpus_path=config.corpus_path,
+            queries_path=config.queries_path,
+            cached=model_with_cache,
+            cache_path=model_with_cache_path,
+            task_name=task_name,
+            batch_size=256,
+        )
+        writer.write(embeddings_dest)
+    finally:
+        if isinstance(model, ShardedEncoder):
+            model.close()
+
+    return {
+        "model": model_id,
+        "custom_task_main_score": mteb_comparison_metrics["user_model_custom_task_main_score"],
+        "mteb_avg_main_score": mteb_comparison_metrics["user_model_mteb_avg_main_score"],
+        "evaluation_minutes": round((end - start) / 60, 2),
+        "result_path": str(task_result_path),
+    }
+
+
+def _write_cached_embedding_reports(config: Config, cached: Any, cache_path: Path, task_name: str,
+                                    task_result_path: Path) -> list[Path]:
+    """
+    Score the cached embeddings with the configured precisions (<task_name>_quantization.json) and truncated
+    dimensions (<task_name>_dimension_sweep.json), reports are written next to the task result.
+    The corpus/query matrices are loaded once for both.
+    """
+    if config.task_to_evaluate != "retrieval":
+        log.warning("Quantization and truncated dimensions evaluations are only available for the retrieval task, "
+                    "skipped")
+        return []
+
+    data = load_retrieval_data(cached, cache_path, task_name, config.corpus_path, config.queries_path,
+                               config.candidates_path)
+    reports: dict[str, dict] = {}
+    if config.quantizations:
+        reports["quantization"] = evaluate_quantizations(data, list(config.quantizations))
+    if config.truncate_dims:
+        reports["dimension_sweep"] = evaluate_truncations(data, config.truncate_dims)
+
+    report_paths = []
+    for name, report in reports.items():
+        report_path = task_result_path.with_name(f"{task_name}_{name}.json")
+        with report_path.open("w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        log.info(f"{name.replace('_', ' ').capitalize()} report saved into {report_path}")
+        report_paths.append(report_path)
+    return report_paths
+
+
+def _write_model_comparison(rows: list[dict], output_dest: Path, task_name: str) -> Path:
+    """
+    Write the comparison table of all evaluated models, best custom task main_score first, to
+    <output_dest>/<task_name>_model_comparison.json and log it.
+    """
+    rows = sorted(rows, key=lambda row: row["custom_task_main_score"], reverse=True)
+    comparison_path = output_dest / f"{task_name}_model_comparison.json"
+    comparison_path.parent.mkdir(parents=True, exist_ok=True)
+    with comparison_path.open("w", encoding="utf-8") as file:
+        json.dump({"task": task_name, "models": rows}, file, indent=2, ensure_ascii=False)
+
+    width = max(len(row["model"]) for row in rows)
+    log.info(f"{'model':<{width}} | custom_task_main_score | mteb_avg_main_score")
+    for row in rows:
+        log.info(f"{row['model']:<{width}} | {row['custom_task_main_score']:>22.2f} | "
+                 f"{row['mteb_avg_main_score']:>19.2f}")
+    log.info(f"Model comparison saved into {comparison_path}")
+    return comparison_path
+
+
 def main() -> None:
     args = _parse_args()
     setup_logging(args.verbose)
     config: Config = Config.load(args.config)
 
     # --- Sanity logs (explicit & helpful) ---
-    log.info("MTEB run → task=%s | dataset=%s | split=%s | model=%s",
-             config.task_to_evaluate, config.dataset_name, config.split, config.model_id)
+    log.info("MTEB run → task=%s | dataset=%s | split=%s | models=%s",
+             config.task_to_evaluate, config.dataset_name, config.split, ", ".join(config.model_ids))
 
-    # --- Model + caching wrapper ---
-    model = mteb.get_model(config.model_id, trust_remote_code=True)
     task_name = TASKS_NAME_MAPPING.get(config.task_to_evaluate, None)
     if task_name is None:
         log.error("Custom task name is not defined: %s", task_name)
@@ -196,59 +321,54 @@ def main() -> None:
     if config.output_dest is None:
         raise ValueError("config.output_dest is not set, default_dir must be `resources`")
 
-    model_name_additional_path = config.model_id.replace("/", "__").replace(" ", "_")
-    model_with_cache_path = CACHE_PATH / model_name_additional_path
+    scorer = args.scorer
+    if scorer == "fast" and config.task_to_evaluate != "retrieval":
+        log.warning("The in-process scorer is only available for the retrieval task, using MTEB")
+        scorer = "mteb"
 
-    log.debug(f"Using embedding cache at {model_with_cache_path}")
-    model_with_cache = CachedEmbeddingWrapper(model, cache_path=model_with_cache_path)
-
-    # --- Task instance (in-memory) ---
+    # --- Task instance (in-memory), data loaded once and shared by every model ---
     try:
         task = _build_task(
             task_name=task_name,
             dataset_name=config.dataset_name,
             split=config.split,
         )
+        task.load_data(config=config)
     except Exception as e:
         log.error("Failed to build MTEB task: %s", e)
         raise ValueError("Failed to build MTEB task.")
 
-    # --- MTEB Evaluation ---
-    log.info("Starting MTEB evaluation...")
-    start = time.time()
-    evaluation = mteb.MTEB(tasks=[task])
-    evaluation.run(
-        model=model_with_cache,
-        output_folder=str(config.output_dest),
-        overwrite_results=True,
-        config=config,
-    )
-
-    end = time.time()
-    log.info("Finished MTEB evaluation.")
-    log.info(f"Time took for MTEB evaluation: {(end - start) / 60:.2f} minutes")
-
-    log.info("Computing MTEB Leaderboard comparison metrics...")
-
-    # task result is in {output_folder} / {model_name} / {model_revision} / {task_name}.json
-    task_result_path: Path = (config.output_dest / model_name_additional_path /
-                              mteb.get_model_meta(config.model_id).revision / f"{task_name}.json")
-
-    # --- Compute MTEB Leaderboard model comparison and add them to the custom task result file ---
-    mteb_comparison_metrics: dict = compute_mteb_leaderboard_comparison(config.model_id,
-                                                                        config.task_to_evaluate.capitalize())
-    _add_mteb_leaderboard_comparison_metrics(task_result_path, mteb_comparison_metrics)
-
-    # --- Write embeddings ---
-    writer = EmbeddingWriter(
-        corpus_path=config.corpus_path,
-        queries_path=config.queries_path,
-        cached=model_with_cache,
-        cache_path=model_with_cache_path,
-        task_name=task_name,
-        batch_size=256,
-    )
-    writer.write(config.embeddings_dest)
+    # --- MTEB Leaderboard averages, loaded once for all models ---
+    model_averages = load_leaderboard_averages(config.task_to_evaluate.capitalize(),
+                                               ttl_hours=config.leaderboard_ttl_hours,
+                                               offline=config.offline)
+
+    # with several models, embeddings are written into one sub folder per model
+    def _embeddings_dest(model_id: str) -> Optional[Path]:
+        if len(config.model_ids) == 1:
+            return config.embeddings_dest
+        base = config.embeddings_dest if config.embeddings_dest is not None else Path("resources/embeddings")
+        return base / model_id.replace("/", "__").replace(" ", "_")
+
+    if config.num_model_workers > 1 and len(config.model_ids) > 1:
+        # spawn: each worker gets a fresh interpreter with its own model copy and embedding cache
+        workers = min(config.num_model_workers, len(config.model_ids))
+        log.info(f"Evaluating {len(config.model_ids)} models with {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(_evaluate_model, model_id, task, task_name, config, model_averages,
+                            _embeddings_dest(model_id), args.verbose, scorer)
+                for model_id in config.model_ids
+            ]
+            rows = [future.result() for future in futures]
+    else:
+        rows = [
+            _evaluate_model(model_id, task, task_name, config, model_averages, _embeddings_dest(model_id),
+                            args.verbose, scorer)
+            for model_id in config.model_ids
+        ]
+
+    _write_model_comparison(rows, config.output_dest, task_name)
 
 
 if __name__ == "__main__":
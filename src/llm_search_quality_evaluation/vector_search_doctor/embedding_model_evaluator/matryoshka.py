@@ -0,0 +1,63 @@
+"""
+Truncated-dimension (Matryoshka) sweep: score the cached embeddings keeping only their first `dim` dimensions,
+renormalized, without re-encoding, and report the quality-vs-dimension curve.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import numpy as np
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.retrieval_scorer import (
+    RetrievalData, evaluate_rankings, normalize, top_k
+)
+
+log = logging.getLogger(__name__)
+
+SWEEP_K_VALUES = (10, 100)
+
+
+def truncate(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """First `dim` dimensions of every vector, L2-renormalized."""
+    return normalize(vectors[:, :dim])
+
+
+def evaluate_truncations(
+        data: RetrievalData,
+        dims: list[int],
+        k_values: tuple[int, ...] = SWEEP_K_VALUES,
+) -> dict[str, Any]:
+    """
+    Rerun exact cosine retrieval for the full dimension and every truncated dimension, smallest first.
+    Dimensions not smaller than the model dimension are skipped.
+    """
+    full_dim = data.dimension
+    skipped = sorted({dim for dim in dims if dim >= full_dim})
+    if skipped:
+        log.warning(f"Truncated dimensions {skipped} are not smaller than the model dimension {full_dim}, skipped")
+    sweep = sorted({dim for dim in dims if dim < full_dim}) + [full_dim]
+
+    curve: list[dict[str, Any]] = []
+    for dim in sweep:
+        log.info(f"Scoring embeddings truncated to {dim} dimensions...")
+        ranked, _ = top_k(truncate(data.query_vectors, dim), truncate(data.doc_vectors, dim), max(k_values))
+        metrics = evaluate_rankings(ranked, data.query_ids, data.doc_ids, data.relevant_docs, k_values,
+                                    metrics=("ndcg", "recall"))
+        curve.append({"dimension": dim, "bytes_per_vector": 4 * dim, **metrics})
+
+    full = curve[-1]
+    for point in curve:
+        point.update({f"{name}_delta": point[name] - full[name] for name in full
+                      if name.startswith(("ndcg", "recall"))})
+
+    metric = f"ndcg_at_{min(k_values)}"
+    for point in curve:
+        log.info(f"{point['dimension']:>6} dims | {metric}={point[metric]:.4f} ({point[f'{metric}_delta']:+.4f})")
+    return {
+        "dimension": full_dim,
+        "num_documents": len(data.doc_ids),
+        "num_queries": len(data.query_ids),
+        "similarity": "cosine",
+        "curve": curve,
+    }
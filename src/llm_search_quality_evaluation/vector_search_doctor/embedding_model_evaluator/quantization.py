@@ -0,0 +1,119 @@
+"""
+Quantized embedding evaluation: score the cached float embeddings as float16, int8 (scalar quantization) and binary
+vectors, without re-encoding, and compare them with full precision.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import numpy as np
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.retrieval_scorer import (
+    RetrievalData, Similarity, dot_similarity, evaluate_rankings, normalize, top_k
+)
+
+log = logging.getLogger(__name__)
+
+QUANTIZATION_K_VALUES = (10, 100)
+# binary vectors compare (query block × doc block × bytes), smaller doc blocks keep it bounded
+BINARY_DOC_BLOCK_SIZE = 4096
+
+# number of set bits of every byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def int8_ranges(calibration: np.ndarray) -> np.ndarray:
+    """Per-dimension (min, max) of the calibration vectors, shape (2, dim)."""
+    return np.stack([calibration.min(axis=0), calibration.max(axis=0)])
+
+
+def quantize_int8(vectors: np.ndarray, ranges: np.ndarray) -> np.ndarray:
+    """Scalar quantization: map every dimension from its [min, max] range to the 256 int8 buckets."""
+    widths = ranges[1] - ranges[0]
+    widths = np.where(widths == 0, 1, widths)
+    buckets = np.floor((vectors - ranges[0]) / widths * 255) - 128
+    quantized: np.ndarray = np.clip(buckets, -128, 127).astype(np.int8)
+    return quantized
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """One bit per dimension (value > 0), packed into uint8."""
+    return np.packbits(vectors > 0, axis=1)
+
+
+def hamming_similarity(queries: np.ndarray, docs: np.ndarray) -> np.ndarray:
+    """Negated Hamming distance between packed binary vectors (higher is more similar)."""
+    distances: np.ndarray = _POPCOUNT[np.bitwise_xor(queries[:, None, :], docs[None, :, :])].sum(axis=2, dtype=np.int32)
+    return -distances
+
+
+def bytes_per_vector(precision: str, dimension: int) -> int:
+    if precision == "float32":
+        return 4 * dimension
+    if precision == "float16":
+        return 2 * dimension
+    if precision == "int8":
+        return dimension
+    if precision == "binary":
+        return (dimension + 7) // 8
+    raise ValueError(f"Unknown precision: {precision}")
+
+
+def _quantized(precision: str, queries: np.ndarray, docs: np.ndarray) -> tuple[np.ndarray, np.ndarray, Similarity]:
+    if precision == "float16":
+        return queries.astype(np.float16), docs.astype(np.float16), dot_similarity
+    if precision == "int8":
+        # queries are quantized with the corpus calibration ranges
+        ranges = int8_ranges(docs)
+        return quantize_int8(queries, ranges), quantize_int8(docs, ranges), dot_similarity
+    if precision == "binary":
+        return quantize_binary(queries), quantize_binary(docs), hamming_similarity
+    raise ValueError(f"Unknown precision: {precision}")
+
+
+def evaluate_quantizations(
+        data: RetrievalData,
+        precisions: list[str],
+        k_values: tuple[int, ...] = QUANTIZATION_K_VALUES,
+) -> dict[str, Any]:
+    """
+    Rerun exact retrieval with every requested precision and report nDCG/recall, their deltas against full precision
+    (float32, cosine similarity) and the memory per vector.
+    """
+    queries, docs = normalize(data.query_vectors), normalize(data.doc_vectors)
+    max_k = max(k_values)
+
+    def _score(q: np.ndarray, d: np.ndarray, similarity: Similarity, **kwargs: Any) -> dict[str, float]:
+        ranked, _ = top_k(q, d, max_k, similarity=similarity, **kwargs)
+        return evaluate_rankings(ranked, data.query_ids, data.doc_ids, data.relevant_docs, k_values,
+                                 metrics=("ndcg", "recall"))
+
+    baseline = _score(queries, docs, dot_similarity)
+    results: dict[str, Any] = {
+        "float32": {"bytes_per_vector": bytes_per_vector("float32", data.dimension), **baseline}
+    }
+
+    for precision in precisions:
+        log.info(f"Scoring {precision} embeddings...")
+        q, d, similarity = _quantized(precision, queries, docs)
+        block_kwargs: dict[str, Any] = {"doc_block_size": BINARY_DOC_BLOCK_SIZE} if precision == "binary" else {}
+        metrics = _score(q, d, similarity, **block_kwargs)
+        deltas = {f"{name}_delta": value - baseline[name] for name, value in metrics.items()}
+        results[precision] = {"bytes_per_vector": bytes_per_vector(precision, data.dimension), **metrics, **deltas}
+
+    _log_summary(results, f"ndcg_at_{min(k_values)}")
+    return {
+        "dimension": data.dimension,
+        "num_documents": len(data.doc_ids),
+        "num_queries": len(data.query_ids),
+        "similarity": "cosine",
+        "results": results,
+    }
+
+
+def _log_summary(results: dict[str, Any], metric: str) -> None:
+    for precision, values in results.items():
+        delta = values.get(f"{metric}_delta", 0.0)
+        log.info(f"{precision:>8} | {values['bytes_per_vector']:>6} bytes/vector | {metric}={values[metric]:.4f} "
+                 f"({delta:+.4f})")
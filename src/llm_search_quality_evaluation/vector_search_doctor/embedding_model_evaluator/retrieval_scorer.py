@@ -0,0 +1,257 @@
+"""
+Exact (brute-force) retrieval scoring on in-memory embedding matrices.
+
+- Top-k documents per query with blocked similarity and `argpartition`, so memory stays bounded by the block sizes.
+- IR metrics (nDCG@k, MAP@k, recall@k, precision@k, MRR@k) computed in vectorized form from the ranked document
+  indices, with the same definitions as trec_eval/MTEB.
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+import numpy as np
+import torch
+from mteb.encoder_interface import PromptType
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import (
+    DEFAULT_QUERY_BLOCK_SIZE, DEFAULT_DOC_BLOCK_SIZE, RETRIEVAL_K_VALUES
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.embedding_cache import encode_with_cache
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.utils import (
+    read_candidates, read_corpus_texts, read_queries
+)
+
+log = logging.getLogger(__name__)
+
+Similarity = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+RETRIEVAL_METRICS = ("ndcg", "map", "recall", "precision", "mrr")
+
+
+class RetrievalData:
+    """Corpus/query embedding matrices (rows aligned with the ids) and the relevant docs of every query."""
+
+    def __init__(
+            self,
+            doc_ids: list[str],
+            doc_vectors: np.ndarray,
+            query_ids: list[str],
+            query_vectors: np.ndarray,
+            relevant_docs: Mapping[str, Mapping[str, int]],
+    ):
+        self.doc_ids = doc_ids
+        self.doc_vectors = doc_vectors
+        self.query_ids = query_ids
+        self.query_vectors = query_vectors
+        self.relevant_docs = relevant_docs
+
+    @property
+    def dimension(self) -> int:
+        return int(self.doc_vectors.shape[1])
+
+
+def load_retrieval_data(
+        cached: Any,
+        cache_path: Path,
+        task_name: str,
+        corpus_path: Path,
+        queries_path: Path,
+        candidates_path: Path,
+        batch_size: int = 256,
+) -> RetrievalData:
+    """
+    Build the corpus/query matrices from the embedding cache (texts missing from the cache are encoded by the cached
+    wrapper). Only queries with at least one relevant document are kept, as in the MTEB evaluation.
+    """
+    relevant_docs = read_candidates(candidates_path).view(min_rating=1)
+
+    doc_dict = read_corpus_texts(corpus_path, task_name)
+    doc_ids = list(doc_dict.keys())
+    doc_vectors = encode_with_cache(cached, cache_path, task_name, [doc_dict[_id] for _id in doc_ids],
+                                    batch_size, "documents", prompt_type=PromptType.document)
+
+    query_dict = read_queries(queries_path)
+    query_ids = [qid for qid in query_dict if relevant_docs.get(qid)]
+    query_vectors = encode_with_cache(cached, cache_path, task_name, [query_dict[qid] for qid in query_ids],
+                                      batch_size, "queries", prompt_type=PromptType.query)
+
+    return RetrievalData(doc_ids, np.asarray(doc_vectors, dtype=np.float32), query_ids,
+                         np.asarray(query_vectors, dtype=np.float32), relevant_docs)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (cosine similarity becomes a dot product), zero vectors are left untouched."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    normalized: np.ndarray = vectors / np.where(norms == 0, 1, norms)
+    return normalized
+
+
+def dot_similarity(queries: np.ndarray, docs: np.ndarray) -> np.ndarray:
+    return np.asarray(queries, dtype=np.float32) @ np.asarray(docs, dtype=np.float32).T
+
+
+def model_similarity(model: Any) -> Similarity:
+    """
+    Similarity used by the MTEB retrieval evaluator: the model `similarity` function if it has one, cosine otherwise.
+    Computed with torch as in MTEB (NaN scores become -1), so scores are the same.
+    """
+    similarity_fn = getattr(model, "similarity", None)
+
+    def _similarity(queries: np.ndarray, docs: np.ndarray) -> np.ndarray:
+        q, d = torch.from_numpy(np.ascontiguousarray(queries)), torch.from_numpy(np.ascontiguousarray(docs))
+        if callable(similarity_fn):
+            scores = similarity_fn(q, d)
+        else:
+            scores = torch.mm(torch.nn.functional.normalize(q, p=2, dim=1),
+                              torch.nn.functional.normalize(d, p=2, dim=1).transpose(0, 1))
+        scores = torch.as_tensor(scores)
+        scores[torch.isnan(scores)] = -1
+        result: np.ndarray = scores.cpu().numpy()
+        return result
+
+    return _similarity
+
+
+def top_k(
+        queries: np.ndarray,
+        docs: np.ndarray,
+        k: int,
+        similarity: Similarity = dot_similarity,
+        query_block_size: int = DEFAULT_QUERY_BLOCK_SIZE,
+        doc_block_size: int = DEFAULT_DOC_BLOCK_SIZE,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the indices and scores of the k best documents per query, best first.
+    Similarities are computed one (query block × doc block) at a time and merged into a running top-k.
+    """
+    num_queries, num_docs = len(queries), len(docs)
+    k = min(k, num_docs)
+    indices = np.empty((num_queries, k), dtype=np.int64)
+    scores = np.empty((num_queries, k), dtype=np.float32)
+
+    for q_start in range(0, num_queries, query_block_size):
+        q_end = min(q_start + query_block_size, num_queries)
+        best_scores: np.ndarray = np.empty((q_end - q_start, 0), dtype=np.float32)
+        best_indices: np.ndarray = np.empty((q_end - q_start, 0), dtype=np.int64)
+
+        for d_start in range(0, num_docs, doc_block_size):
+            d_end = min(d_start + doc_block_size, num_docs)
+            block_scores = np.asarray(similarity(queries[q_start:q_end], docs[d_start:d_end]), dtype=np.float32)
+            block_indices = np.broadcast_to(np.arange(d_start, d_end), block_scores.shape)
+
+            best_scores = np.concatenate([best_scores, block_scores], axis=1)
+            best_indices = np.concatenate([best_indices, block_indices], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_indices = np.take_along_axis(best_indices, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        scores[q_start:q_end] = np.take_along_axis(best_scores, order, axis=1)
+        indices[q_start:q_end] = np.take_along_axis(best_indices, order, axis=1)
+
+    return indices, scores
+
+
+def trec_order(indices: np.ndarray, scores: np.ndarray, doc_ids: list[str]) -> np.ndarray:
+    """
+    Reorder every row of top-k documents as trec_eval ranks them: score descending, ties by document id descending.
+    """
+    doc_rank = np.empty(len(doc_ids), dtype=np.int64)
+    doc_rank[np.argsort(np.asarray(doc_ids, dtype=object), kind="stable")] = np.arange(len(doc_ids))
+    order = np.lexsort((-doc_rank[indices], -scores.astype(np.float64)), axis=1)
+    reordered: np.ndarray = np.take_along_axis(indices, order, axis=1)
+    return reordered
+
+
+def _qrels_arrays(
+        query_ids: list[str], doc_ids: list[str], relevant_docs: Mapping[str, Mapping[str, int]]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Relevant (query row, doc row, rating) triplets, ratings > 0 only. Relevant docs missing from the corpus get doc
+    row -1: they can't be retrieved but still count in recall and ideal DCG, as in trec_eval.
+    """
+    doc_index = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+    q_rows, d_rows, ratings = [], [], []
+    for q_row, query_id in enumerate(query_ids):
+        for doc_id, rating in relevant_docs.get(query_id, {}).items():
+            if rating > 0:
+                q_rows.append(q_row)
+                d_rows.append(doc_index.get(doc_id, -1))
+                ratings.append(rating)
+    return (np.asarray(q_rows, dtype=np.int64), np.asarray(d_rows, dtype=np.int64),
+            np.asarray(ratings, dtype=np.float64))
+
+
+def evaluate_rankings(
+        ranked: np.ndarray,
+        query_ids: list[str],
+        doc_ids: list[str],
+        relevant_docs: Mapping[str, Mapping[str, int]],
+        k_values: tuple[int, ...] = RETRIEVAL_K_VALUES,
+        metrics: tuple[str, ...] = RETRIEVAL_METRICS,
+) -> dict[str, float]:
+    """
+    Compute the IR metrics at every k, averaged over the queries with at least one relevant document:
+    nDCG (linear gains), MAP (divided by the number of relevant docs), recall, precision (divided by k) as trec_eval,
+    and MRR as MTEB.
+
+    :param ranked: (num_queries, k) document row indices, best first, rows aligned with `query_ids`
+    :param metrics: metrics to compute, among RETRIEVAL_METRICS
+    """
+    num_queries, num_docs = len(query_ids), len(doc_ids)
+    q_rows, d_rows, ratings = _qrels_arrays(query_ids, doc_ids, relevant_docs)
+    num_relevant = np.bincount(q_rows, minlength=num_queries)
+    evaluated = num_relevant > 0
+    if not evaluated.any():
+        return {}
+
+    # gains of the ranked docs, looked up in the sorted (query, doc) keys of the qrels
+    in_corpus = d_rows >= 0
+    keys = q_rows[in_corpus] * num_docs + d_rows[in_corpus]
+    order = np.argsort(keys)
+    keys, sorted_ratings = keys[order], ratings[in_corpus][order]
+    if not len(keys):
+        keys, sorted_ratings = np.array([-1], dtype=np.int64), np.zeros(1)
+    ranked_keys = np.arange(num_queries)[:, None] * num_docs + ranked
+    positions = np.minimum(np.searchsorted(keys, ranked_keys), len(keys) - 1)
+    gains = np.where(keys[positions] == ranked_keys, sorted_ratings[positions], 0.0)
+
+    # ideal ranking: ratings sorted desc inside every query
+    ideal_order = np.lexsort((-ratings, q_rows))
+    ideal_q, ideal_ratings = q_rows[ideal_order], ratings[ideal_order]
+    first_of_query = np.searchsorted(ideal_q, ideal_q, side="left")
+    ideal_rank = np.arange(len(ideal_q)) - first_of_query
+
+    ranks = np.arange(1, ranked.shape[1] + 1)
+    discounts = 1.0 / np.log2(ranks + 1)
+    is_hit = gains > 0
+    # precision at every rank where a relevant doc is retrieved, 0 elsewhere
+    hit_precisions = np.where(is_hit, np.cumsum(is_hit, axis=1) / ranks, 0.0)
+    first_hit = np.where(is_hit.any(axis=1), is_hit.argmax(axis=1) + 1, np.iinfo(np.int64).max)
+
+    scores: dict[str, float] = {}
+    for k in k_values:
+        top_gains = gains[:, :k]
+        hits = is_hit[:, :k].sum(axis=1)
+        values: dict[str, np.ndarray] = {}
+        if "ndcg" in metrics:
+            dcg = (top_gains * discounts[:top_gains.shape[1]]).sum(axis=1)
+            in_ideal = ideal_rank < k
+            idcg = np.bincount(ideal_q[in_ideal], weights=ideal_ratings[in_ideal] / np.log2(ideal_rank[in_ideal] + 2),
+                               minlength=num_queries)
+            values["ndcg"] = np.divide(dcg, idcg, out=np.zeros_like(dcg), where=idcg > 0)
+        if "map" in metrics:
+            values["map"] = hit_precisions[:, :k].sum(axis=1) / np.maximum(num_relevant, 1)
+        if "recall" in metrics:
+            values["recall"] = hits / np.maximum(num_relevant, 1)
+        if "precision" in metrics:
+            values["precision"] = hits / k
+        if "mrr" in metrics:
+            values["mrr"] = np.where(first_hit <= k, 1.0 / np.minimum(first_hit, k), 0.0)
+        for metric in metrics:
+            scores[f"{metric}_at_{k}"] = float(values[metric][evaluated].mean())
+    return scores
@@ -11,7 +11,12 @@ Outputs to <out_root>/<dataset>/<split>/:
 Features:
 - Cross-platform (uses pathlib); no shell specifics.
 - Deterministic caps by qrels encounter order (if provided).
-- Optional synthetic negatives: random with safeguards.
+- Optional synthetic negatives: random with safeguards, seeded and independent of hash ordering,
+  or hard negatives (top-ranked non-relevant docs of a local BM25 / embedding index over the exported corpus).
+- Streaming: every file is written while its source is read; pairs are indexed per query
+  (query id -> set of doc ids), so dedup and negative sampling never scan all pairs/docs.
+- Fast loading: qrels/corpus/queries are loaded concurrently and iterated in Arrow batches
+  (optionally normalized by `datasets.map` over --num-proc processes).
 - Light-weight validations and clear logging.
 """
 
@@ -20,8 +25,13 @@ import json
 import logging
 import random
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Iterator, Optional, Set, Tuple, List
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple, List
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.hard_negatives import (
+    BM25Index, NegativeIndex, VectorIndex, mine_hard_negatives
+)
 
 # ========= DEFAULTS / PATHS =========
 # Default out root aligned with embedding-model-evaluator/resources/mteb_datasets
@@ -31,10 +41,16 @@ DEFAULT_SPLIT = "test"    # "train" | "dev" | "test"
 DEFAULT_OVERWRITE = False
 DEFAULT_MAX_QUERIES = 0   # 0 = no cap
 DEFAULT_MAX_DOCS = 0      # 0 = no cap
+DEFAULT_BATCH_SIZE = 10_000  # rows per Arrow batch when iterating the HF datasets
+DEFAULT_NUM_PROC = 0         # >1: normalize the HF datasets with datasets.map over num_proc processes
 
 # ---- Negative sampling (minimal) ----
 DEFAULT_NEGATIVE_PER_QUERY = 0   # 0 disables negatives
 DEFAULT_RNG_SEED = 42
+DEFAULT_NEGATIVE_STRATEGY = "random"   # "random" | "bm25" | "embedding"
+DEFAULT_NEGATIVE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_NEGATIVE_BATCH_SIZE = 256      # queries ranked together
+DEFAULT_NEGATIVE_WORKERS = 4           # query batches ranked in parallel
 
 # ===============================================
 
@@ -71,8 +87,21 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--max-docs", type=int, default=DEFAULT_MAX_DOCS, help="0 = no cap")
     p.add_argument("--max-queries", type=int, default=DEFAULT_MAX_QUERIES, help="0 = no cap")
     p.add_argument("--negatives-per-query", type=int, default=DEFAULT_NEGATIVE_PER_QUERY,
-                   help="Quota of random negatives to add per kept query (0 disables)")
+                   help="Quota of negatives to add per kept query (0 disables)")
+    p.add_argument("--negative-strategy", default=DEFAULT_NEGATIVE_STRATEGY, choices=["random", "bm25", "embedding"],
+                   help="random: uniform over the corpus; bm25/embedding: top-ranked non-relevant docs of a local "
+                        "index over the exported corpus (hard negatives)")
+    p.add_argument("--negative-model", default=DEFAULT_NEGATIVE_MODEL,
+                   help="Sentence-transformers model of the 'embedding' strategy")
+    p.add_argument("--negative-batch-size", type=int, default=DEFAULT_NEGATIVE_BATCH_SIZE,
+                   help="Queries ranked together by the hard-negative strategies")
+    p.add_argument("--negative-workers", type=int, default=DEFAULT_NEGATIVE_WORKERS,
+                   help="Query batches ranked in parallel by the hard-negative strategies")
     p.add_argument("--seed", type=int, default=DEFAULT_RNG_SEED, help="Random seed for determinism")
+    p.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                   help="Rows per Arrow batch when iterating the HF datasets")
+    p.add_argument("--num-proc", type=int, default=DEFAULT_NUM_PROC,
+                   help="Processes normalizing the HF datasets with datasets.map (0/1 = while iterating)")
     return p.parse_args()
 
 # ------------------------- validation -------------------------
@@ -87,6 +116,16 @@ def validate_args(args: argparse.Namespace) -> None:
         errs.append("--negatives-per-query must be >= 0")
     if args.seed < 0:
         errs.append("--seed must be >= 0")
+    if args.batch_size <= 0:
+        errs.append("--batch-size must be > 0")
+    if args.num_proc < 0:
+        errs.append("--num-proc must be >= 0")
+    if args.negative_batch_size <= 0:
+        errs.append("--negative-batch-size must be > 0")
+    if args.negative_workers <= 0:
+        errs.append("--negative-workers must be > 0")
+    if args.negative_strategy != "random" and args.negatives_per_query == 0:
+        errs.append(f"--negative-strategy {args.negative_strategy} requires --negatives-per-query > 0")
     if errs:
         for e in errs:
             log.error(e)
@@ -144,21 +183,86 @@ def ensure_outputs(out_dir: Path, overwrite: bool) -> Tuple[Path, Path, Path, Pa
         raise SystemExit(1)
     return corpus, queries, candidates, manifest
 
+# ---------- batched normalization of the HF rows ----------
+# field name variants, in order of preference
+_DOC_ID_FIELDS = ("_id", "id")
+_DOC_TITLE_FIELDS = ("title", "Title", "headline", "name")
+_DOC_TEXT_FIELDS = ("text", "abstract", "contents", "body")
+_QUERY_ID_FIELDS = ("_id", "id", "query_id", "qid")
+_QRELS_QUERY_FIELDS = ("query-id", "query_id", "qid", "query")
+_QRELS_DOC_FIELDS = ("corpus-id", "doc_id", "document_id", "doc", "corpus_id")
+_QRELS_SCORE_FIELDS = ("score", "label", "relevance")
+
+BatchNormalizer = Callable[[Dict[str, List[Any]]], Dict[str, List[Any]]]
+
+def _coalesce(batch: Dict[str, List[Any]], fields: Tuple[str, ...], size: int) -> List[Any]:
+    """Column-wise `row.get(fields[0]) or row.get(fields[1]) or ...` over a batch of rows."""
+    columns = [batch.get(f) for f in fields]
+    present = [c for c in columns if c is not None]
+    if not present:
+        return [None] * size
+    if len(present) == 1 and columns[-1] is not None:
+        return list(present[0])
+    values: List[Any] = []
+    for i in range(size):
+        value = None
+        for column in columns:
+            value = column[i] if column is not None else None
+            if value:
+                break
+        values.append(value)
+    return values
+
+def _batch_size(batch: Dict[str, List[Any]]) -> int:
+    return len(next(iter(batch.values()))) if batch else 0
+
+def normalize_corpus_batch(batch: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """Normalize a batch of corpus rows into {id, title, text} columns (empty id: malformed row)."""
+    size = _batch_size(batch)
+    return {
+        "id": [to_string(v) for v in _coalesce(batch, _DOC_ID_FIELDS, size)],
+        "title": [normalize_text(v) for v in _coalesce(batch, _DOC_TITLE_FIELDS, size)],
+        "text": [normalize_text(v) for v in _coalesce(batch, _DOC_TEXT_FIELDS, size)],
+    }
+
+def normalize_queries_batch(batch: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """Normalize a batch of query rows into {id, text} columns (empty id: malformed row)."""
+    size = _batch_size(batch)
+    texts = batch.get("text") or [""] * size
+    return {
+        "id": [to_string(v) for v in _coalesce(batch, _QUERY_ID_FIELDS, size)],
+        "text": [normalize_text(v) for v in texts],
+    }
+
+def normalize_qrels_batch(batch: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """Normalize a batch of qrels rows into {query_id, doc_id, rating} columns (empty ids: malformed row)."""
+    size = _batch_size(batch)
+    return {
+        "query_id": [to_string(v) for v in _coalesce(batch, _QRELS_QUERY_FIELDS, size)],
+        "doc_id": [to_string(v) for v in _coalesce(batch, _QRELS_DOC_FIELDS, size)],
+        "rating": [to_int(v or 0) for v in _coalesce(batch, _QRELS_SCORE_FIELDS, size)],
+    }
+
 # ---------- loader adapted to MTEB/HF ----------
 class MtebLoader:
     """Thin wrapper over HF datasets for MTEB layout.
 
-    Loads 3 configs (default/corpus/queries) with appropriate splits:
+    Loads 3 configs (default/corpus/queries) with appropriate splits, concurrently:
       - default: train/dev/test (qrels)
       - corpus : typically the 'corpus' split (some datasets only expose this)
       - queries: train/dev/test (sometimes only 'test')
+
+    Rows are read in Arrow batches of `batch_size` and normalized column-wise; with `num_proc` > 1 the
+    normalization runs as a batched `datasets.map` over `num_proc` processes (cached by datasets).
     """
-    def __init__(self, ds_name: str, split: str):
+    def __init__(self, ds_name: str, split: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 num_proc: int = DEFAULT_NUM_PROC):
         self.task_name = ds_name
         self.split = split
+        self.batch_size = batch_size
+        self.num_proc = num_proc
         self._load_dataset = datasets.load_dataset
         self.hub_id = self._resolve_hub_id()
-
     def _resolve_hub_id(self) -> str:
         """Resolve the dataset ID from the task name."""
         # Try exact then lowercase variant
@@ -186,72 +290,127 @@ class MtebLoader:
         log.error("Split not available for %s/%s. Available splits: %s", self.hub_id, config_name, splits)
         raise SystemExit(1)
 
-    def load_three(self) -> Tuple[Any, Any, Any]:
-        """Load the three datasets."""
-        # qrels (default)
-        qrels_split = self._pick_split("default", [self.split, "test", "dev", "train"])
-        qrels   = self._load_dataset(self.hub_id, split=qrels_split)
-
-        # corpus (often only 'corpus' split)
-        corpus_split = self._pick_split("corpus", ["corpus", self.split, "test", "dev", "train"])
-        corpus  = self._load_dataset(self.hub_id, name="corpus", split=corpus_split)
+    def _load(self, config_name: str, preferred: List[str]) -> Tuple[Any, str]:
+        """Pick the split of a config and load it."""
+        split = self._pick_split(config_name, preferred)
+        name = None if config_name == "default" else config_name
+        return self._load_dataset(self.hub_id, name=name, split=split), split
 
-        # queries
-        queries_split = self._pick_split("queries", [self.split, "test", "dev", "train"])
-        queries = self._load_dataset(self.hub_id, name="queries", split=queries_split)
+    def load_three(self) -> Tuple[Any, Any, Any]:
+        """Load the three datasets, concurrently (download and Arrow conversion are mostly I/O and native code)."""
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # qrels (default)
+            qrels_job = executor.submit(self._load, "default", [self.split, "test", "dev", "train"])
+            # corpus (often only 'corpus' split)
+            corpus_job = executor.submit(self._load, "corpus", ["corpus", self.split, "test", "dev", "train"])
+            # queries
+            queries_job = executor.submit(self._load, "queries", [self.split, "test", "dev", "train"])
+            qrels, qrels_split = qrels_job.result()
+            corpus, corpus_split = corpus_job.result()
+            queries, queries_split = queries_job.result()
 
         log.info("HF hub_id=%s | splits → default:%s | corpus:%s | queries:%s",
                  self.hub_id, qrels_split, corpus_split, queries_split)
         return corpus, queries, qrels
 
+    def _iter_batches(self, ds: Any, normalize: BatchNormalizer) -> Iterator[Dict[str, List[Any]]]:
+        """Normalized column batches of a HF dataset (or of any iterable of row dicts)."""
+        if self.num_proc > 1 and hasattr(ds, "map"):
+            ds = ds.map(normalize, batched=True, batch_size=self.batch_size, num_proc=self.num_proc,
+                        remove_columns=ds.column_names, desc="Normalizing")
+            yield from ds.iter(batch_size=self.batch_size)
+        elif hasattr(ds, "iter"):
+            for batch in ds.iter(batch_size=self.batch_size):
+                yield normalize(batch)
+        else:
+            rows: List[Dict[str, Any]] = []
+            for row in ds:
+                rows.append(row)
+                if len(rows) == self.batch_size:
+                    yield normalize(self._to_columns(rows))
+                    rows = []
+            if rows:
+                yield normalize(self._to_columns(rows))
+
+    @staticmethod
+    def _to_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        names = {name: None for row in rows for name in row}
+        return {name: [row.get(name) for row in rows] for name in names}
+
     # Iterators robust to field name variants
     def iter_corpus(self, corpus_ds: Any) -> Iterator[Dict[str, Any]]:
         """Iterate over the corpus."""
-        for row in corpus_ds:
-            did = to_string(row.get("_id") or row.get("id"))
-            if not did:  # skip malformed
-                continue
-            title, text = normalize_doc(row)
-            yield {"id": did, "title": title, "text": text}
+        for batch in self._iter_batches(corpus_ds, normalize_corpus_batch):
+            for did, title, text in zip(batch["id"], batch["title"], batch["text"]):
+                if not did:  # skip malformed
+                    continue
+                yield {"id": did, "title": title, "text": text}
 
     def iter_queries_ds(self, queries_ds: Any) -> Iterator[Tuple[str, str]]:
         """Iterate over the queries."""
-        for row in queries_ds:
-            qid = to_string(row.get("_id") or row.get("id") or row.get("query_id") or row.get("qid"))
-            if not qid:
-                continue
-            yield qid, normalize_text(row.get("text", ""))
+        for batch in self._iter_batches(queries_ds, normalize_queries_batch):
+            for qid, text in zip(batch["id"], batch["text"]):
+                if not qid:
+                    continue
+                yield qid, text
 
     def iter_qrels(self, qrels_ds: Any) -> Iterator[Dict[str, Any]]:
         """Iterate over the qrels."""
-        for row in qrels_ds:
-            qid = to_string(row.get("query-id") or row.get("query_id") or row.get("qid") or row.get("query"))
-            did = to_string(row.get("corpus-id") or row.get("doc_id") or row.get("document_id") or row.get("doc") or row.get("corpus_id"))
-            if not qid or not did:
-                continue
-            rating = to_int(row.get("score") or row.get("label") or row.get("relevance") or 0)
-            yield {"query_id": qid, "doc_id": did, "rating": rating}
+        for batch in self._iter_batches(qrels_ds, normalize_qrels_batch):
+            for qid, did, rating in zip(batch["query_id"], batch["doc_id"], batch["rating"]):
+                if not qid or not did:
+                    continue
+                yield {"query_id": qid, "doc_id": did, "rating": rating}
 
 # ---------- negative sampling helper (random only) ----------
-def _sample_random(universe: List[str], banned: Set[str], k: int) -> List[str]:
-    """Sample k random documents excluding banned documents."""
-    avail = [d for d in universe if d not in banned]
-    if k <= 0 or not avail:
+def _sample_random(universe: List[str], banned: Set[str], k: int, rng: random.Random) -> List[str]:
+    """Sample k distinct random documents of universe excluding banned documents.
+
+    Rejection sampling against the banned set while at least half of the universe can be drawn (expected O(k));
+    otherwise the available documents are listed once and sampled.
+    """
+    if k <= 0 or not universe:
         return []
+    if len(banned) + k <= len(universe) // 2:
+        picked: Set[str] = set()
+        picks: List[str] = []
+        while len(picks) < k:
+            did = universe[rng.randrange(len(universe))]
+            if did in banned or did in picked:
+                continue
+            picked.add(did)
+            picks.append(did)
+        return picks
+    avail = [d for d in universe if d not in banned]
     if k >= len(avail):
-        random.shuffle(avail)
+        rng.shuffle(avail)
         return avail
-    return random.sample(avail, k)
+    return rng.sample(avail, k)
+
+# ---------- hard negatives helper (bm25 / embedding) ----------
+def _negative_index(strategy: str, model_name: str) -> Optional[NegativeIndex]:
+    """Empty index of the hard-negative strategy, filled while the corpus is written (None for random)."""
+    if strategy == "bm25":
+        return BM25Index()
+    if strategy == "embedding":
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_name)
+        return VectorIndex(lambda texts: model.encode(texts, convert_to_numpy=True, show_progress_bar=False))
+    return None
 
 # ---------- export ----------
 def do_export(ds_name: str, split: str, out_root: Path, overwrite: bool, max_q: int, max_d: int, *,
-              negatives_per_query: int, rng_seed: int) -> None:
+              negatives_per_query: int, rng_seed: int, negative_strategy: str = DEFAULT_NEGATIVE_STRATEGY,
+              negative_model: str = DEFAULT_NEGATIVE_MODEL, negative_batch_size: int = DEFAULT_NEGATIVE_BATCH_SIZE,
+              negative_workers: int = DEFAULT_NEGATIVE_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE,
+              num_proc: int = DEFAULT_NUM_PROC) -> None:
     """Export an MTEB dataset to JSONL files under out_root/dataset/split.
 
     This preserves all positive pairs, deduplicates candidate pairs, caps via qrels order,
-    and optionally appends synthetic negatives per query.
+    and optionally appends synthetic negatives per query: random ones, or the top-ranked non-relevant
+    docs of a BM25/embedding index (topped up with random ones when the index ranks too few docs).
     """
-    loader = MtebLoader(ds_name, split)
+    loader = MtebLoader(ds_name, split, batch_size=batch_size, num_proc=num_proc)
     corpus_ds, queries_ds, qrels_ds = loader.load_three()
 
     out_dir = out_root / ds_name / split
@@ -261,9 +420,9 @@ def do_export(ds_name: str, split: str, out_root: Path, overwrite: bool, max_q:
     keep_q: Optional[Set[str]] = set() if max_q > 0 else None
     keep_d: Optional[Set[str]] = set() if max_d > 0 else None
     pos_q: Set[str] = set()
-    pos_docs_by_q: Dict[str, Set[str]] = {}
     neg_count_by_q: Dict[str, int] = {}
-    pairs_seen: Set[Tuple[str, str]] = set()
+    # per-query pair index: query id -> doc ids already written to candidates
+    pairs_by_q: Dict[str, Set[str]] = {}
     qrels_total: int = 0
     cand_total: int = 0
     cand_pos: int = 0
@@ -286,16 +445,15 @@ def do_export(ds_name: str, split: str, out_root: Path, overwrite: bool, max_q:
                 keep_d.add(did)
 
             # dedupe (some datasets can repeat pairs)
-            key = (qid, did)
-            if key in pairs_seen:
+            q_docs = pairs_by_q.setdefault(qid, set())
+            if did in q_docs:
                 continue
-            pairs_seen.add(key)
+            q_docs.add(did)
 
             wr.write({"query_id": qid, "doc_id": did, "rating": rating})
             cand_total += 1
             if rating > 0:
                 pos_q.add(qid)
-                pos_docs_by_q.setdefault(qid, set()).add(did)
                 cand_pos += 1
             else:
                 neg_count_by_q[qid] = neg_count_by_q.get(qid, 0) + 1
@@ -305,7 +463,8 @@ def do_export(ds_name: str, split: str, out_root: Path, overwrite: bool, max_q:
         log.error("No candidate pairs after caps/filters. Check MAX_* or dataset/split.")
         raise SystemExit(1)
 
-    # -------- Step 2: write corpus; also collect IDs (+ tokens if BM25 will be used) --------
+    # -------- Step 2: write corpus; also collect IDs (in corpus order, the negatives pool) --------
+    index = _negative_index(negative_strategy, negative_model) if negatives_per_query > 0 else None
     wrote_docs = 0
     seen_docs: Set[str] = set()
     doc_id_list: List[str] = []
@@ -324,10 +483,14 @@ def do_export(ds_name: str, split: str, out_root: Path, overwrite: bool, max_q:
             wrote_docs += 1
 
             doc_id_list.append(did)
+            if index is not None:
+                index.add(did, f"{title} {text}")
 
     # -------- Step 3: write queries (only those with ≥1 positive & within caps) --------
     wrote_q = 0
     seen_q: Set[str] = set()
+    kept_queries: List[str] = []  # file order, so that sampling only depends on the seed
+    query_texts: List[str] = []   # aligned with kept_queries, hard-negative strategies only
     with jsonlines.open(queries_path, mode="w") as wr:
         for qid, qtext in loader.iter_queries_ds(queries_ds):
             if qid not in pos_q:  # only queries with positives
@@ -338,57 +501,62 @@ def do_export(ds_name: str, split: str, out_root: Path, overwrite: bool, max_q:
                 continue
             wr.write({"id": qid, "text": qtext or ""})
             seen_q.add(qid)
+            kept_queries.append(qid)
+            if index is not None:
+                query_texts.append(qtext or "")
             wrote_q += 1
 
     # -------- Step 4: add synthetic negatives (policy-driven), appending to candidates --------
     negatives_added = 0
+    hard_negatives_added = 0
     if negatives_per_query > 0 and wrote_q > 0:
-        # Negative candidate pool: restrict to kept docs if a doc cap was used, else all seen docs
-        candidate_pool = list(keep_d) if keep_d is not None else list(seen_docs)
+        # every pair of a query already written (positives included) is banned
+        needs = [max(negatives_per_query - neg_count_by_q.get(qid, 0), 0) for qid in kept_queries]
+        hard_picks: List[List[str]] = [[] for _ in kept_queries]
+        if index is not None:
+            index.build()
+            log.info("Mining %s hard negatives for %d queries (batches of %d, %d workers)...",
+                     negative_strategy, wrote_q, negative_batch_size, negative_workers)
+            hard_picks = mine_hard_negatives(index, query_texts, [pairs_by_q[qid] for qid in kept_queries], needs,
+                                             seed=rng_seed, batch_size=negative_batch_size, workers=negative_workers)
+
+        # Random negative pool: the exported corpus (within the doc cap, if any), in file order
+        rng = random.Random(rng_seed)
         with jsonlines.open(candidates_path, mode="a") as wr:
-            for qid in seen_q:
-                have_negs = neg_count_by_q.get(qid, 0)
-                need = negatives_per_query - have_negs
+            for qid, need, hard in zip(kept_queries, needs, hard_picks):
                 if need <= 0:
                     continue
 
-                banned = set(pos_docs_by_q.get(qid, set()))
-                # avoid duplicates across the whole file
-                banned.update({did for (qq, did) in pairs_seen if qq == qid})
-
-                picks: List[str] = _sample_random(candidate_pool, banned, need)
+                q_docs = pairs_by_q[qid]
+                q_docs.update(hard)
+                hard_negatives_added += len(hard)
+                picks: List[str] = hard + _sample_random(doc_id_list, q_docs, need - len(hard), rng)
 
                 # write them with rating=0
                 for did in picks:
-                    key = (qid, did)
-                    if key in pairs_seen:
-                        continue
                     wr.write({"query_id": qid, "doc_id": did, "rating": 0})
-                    pairs_seen.add(key)
+                    q_docs.add(did)
                     negatives_added += 1
                     cand_total += 1
                     cand_neg += 1
 
     # -------- Step 5: validations (minimal but useful) --------
     missing_docs = missing_queries = 0
-    dup_pairs = 0
-    # Quick referential integrity re-check by reading candidates once
-    seen_pairs_check: Set[Tuple[str, str]] = set()
+    # Quick referential integrity re-check by streaming the candidates once against the per-query index
+    rows_by_q: Dict[str, int] = {}
     with jsonlines.open(candidates_path, mode="r") as rd:
         for pair in rd:
             qid = to_string(pair.get("query_id"))
             did = to_string(pair.get("doc_id"))
-            key = (qid, did)
-            if key in seen_pairs_check:
-                dup_pairs += 1
-            else:
-                seen_pairs_check.add(key)
+            rows_by_q[qid] = rows_by_q.get(qid, 0) + 1
             if keep_d is not None and did not in seen_docs:
                 missing_docs += 1
             if qid not in seen_q:
                 # allow this ONLY if it’s an explicit negative for a query that didn’t pass caps,
                 # which we didn’t generate in our pipeline; treat as missing
                 missing_queries += 1
+    # rows beyond the distinct pairs of a query are duplicates
+    dup_pairs = sum(n - len(pairs_by_q.get(qid, ())) for qid, n in rows_by_q.items())
 
     # minimal checks: warn on suspicious outcomes
     if wrote_q == 0:
@@ -405,9 +573,13 @@ def do_export(ds_name: str, split: str, out_root: Path, overwrite: bool, max_q:
         "caps": {"max_docs": max_d, "max_queries": max_q},
         "negatives": {
             "used": bool(negatives_per_query > 0),
+            "strategy": negative_strategy,
+            "model": negative_model if negative_strategy == "embedding" else None,
             "per_query_quota": negatives_per_query,
             "rng_seed": rng_seed,
             "added_total": negatives_added,
+            "hard_added": hard_negatives_added,
+            "random_added": negatives_added - hard_negatives_added,
         },
         "counts": {
             "qrels_pairs_total": qrels_total,
@@ -446,7 +618,6 @@ def main() -> None:
     args = parse_args()
     setup_logging()
     validate_args(args)
-    random.seed(args.seed)
     out_root = Path(args.out_root) if args.out_root else DEFAULT_OUT_ROOT
     out_root.mkdir(parents=True, exist_ok=True)
     do_export(
@@ -458,6 +629,12 @@ def main() -> None:
         max_d=args.max_docs,
         negatives_per_query=args.negatives_per_query,
         rng_seed=args.seed,
+        negative_strategy=args.negative_strategy,
+        negative_model=args.negative_model,
+        negative_batch_size=args.negative_batch_size,
+        negative_workers=args.negative_workers,
+        batch_size=args.batch_size,
+        num_proc=args.num_proc,
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, Optional, Sequence
+
+import mteb
+import numpy as np
+import torch
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import DEFAULT_MIN_SHARD_SIZE
+
+log = logging.getLogger(__name__)
+
+ModelLoader = Callable[[str], Any]
+
+# model copy owned by a worker process, set by _init_worker
+_worker_model: Any = None
+
+
+def load_mteb_model(model_id: str) -> Any:
+    return mteb.get_model(model_id, trust_remote_code=True)
+
+
+def _to_numpy(vectors: Any) -> np.ndarray:
+    if isinstance(vectors, torch.Tensor):
+        vectors = vectors.cpu().numpy()
+    return np.asarray(vectors)
+
+
+def _init_worker(model_id: str, threads: int, model_loader: ModelLoader) -> None:
+    """Pin the worker thread pools (avoid oversubscription) and load its own model copy."""
+    global _worker_model
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    # shards are already encoded in parallel, no nested tokenizer parallelism
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    torch.set_num_threads(threads)
+    _worker_model = model_loader(model_id)
+
+
+def _encode_shard(texts: list[str], kwargs: dict[str, Any]) -> np.ndarray:
+    return _to_numpy(_worker_model.encode(texts, **kwargs))
+
+
+class ShardedEncoder:
+    """
+    Encoder splitting the texts to encode into contiguous shards, one per worker process. Each worker owns a copy of
+    the model with its torch/BLAS threads pinned to `threads_per_worker`, the shards embeddings are concatenated back
+    in the input order.
+    It is meant to be wrapped by mteb.CachedEmbeddingWrapper, so both the MTEB evaluation and the EmbeddingWriter
+    encode the corpus in parallel and the results are merged into the same cache.
+    Inputs smaller than `min_shard_size` are encoded in-process by the local model copy, which also provides every
+    other model attribute (mteb_model_meta, similarity, ...).
+    """
+
+    def __init__(
+            self,
+            model_id: str,
+            num_workers: int,
+            threads_per_worker: Optional[int] = None,
+            min_shard_size: int = DEFAULT_MIN_SHARD_SIZE,
+            model_loader: ModelLoader = load_mteb_model,
+    ):
+        if num_workers < 1:
+            raise ValueError("num_workers must be >= 1")
+        self.model_id = model_id
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+        self.min_shard_size = max(1, min_shard_size)
+        self.model_loader = model_loader
+        self._model = model_loader(model_id)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            log.info(f"Starting {self.num_workers} encoding workers with {self.threads_per_worker} threads each")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                # spawn: fork is unsafe once torch thread pools exist in the parent
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_id, self.threads_per_worker, self.model_loader),
+            )
+        return self._pool
+
+    def encode(self, texts: Sequence[str], **kwargs: Any) -> np.ndarray:
+        texts = list(texts)
+        num_shards = min(self.num_workers, math.ceil(len(texts) / self.min_shard_size))
+        if num_shards <= 1:
+            return _to_numpy(self._model.encode(texts, **kwargs))
+
+        bounds = np.linspace(0, len(texts), num_shards + 1, dtype=int)
+        shards = [texts[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        log.debug(f"Encoding {len(texts)} texts in {num_shards} shards")
+        # map keeps the shards order
+        vectors = list(self._get_pool().map(_encode_shard, shards, repeat(kwargs)))
+        return np.concatenate(vectors, axis=0)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __getattr__(self, name: str) -> Any:
+        # only called when the attribute is not found on the encoder itself
+        if name == "_model":
+            raise AttributeError(name)
+        return getattr(self._model, name)
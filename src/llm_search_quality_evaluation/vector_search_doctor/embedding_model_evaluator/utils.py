@@ -1,47 +1,62 @@
 from pathlib import Path
+from typing import Optional
+
+import pyarrow.compute as pc
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.columnar_loader import (
+    CORPUS_SCHEMA, QUERIES_SCHEMA, Candidates, load_candidates, read_jsonl_table
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import TASKS_NAME_MAPPING
+
+
+def compose_text(title: Optional[str], description: Optional[str]) -> str:
+    """Document text of the reranking task."""
+    if title and description:
+        return f"{title}\n\n{description}"
+    return title or description or ""
+
+
+def compose_retrieval_text(title: Optional[str], text: Optional[str]) -> str:
+    """Document text of the retrieval task (MTEB corpus format)."""
+    return (title or "") + " " + (text or "")
 
-from jsonlines import jsonlines
 
 def read_corpus_reranking(path: Path) -> dict[str, dict[str, str]]:
-    corpus_dict: dict[str, dict[str, str]] = {}
-    with jsonlines.open(path) as rows:
-        for row in rows:
-            corpus_dict[row["id"]] = {"title": row["title"], "text": row["text"]}
-    return corpus_dict
+    table = read_jsonl_table(path, CORPUS_SCHEMA)
+    return {
+        doc_id: {"title": title, "text": text}
+        for doc_id, title, text in zip(*(table.column(name).to_pylist() for name in ("id", "title", "text")))
+    }
 
 def read_corpus_retrieval(path: Path) -> dict[str, str]:
-    corpus_dict: dict[str, str] = {}
-    with jsonlines.open(path) as rows:
-        for row in rows:
-            corpus_dict[row["id"]] = row.get("title", "") + " " + row["text"]
-    return corpus_dict
+    table = read_jsonl_table(path, CORPUS_SCHEMA)
+    # compose_retrieval_text on the whole columns
+    texts = pc.binary_join_element_wise(table.column("title"), table.column("text"), " ",
+                                        null_handling="replace", null_replacement="")
+    return dict(zip(table.column("id").to_pylist(), texts.to_pylist()))
+
+
+def read_corpus_texts(path: Path, task_name: str) -> dict[str, str]:
+    """
+    Read the documents text exactly as the given custom task encodes it, so that the embeddings cached during the MTEB
+    evaluation are reused (the cache is keyed by text).
+    """
+    if task_name == TASKS_NAME_MAPPING["retrieval"]:
+        return read_corpus_retrieval(path)
+    if task_name == TASKS_NAME_MAPPING["reranking"]:
+        corpus = read_corpus_reranking(path)
+        return {doc_id: compose_text(doc.get("title"), doc.get("text")) for doc_id, doc in corpus.items()}
+    raise ValueError(f"Unknown task: {task_name}")
 
 
 def read_queries(path: Path) -> dict[str, str]:
-    queries_dict: dict[str, str] = {}
-    with jsonlines.open(path) as rows:
-        for row in rows:
-            queries_dict[row["id"]] = row["text"]
-    return queries_dict
-
-
-def read_candidates(path: Path) -> dict[str, dict[str, dict[str, int]]]:
-    candidates_dict: dict[str, dict[str, int]] = {}
-    relevant_docs: dict[str, dict[str, int]] = {}
-    with jsonlines.open(path) as rows:
-        for row in rows:
-            query_id = row["query_id"]
-            doc_id = row["doc_id"]
-            rating = int(row["rating"])
-            if query_id not in candidates_dict:
-                candidates_dict[query_id] = {}
-            candidates_dict[query_id][doc_id] = rating
-            # Include rating=1 and rating=2 to relevant docs for retrieval task
-            if rating > 0:
-                if query_id not in relevant_docs:
-                    relevant_docs[query_id] = {}
-                relevant_docs[query_id][doc_id] = rating
-    return {
-        "candidates": candidates_dict,
-        "relevant_docs": relevant_docs,
-    }
+    table = read_jsonl_table(path, QUERIES_SCHEMA)
+    return dict(zip(table.column("id").to_pylist(), table.column("text").to_pylist()))
+
+
+def read_candidates(path: Path) -> Candidates:
+    """
+    Candidates ratings in CSR form: `.view()` maps every query to its candidates, `.view(min_rating=1)` to its relevant
+    docs for the retrieval task (rating=1 and rating=2).
+    """
+    return load_candidates(path)
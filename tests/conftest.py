@@ -0,0 +1,13 @@
+from pathlib import Path
+
+import pytest
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator import columnar_loader
+
+
+@pytest.fixture(autouse=True)
+def columnar_cache_dir(tmp_path: Path, monkeypatch) -> Path:
+    """Sidecars of the columnar loader written under the test tmp folder, not the working tree."""
+    path = tmp_path / "columnar_cache"
+    monkeypatch.setattr(columnar_loader, "COLUMNAR_CACHE_PATH", path)
+    return path
@@ -2,15 +2,23 @@ from typing import List, Optional
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.outputs import ChatResult
+from langchain_core.runnables import Runnable, RunnableConfig
 from pydantic import BaseModel
 
 
-class _StructuredOutputMockLLM:
-    def __init__(self, fake_chat_model, schema: type[BaseModel]):
+class _StructuredOutputMockLLM(Runnable):
+    def __init__(self, fake_chat_model, schema: type[BaseModel], errors: List[BaseException]):
         self._fake_chat_model = fake_chat_model
         self._schema = schema
+        self._errors = errors
 
-    def invoke(self, messages):
+    def invoke(self, messages, config: Optional[RunnableConfig] = None, **kwargs):
+        # run reported to the callbacks, as a chat model chain would
+        return self._call_with_config(self._respond, messages, config)
+
+    def _respond(self, messages):
+        if self._errors:
+            raise self._errors.pop(0)
         payload = self._fake_chat_model.responses.pop(0)
 
         if isinstance(payload, self._schema):
@@ -28,9 +36,11 @@ class _StructuredOutputMockLLM:
 class FakeChatModelAdapter(BaseChatModel):
     """Fake adapter for with_structured_output, as the FakeListChatModel doesn't support"""
 
-    def __init__(self, fake_chat_model):
+    def __init__(self, fake_chat_model, errors: Optional[List[BaseException]] = None):
+        """:param errors: raised by the first calls, before the fake responses are returned"""
         super().__init__()
         self._fake_chat_model = fake_chat_model
+        self._errors = list(errors or [])
 
     @property
     def _llm_type(self) -> str:
@@ -40,4 +50,4 @@ class FakeChatModelAdapter(BaseChatModel):
         raise NotImplementedError("_generate is not used in the test")
 
     def with_structured_output(self, schema: type[BaseModel]):
-        return _StructuredOutputMockLLM(self._fake_chat_model, schema)
+        return _StructuredOutputMockLLM(self._fake_chat_model, schema, self._errors)
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from llm_search_quality_evaluation.dataset_generator.llm.document_prompt import (
+    TRUNCATION_MARKER, DocumentPromptFormatter, truncate_text
+)
+from llm_search_quality_evaluation.shared.models import Document
+
+TEXT = ("The Toyota Camry is the best car. It was rated as the best new model of the year by the jury. "
+        "Many other details follow here about engines and more. In conclusion, buy it now.")
+
+
+@pytest.mark.parametrize("max_chars", [20, 60, 100, 120])
+def test_truncate_text__expects__head_and_tail_within_budget(max_chars):
+    truncated = truncate_text(TEXT, max_chars)
+    assert len(truncated) <= max_chars
+    head, tail = truncated.split(TRUNCATION_MARKER)
+    assert TEXT.startswith(head) and TEXT.endswith(tail)
+
+
+def test_truncate_text__expects__cut_at_sentence_boundaries():
+    assert truncate_text(TEXT, 100) == f"The Toyota Camry is the best car.{TRUNCATION_MARKER}In conclusion, buy it now."
+    assert truncate_text(TEXT, len(TEXT)) == TEXT
+
+
+def test_formatter__expects__budgets_per_field_cached_json_and_report():
+    # text fields are lists of strings, as stored by the search engine adapters
+    document = Document(id="doc1", fields={"title": ["Camry"], "description": [TEXT], "year": [2024]})
+    formatter = DocumentPromptFormatter(max_chars=1000, max_chars_by_field={"description": 100})
+
+    doc_json = formatter.to_json(document)
+    assert json.loads(doc_json) == {
+        "id": "doc1",
+        "fields": {"title": ["Camry"], "description": [truncate_text(TEXT, 100)], "year": [2024]},
+    }
+    assert formatter.to_json(document) is doc_json
+    assert formatter.to_json(Document(id="doc2", fields={"title": ["Corolla"]})) == (
+        '{"id":"doc2","fields":{"title":["Corolla"]}}'
+    )
+
+    report = formatter.report()
+    assert report["documents"] == 2
+    assert report["truncated_documents"] == 1
+    assert report["truncated_fields"] == {"description": 1}
+    assert report["chars_before"] == len(TEXT) + len("Camry") + len("Corolla")
+    assert report["chars_after"] == len(truncate_text(TEXT, 100)) + len("Camry") + len("Corolla")
+
+
+def test_formatter_with_list_items__expects__budget_shared_across_the_items():
+    items = ["a" * 40, TEXT, 7, "b" * 40]
+    formatter = DocumentPromptFormatter(max_chars=100)
+
+    fields = json.loads(formatter.to_json(Document(id="doc1", fields={"description": items})))["fields"]
+
+    # the first item fits, the second crosses the budget, the later strings are dropped
+    assert fields["description"] == ["a" * 40, truncate_text(TEXT, 60), 7]
+    assert formatter.report()["chars_after"] == 40 + len(truncate_text(TEXT, 60)) <= 100
+
+
+def test_formatter__expects__cache_keyed_by_id_and_field_names():
+    formatter = DocumentPromptFormatter(max_chars=100)
+    full = Document(id="doc1", fields={"title": ["Camry"], "description": [TEXT]})
+    title_only = Document(id="doc1", fields={"title": ["Camry"]})
+
+    assert "description" in formatter.to_json(full)
+    assert "description" not in formatter.to_json(title_only)
+
+
+def test_formatter_without_budget__expects__same_json_as_the_document():
+    document = Document(id="doc1", fields={"title": ["Città"], "description": [TEXT]},
+                        is_used_to_generate_queries=True)
+    formatter = DocumentPromptFormatter()
+    assert formatter.to_json(document) == document.model_dump_json(exclude={"is_used_to_generate_queries"})
+    # nothing to truncate, nothing cached
+    assert not formatter._cache
+    with pytest.raises(ValueError):
+        DocumentPromptFormatter(max_chars=0)
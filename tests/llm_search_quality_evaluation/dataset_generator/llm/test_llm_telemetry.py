@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel, GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from llm_search_quality_evaluation.dataset_generator.llm import LLMService, LLMTelemetry, llm_service
+from llm_search_quality_evaluation.dataset_generator.llm.telemetry import percentile
+from llm_search_quality_evaluation.shared.models import Document
+from llm_mock import FakeChatModelAdapter
+
+
+@pytest.fixture
+def example_doc():
+    return Document(id="doc1", fields={"title": "Car of the Year"})
+
+
+def test_track__expects__usage_of_the_chat_model_calls_written_as_json_line(tmp_path):
+    chat_model = GenericFakeChatModel(messages=iter([AIMessage(
+        content="ok",
+        usage_metadata={"input_tokens": 1000, "output_tokens": 200, "total_tokens": 1200,
+                        "output_token_details": {"reasoning": 50}},
+        response_metadata={"model_name": "gpt-test"},
+    )]))
+    metrics_path = tmp_path / "metrics" / "llm_metrics.jsonl"
+    telemetry = LLMTelemetry(metrics_path, input_token_cost=1.0, output_token_cost=4.0)
+
+    with telemetry.track("generate_score", "doc1", prompt_chars=42):
+        chat_model.invoke("hello")
+    telemetry.close()
+
+    [line] = metrics_path.read_text(encoding="utf-8").splitlines()
+    record = json.loads(line)
+    assert record["operation"] == "generate_score"
+    assert record["doc_id"] == "doc1"
+    assert record["model"] == "gpt-test"
+    assert (record["prompt_tokens"], record["completion_tokens"], record["reasoning_tokens"]) == (1000, 200, 50)
+    assert record["prompt_chars"] == 42
+    assert record["success"] is True
+    assert record["cost"] == pytest.approx(0.0018)
+
+
+def test_llm_service_with_telemetry__expects__failures_recorded_and_summarized(example_doc):
+    fake_llm = FakeListChatModel(responses=['{"score": 1}', '{malformed-json}'])
+    telemetry = LLMTelemetry()
+    service = LLMService(chat_model=FakeChatModelAdapter(fake_llm), telemetry=telemetry)
+
+    service.generate_score(example_doc, "query", relevance_scale="binary")
+    with pytest.raises(ValueError):
+        service.generate_score(example_doc, "query", relevance_scale="binary")
+
+    summary = telemetry.summary()
+    assert summary["calls"] == 2
+    assert summary["calls_by_operation"] == {"generate_score": 2}
+    assert summary["failures"] == 1
+    assert summary["cost"] is None
+    assert summary["largest_prompts"][0]["doc_id"] == "doc1"
+
+
+def test_llm_service_with_a_transient_error__expects__retry_recorded(example_doc, monkeypatch):
+    monkeypatch.setattr(llm_service, "RETRY_INITIAL_WAIT_SECONDS", 0.0)
+    fake_llm = FakeListChatModel(responses=['{"score": 1}'])
+    telemetry = LLMTelemetry()
+    service = LLMService(chat_model=FakeChatModelAdapter(fake_llm, errors=[TimeoutError("timed out")]),
+                         telemetry=telemetry, max_retries=2, retry_on=(TimeoutError,))
+
+    assert service.generate_score(example_doc, "query", relevance_scale="binary").get_score() == 1
+
+    summary = telemetry.summary()
+    assert summary["calls"] == 1
+    assert summary["failures"] == 0
+    assert summary["retries"] == 1
+
+
+def test_llm_service_with_a_non_transient_error__expects__no_retry(example_doc, monkeypatch):
+    monkeypatch.setattr(llm_service, "RETRY_INITIAL_WAIT_SECONDS", 0.0)
+    fake_llm = FakeListChatModel(responses=['{"score": 1}'])
+    telemetry = LLMTelemetry()
+    service = LLMService(chat_model=FakeChatModelAdapter(fake_llm, errors=[PermissionError("denied")]),
+                         telemetry=telemetry, max_retries=2, retry_on=(TimeoutError,))
+
+    with pytest.raises(PermissionError):
+        service.generate_score(example_doc, "query", relevance_scale="binary")
+
+    summary = telemetry.summary()
+    assert (summary["failures"], summary["retries"]) == (1, 0)
+
+
+def test_percentile__expects__nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 90) == 3.0
+    assert percentile([], 50) == 0.0
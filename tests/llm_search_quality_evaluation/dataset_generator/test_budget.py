@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+
+from llm_search_quality_evaluation.dataset_generator.budget import (
+    JudgmentBudget, candidate_pairs, plan_pairs, project_llm_calls
+)
+from llm_search_quality_evaluation.dataset_generator.config import Config
+from llm_search_quality_evaluation.dataset_generator.main import score_within_budget
+from llm_search_quality_evaluation.dataset_generator.models import LLMScoreResponse
+from llm_search_quality_evaluation.shared.data_store import DataStore
+from llm_search_quality_evaluation.shared.models import Document, Query
+
+
+class FakeLLMService:
+    def __init__(self):
+        self.calls = []
+
+    def generate_score(self, document, query, relevance_scale, explanation=False):
+        self.calls.append((query, document.id))
+        return LLMScoreResponse(score=1, scale="graded")
+
+
+class FakeSearchEngine:
+    def fetch_for_evaluation(self, keyword, query_template, doc_fields):
+        return [Document(id=f"{keyword}-hit-{rank}", fields={"title": keyword}) for rank in range(3)]
+
+
+def _config(tmp_path: Path, **overrides) -> Config:
+    llm_cfg = tmp_path / "llm_cfg.yaml"
+    llm_cfg.write_text("name: mock\nmodel: mock-model\nmax_tokens: 16\n")
+    template = tmp_path / "template.json"
+    template.write_text("{}")
+    values = dict(
+        query_template=template,
+        search_engine_type="solr",
+        collection_name="testcore",
+        search_engine_url="http://localhost:8983/solr/",
+        number_of_docs=2,
+        doc_fields=["title"],
+        num_queries_needed=3,
+        relevance_scale="graded",
+        llm_configuration_file=llm_cfg,
+        output_format="quepid",
+        output_destination=tmp_path,
+    )
+    values.update(overrides)
+    return Config(**values)
+
+
+def test_budget_from_config_takes_the_lowest_limit(tmp_path: Path):
+    assert _config(tmp_path).llm_calls_budget is None
+    assert _config(tmp_path, max_llm_calls=10).llm_calls_budget == 10
+    assert _config(tmp_path, max_llm_calls=10, max_cost=0.5, llm_cost_per_call=0.1).llm_calls_budget == 5
+    with pytest.raises(ValueError):
+        _config(tmp_path, max_cost=1.0)
+
+    budget = JudgmentBudget(2)
+    assert budget.spend() and budget.spend()
+    assert not budget.spend()
+    assert budget.exhausted and budget.remaining == 0
+
+
+def test_project_llm_calls_before_generation(tmp_path: Path):
+    data_store = DataStore(path=tmp_path / "datastore.json", ignore_saved_data=True)
+    data_store.add_query("user query")
+
+    projection = project_llm_calls(_config(tmp_path), data_store)
+    # 2 generations; 3 queries x 2 docs, minus the 2 generated queries rated by their own document
+    assert projection == (2, 4, 3)
+
+
+def test_plan_pairs_is_stratified_across_queries_in_priority_order():
+    queries = [Query(text=f"q{i}") for i in range(3)]
+    docs = [Document(id=f"d{i}", fields={"title": "t"}) for i in range(3)]
+    candidates = [(queries[0], docs), (queries[1], docs[:1]), (queries[2], docs[:2])]
+
+    planned = plan_pairs(candidates, limit=5)
+    assert [(q.text, d.id) for q, d in planned] == [
+        ("q0", "d0"), ("q1", "d0"), ("q2", "d0"), ("q0", "d1"), ("q2", "d1")
+    ]
+    assert len(plan_pairs(candidates, limit=None)) == 6
+
+
+def test_score_within_budget_scores_top_ranked_results_first_and_stops(tmp_path: Path):
+    config = _config(tmp_path, max_llm_calls=5)
+    data_store = DataStore(path=tmp_path / "datastore.json", ignore_saved_data=True)
+    generator_doc = Document(id="generator", fields={"title": "g"}, is_used_to_generate_queries=True)
+    data_store.add_document(generator_doc)
+    for text in ("alpha", "beta"):
+        data_store.add_query(text)
+    data_store.create_rating_score(data_store.get_queries()[0].id, "generator", 2)
+    assert candidate_pairs(config, data_store, {})[0][1] == []
+
+    budget = JudgmentBudget.from_config(config)
+    llm_service = FakeLLMService()
+    score_within_budget(config, data_store, llm_service, FakeSearchEngine(), budget)
+
+    assert llm_service.calls == [
+        ("alpha", "alpha-hit-0"), ("beta", "beta-hit-0"),
+        ("alpha", "alpha-hit-1"), ("beta", "beta-hit-1"),
+        ("alpha", "alpha-hit-2"),
+    ]
+    assert budget.exhausted
+    assert data_store.num_ratings() == 6
@@ -0,0 +1,127 @@
+import json
+import multiprocessing
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from llm_search_quality_evaluation.dataset_generator.config import Config
+from llm_search_quality_evaluation.dataset_generator.distributed import run_coordinator, run_worker
+from llm_search_quality_evaluation.dataset_generator.models import LLMQueryResponse, LLMScoreResponse
+from llm_search_quality_evaluation.dataset_generator.work_queue import WorkQueue
+from llm_search_quality_evaluation.shared.data_store import DataStore
+from llm_search_quality_evaluation.shared.models import Document
+
+
+class FakeLLMService:
+    def __init__(self, prefix: str = "query"):
+        self.prefix = prefix
+
+    def generate_queries(self, document, num_queries_generate_per_doc, max_query_terms):
+        return LLMQueryResponse(json.dumps(
+            [f"{self.prefix} {i} about {document.fields['title']}" for i in range(num_queries_generate_per_doc)]
+        ))
+
+    def generate_score(self, document, query, relevance_scale, explanation=False):
+        if document.id == "broken":
+            raise RuntimeError("LLM error")
+        return LLMScoreResponse(score=2 if document.fields["title"] in query else 0, scale="graded")
+
+
+class FakeSearchEngine:
+    def __init__(self, docs: List[Document]):
+        self.docs = docs
+
+    def fetch_for_query_generation(self, documents_filter, number_of_docs, doc_fields):
+        return [doc.model_copy() for doc in self.docs[:number_of_docs]]
+
+
+DOCS = [Document(id=doc_id, fields={"title": title})
+        for doc_id, title in [("d1", "apple"), ("d2", "banana"), ("broken", "cherry")]]
+
+
+def _worker(queue_path: Path, worker_id: str, prefix: str) -> None:
+    run_worker(FakeLLMService(prefix), WorkQueue(queue_path, max_attempts=2), worker_id, batch_size=2,
+               poll_seconds=0.05)
+
+
+def _run(config: Config, data_store: DataStore, queue: WorkQueue, prefix: str = "query") -> None:
+    """Coordinator in this process, 2 workers in forked ones."""
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_worker, args=(queue.path, f"w{i}", prefix)) for i in range(2)]
+    for worker in workers:
+        worker.start()
+    run_coordinator(config, data_store, FakeSearchEngine(DOCS), queue, poll_seconds=0.05)
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+
+@pytest.fixture
+def config(tmp_path: Path) -> Config:
+    llm_cfg = tmp_path / "llm_cfg.yaml"
+    llm_cfg.write_text("name: mock\nmodel: mock-model\nmax_tokens: 16\n")
+    return Config(
+        query_template=None,
+        search_engine_type="solr",
+        collection_name="testcore",
+        search_engine_url="http://localhost:8983/solr/",
+        number_of_docs=3,
+        doc_fields=["title"],
+        num_queries_needed=6,
+        relevance_scale="graded",
+        llm_configuration_file=llm_cfg,
+        output_format="quepid",
+        output_destination=tmp_path,
+    )
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_workers_in_other_processes_complete_the_dataset(config: Config, tmp_path: Path):
+    data_store = DataStore(path=tmp_path / "datastore.json", ignore_saved_data=True)
+    queue = WorkQueue(tmp_path / "queue.sqlite", max_attempts=2)
+
+    _run(config, data_store, queue)
+
+    # 3 queries per document, in document order, until 6 queries: the broken document generates none
+    assert [query.text for query in data_store.get_queries()] == [
+        f"query {i} about {title}" for title in ("apple", "banana") for i in range(3)
+    ]
+    for query in data_store.get_queries():
+        title = query.text.split()[-1]
+        assert data_store.rating_by_pair[(query.id, "d1")].score == (2 if title == "apple" else 0)
+        assert data_store.rating_by_pair[(query.id, "d2")].score == (2 if title == "banana" else 0)
+        assert not data_store.has_rating_score(query.id, "broken")
+    assert data_store.num_ratings() == 12
+    assert queue.counts("score")["failed"] == 6
+    assert queue.is_closed()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_rerun_on_the_same_queue__expects__old_tasks_reused_only_with_the_same_parameters(config: Config,
+                                                                                         tmp_path: Path):
+    queue = WorkQueue(tmp_path / "queue.sqlite", max_attempts=2)
+    _run(config, DataStore(path=tmp_path / "datastore.json", ignore_saved_data=True), queue)
+
+    # same parameters and LLM settings: the generations of the first run are reused
+    data_store = DataStore(path=tmp_path / "datastore.json", ignore_saved_data=True)
+    _run(config, data_store, queue, prefix="new")
+    assert queue.counts("generate_queries")["done"] == 3
+    assert all(query.text.startswith("query") for query in data_store.get_queries())
+
+    # other LLM settings: new generations, and only those are ingested
+    config.llm_configuration_file.write_text("name: mock\nmodel: other-model\nmax_tokens: 16\n")
+    data_store = DataStore(path=tmp_path / "datastore.json", ignore_saved_data=True)
+    _run(config, data_store, queue, prefix="new")
+    assert queue.counts("generate_queries")["done"] == 6
+    assert [query.text for query in data_store.get_queries()] == [
+        f"new {i} about {title}" for title in ("apple", "banana") for i in range(3)
+    ]
+    assert data_store.num_ratings() == 12
+
+    # other number of queries per document: new generations again
+    data_store = DataStore(path=tmp_path / "datastore.json", ignore_saved_data=True)
+    _run(config.model_copy(update={"num_queries_needed": 4}), data_store, queue, prefix="other")
+    assert [query.text for query in data_store.get_queries()] == [
+        f"other {i} about {title}" for title in ("apple", "banana") for i in range(2)
+    ]
@@ -0,0 +1,71 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from llm_search_quality_evaluation.dataset_generator.work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path: Path) -> WorkQueue:
+    return WorkQueue(tmp_path / "queue.sqlite", lease_seconds=60, max_attempts=2)
+
+
+def test_enqueue_skips_known_keys(queue: WorkQueue):
+    assert queue.enqueue([("score", "q1|d1", {"n": 1}), ("score", "q1|d2", {"n": 2})]) == 2
+    assert queue.enqueue([("score", "q1|d1", {"n": 3}), ("score", "q2|d1", {"n": 4})]) == 1
+    assert queue.counts("score")[PENDING] == 3
+
+
+def test_lease_and_complete(queue: WorkQueue):
+    queue.enqueue([("score", "a", {"n": 1}), ("score", "b", {"n": 2})])
+
+    first = queue.lease("w1", limit=1)
+    second = queue.lease("w2", limit=5)
+    assert [t.key for t in first] == ["a"]
+    assert [t.key for t in second] == ["b"]
+    assert queue.lease("w3", limit=5) == []
+
+    assert queue.complete(first[0], "w1", {"score": 2})
+    assert queue.counts() == {PENDING: 0, LEASED: 1, DONE: 1, FAILED: 0}
+    assert list(queue.results("score")) == [("a", {"n": 1}, {"score": 2})]
+
+
+def test_expired_lease_is_leased_again_and_stale_result_dropped(tmp_path: Path):
+    queue = WorkQueue(tmp_path / "queue.sqlite", lease_seconds=0.05)
+    queue.enqueue([("score", "a", {})])
+    stale = queue.lease("w1")[0]
+    time.sleep(0.1)
+    assert queue.counts()[PENDING] == 1
+
+    fresh = queue.lease("w2")[0]
+    assert fresh.attempts == 2
+    assert not queue.complete(stale, "w1", {"score": 0})
+    assert queue.complete(fresh, "w2", {"score": 1})
+    assert [result for _, _, result in queue.results("score")] == [{"score": 1}]
+
+
+def test_failed_task_is_retried_then_marked_failed(queue: WorkQueue):
+    queue.enqueue([("score", "a", {})])
+    queue.fail(queue.lease("w1")[0], "w1", "boom")
+    assert queue.counts()[PENDING] == 1
+
+    queue.fail(queue.lease("w1")[0], "w1", "boom")
+    assert queue.counts()[FAILED] == 1
+    assert queue.lease("w1") == []
+    assert queue.wait_until_drained("score", poll_seconds=0.01, timeout_seconds=1)[FAILED] == 1
+
+
+def test_expired_lease_after_max_attempts__expects__task_failed_and_queue_drained(tmp_path: Path):
+    queue = WorkQueue(tmp_path / "queue.sqlite", lease_seconds=0.05, max_attempts=2)
+    queue.enqueue([("score", "a", {}), ("score", "b", {})])
+    assert [t.key for t in queue.lease("w1", limit=2)] == ["a", "b"]
+    time.sleep(0.1)
+    assert [t.attempts for t in queue.lease("w2", limit=2)] == [2, 2]
+    time.sleep(0.1)
+
+    # both workers crashed: the tasks are not leased a third time
+    assert queue.counts() == {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 2}
+    assert queue.wait_until_drained("score", poll_seconds=0.01, timeout_seconds=1)[FAILED] == 2
+    assert queue.lease("w3", limit=2) == []
+    assert queue.counts()[FAILED] == 2
@@ -1,3 +1,9 @@
+import logging
+
+import pytest
+from pydantic import ValidationError
+
+from llm_search_quality_evaluation.shared.models.document import Document
 from llm_search_quality_evaluation.shared.search_engines import BaseSearchEngine
 
 
@@ -23,3 +29,50 @@ def test_escape_all_special_chars():
     all_specials = r'\+-!():^[]"{}~*?|&/'
     expected = ''.join(['\\' + c for c in all_specials])
     assert BaseSearchEngine.escape(all_specials) == expected
+
+
+class _StubSearchEngine(BaseSearchEngine):
+    def fetch_for_query_generation(self, documents_filter, number_of_docs, doc_fields, start=0):
+        return []
+
+    def fetch_for_evaluation(self, query_template, doc_fields, keyword="*:*"):
+        return []
+
+    def _search(self, payload):
+        return []
+
+    def _get_total_hits(self, payload):
+        return 0
+
+    @property
+    def _fetch_all_payload(self):
+        return {}
+
+def _engine(sample_rate: int) -> BaseSearchEngine:
+    engine = _StubSearchEngine(endpoint="http://localhost:8983")
+    engine.document_validation_sample_rate = sample_rate
+    return engine
+
+def test_build_document__expects__same_document_as_validated_constructor():
+    doc = _engine(0)._build_document("1", {"title": ["a title"]})
+    assert doc == Document(id="1", fields={"title": ["a title"]})
+    assert doc.is_used_to_generate_queries is False
+
+def test_build_document__expects__validation_skipped_unless_sampled():
+    not_serializable = {"title": [{1, 2}]}
+    assert _engine(0)._build_document("1", not_serializable).fields == not_serializable
+    engine = _engine(2)
+    engine._build_document("1", not_serializable)
+    with pytest.raises(ValidationError):
+        engine._build_document("2", not_serializable)
+
+def test_build_document__expects__validation_of_every_document_at_debug_level(caplog):
+    caplog.set_level(logging.DEBUG, logger="llm_search_quality_evaluation.shared.search_engines.search_engine_base")
+    with pytest.raises(ValidationError):
+        _engine(0)._build_document("1", {"title": [{1, 2}]})
+
+@pytest.mark.parametrize("doc_id, fields", [("", {"title": ["a"]}), (None, {"title": ["a"]}), ("1", {}),
+                                            ("1", {"": ["a"]})])
+def test_build_document__expects__invalid_id_or_fields_still_rejected(doc_id, fields):
+    with pytest.raises(ValidationError):
+        _engine(0)._build_document(doc_id, fields)
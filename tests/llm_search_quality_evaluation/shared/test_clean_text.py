@@ -1,4 +1,10 @@
-from llm_search_quality_evaluation.shared.utils import clean_text
+import html
+import re
+import unicodedata
+
+import pytest
+
+from llm_search_quality_evaluation.shared.utils import CLEAN_TEXT_CACHE_MAX_LENGTH, clean_text, clean_text_cached
 
 
 def test_clean_text__expects__removes_html_unescapes_and_collapses_ws():
@@ -24,4 +30,32 @@ def test_clean_text__expects__preserves_accent_and_punct():
     plain = "cafe"
 
     # Defaults keep accents and punctuation → keys should differ
-    assert clean_text(accented) != clean_text(plain)
\ No newline at end of file
+    assert clean_text(accented) != clean_text(plain)
+
+@pytest.mark.parametrize("raw", [
+    "plain ascii\ttext\r\n with   spaces ",
+    "ascii \x00with\x1f controls\x7f",
+    "tom &amp; jerry <b>bold</b>",
+    " non-breaking spaces　",
+    "ﬁ ligature ½ and \u0085 NEL",
+    "fullwidth ＜tag＞ stays",
+    "",
+])
+def test_clean_text__expects__same_output_as_the_step_by_step_pipeline(raw):
+    expected = html.unescape(raw)
+    expected = re.sub(r"<.*?>", "", expected)
+    expected = unicodedata.normalize("NFKC", expected)
+    expected = re.sub(r"[\u0000-\u001F\u007F-\u009F]", " ", expected)
+    expected = re.sub(r"\s+", " ", expected).strip()
+
+    assert clean_text(raw) == expected
+    assert clean_text_cached(raw) == expected
+
+
+def test_clean_text_cached__expects__short_values_memoized_long_values_not():
+    short_value = "Electronics &gt; Phones"
+    long_value = "x" * (CLEAN_TEXT_CACHE_MAX_LENGTH + 1)
+
+    assert clean_text_cached(short_value) == clean_text_cached(short_value) == "Electronics > Phones"
+    assert clean_text_cached(long_value) == long_value
+    assert clean_text_cached(None) == ""
@@ -96,8 +96,8 @@ def test_create_rating_score__expects__creates_rating_and_indexes(ds, doc_a, que
     rating = ds.create_rating_score(query.id, doc_a.id, 2)
 
     assert rating is not None
-    # Check if the rating object is in the main dictionary
-    assert ds.rating_by_pair.get((query.id, doc_a.id)) is rating
+    # Check if the rating is in the (query_id, doc_id) view; ratings are built on access
+    assert ds.rating_by_pair.get((query.id, doc_a.id)) == rating
 
     # Check ratings "by query" via helper (since no get_ratings_for_query)
     ratings_for_query = _ratings_for_query(ds, query.id)
@@ -111,7 +111,7 @@ def test_create_rating_score__expects__second_call_does_not_update_existing(ds,
     rating1 = ds.create_rating_score(query.id, doc_a.id, 1)
     caplog.set_level(logging.DEBUG)
     rating2 = ds.create_rating_score(query.id, doc_a.id, 4)  # insert-only: does not update
-    assert rating1 is rating2  # Should return the exact same object
+    assert rating1 == rating2  # Should return the existing rating
     assert (query.id, doc_a.id) in ds.rating_by_pair
     assert ds.rating_by_pair[(query.id, doc_a.id)] == rating1
     assert "existing" in caplog.text
@@ -224,6 +224,39 @@ def test_autosave_counts_rating_add__expects__saves_on_threshold(tmp_db_path: Pa
     assert tmp_db_path.exists()
 
 
+def test_background_autosave__expects__snapshot_written_while_updates_continue(tmp_db_path: Path, doc_a: Document):
+    ds = DataStore(path=tmp_db_path, ignore_saved_data=True, autosave_every_n_updates=2, background_autosave=True)
+
+    ds.add_document(doc_a)
+    q = ds.add_query("q1")  # 2nd update -> snapshot submitted to the saver thread
+    ds.create_rating_score(q.id, doc_a.id, 1)  # not in the snapshot
+    ds.wait_for_pending_save()
+
+    ds2 = DataStore(path=tmp_db_path)
+    assert len(ds2.get_queries()) == 1
+    assert ds2.num_ratings() == 0
+    ds.close()
+
+
+def test_background_autosave_failure__expects__logged_and_retried(tmp_db_path: Path, doc_a: Document, caplog,
+                                                                  monkeypatch):
+    ds = DataStore(path=tmp_db_path, ignore_saved_data=True, autosave_every_n_updates=1, background_autosave=True)
+    real_write = ds._write
+
+    def failing_write(snapshot):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ds, "_write", failing_write)
+    ds.add_document(doc_a)
+    ds.wait_for_pending_save()
+    assert "[autosave] failed" in caplog.text
+
+    monkeypatch.setattr(ds, "_write", real_write)
+    ds.add_query("q1")
+    ds.close()
+    assert len(DataStore(path=tmp_db_path).get_documents()) == 1
+
+
 # - new test: QUERY DEDUPLICATION 
 def test_add_query__expects__dedup_by_whitespace_and_html():
     ds = DataStore(ignore_saved_data=True)
@@ -244,4 +277,117 @@ def test_add_query__expects__case_sensitive_by_default():
 
     # With lowercase=False default in normalize_query_text_key, these should be different
     assert q1.id != q2.id
-    assert len(ds.get_queries()) == 2
\ No newline at end of file
+    assert len(ds.get_queries()) == 2
+
+# --- compact storage ---
+def test_rating_by_pair__expects__read_only_view_in_insertion_order(ds, doc_a, doc_b):
+    q1 = ds.add_query("q1")
+    q2 = ds.add_query("q2")
+    ds.add_document(doc_a)
+    ds.add_document(doc_b)
+    ds.create_rating_score(q2.id, doc_b.id, 1)
+    ds.create_rating_score(q1.id, doc_a.id, 2, "explained")
+
+    assert list(ds.rating_by_pair) == [(q2.id, doc_b.id), (q1.id, doc_a.id)]
+    assert len(ds.rating_by_pair) == ds.num_ratings() == 2
+    assert (q1.id, doc_b.id) not in ds.rating_by_pair
+    assert ds.rating_by_pair[(q1.id, doc_a.id)].explanation == "explained"
+    assert ds.rating_by_pair[(q2.id, doc_b.id)].explanation is None
+    assert ds.query_text_to_query_id["q2"] == q2.id
+    assert ds.num_queries() == 2
+
+
+def test_persistence__expects__same_file_layout_as_pydantic_dumps(tmp_db_path, doc_a):
+    ds = DataStore(path=tmp_db_path, ignore_saved_data=True)
+    ds.add_document(doc_a)
+    query = ds.add_query("hello", query_id="q-1")
+    ds.create_rating_score(query.id, doc_a.id, 1, "why")
+    ds.save()
+
+    data = json.loads(tmp_db_path.read_text())
+    assert data["queries"] == [Query(id="q-1", text="hello").model_dump()]
+    assert data["ratings"] == [{"doc_id": doc_a.id, "query_id": "q-1", "score": 1, "explanation": "why"}]
+
+    ds.export_all_records_with_explanation(tmp_db_path.with_name("explanations.json"))
+    records = json.loads(tmp_db_path.with_name("explanations.json").read_text())
+    assert records == [{"query": "hello", "doc_id": doc_a.id, "rating": 1, "explanation": "why"}]
+
+
+def test_load__expects__invalid_records_skipped_coercible_ones_kept_and_no_autosave(tmp_db_path, caplog):
+    data = {
+        "docs": [{"id": "d1", "fields": {"title": "t"}}, {"id": "", "fields": {"title": "t"}}],
+        "queries": [{"id": "q1", "text": "hello"}, {"id": "q2", "text": ""}, {"id": "q3", "text": " hello "}],
+        "ratings": [
+            {"query_id": "q1", "doc_id": "d1", "score": "2"},
+            {"query_id": "q1", "doc_id": "d1", "score": 0},
+            {"query_id": "q2", "doc_id": "d1", "score": 1},
+            {"query_id": "q1", "doc_id": "d2", "score": 1},
+        ],
+    }
+    tmp_db_path.write_text(json.dumps(data))
+    mtime = tmp_db_path.stat().st_mtime_ns
+
+    caplog.set_level(logging.WARNING)
+    ds = DataStore(path=tmp_db_path, autosave_every_n_updates=1)
+
+    assert [doc.id for doc in ds.get_documents()] == ["d1"]
+    assert [query.id for query in ds.get_queries()] == ["q1"]
+    assert [(r.query_id, r.doc_id, r.score) for r in ds.get_ratings()] == [("q1", "d1", 2)]
+    assert "skip_doc_invalid" in caplog.text and "skip_query_invalid" in caplog.text
+    assert "duplicated_query_text=1" in caplog.text and "duplicated_rating=1" in caplog.text
+    assert "query_not_found=1" in caplog.text and "doc_not_found=1" in caplog.text
+    assert tmp_db_path.stat().st_mtime_ns == mtime
+
+
+def test_concurrent_producers__expects__each_pair_reserved_once_and_queries_deduplicated(tmp_db_path, doc_a, doc_b):
+    from concurrent.futures import ThreadPoolExecutor
+
+    ds = DataStore(path=tmp_db_path, ignore_saved_data=True, autosave_every_n_updates=10, background_autosave=True)
+    ds.add_document(doc_a)
+    ds.add_document(doc_b)
+    scored = []
+
+    def produce(worker: int) -> None:
+        for i in range(50):
+            query = ds.add_query(f"query {i}")
+            for doc in (doc_a, doc_b):
+                if ds.reserve_rating(query.id, doc.id):
+                    scored.append((query.id, doc.id))
+                    ds.create_rating_score(query.id, doc.id, worker % 3)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(produce, range(8)))
+    ds.save()
+
+    assert ds.num_queries() == 50
+    assert len(scored) == len(set(scored)) == ds.num_ratings() == 100
+    assert DataStore(path=tmp_db_path).num_ratings() == 100
+
+
+def test_reserve_rating__expects__false_when_reserved_or_rated_until_released(ds, doc_a, query_q):
+    ds.add_document(doc_a)
+    query = ds.add_query(query_q.text)
+
+    assert ds.reserve_rating(query.id, doc_a.id)
+    assert not ds.reserve_rating(query.id, doc_a.id)
+    ds.release_rating(query.id, doc_a.id)
+    assert ds.reserve_rating(query.id, doc_a.id)
+    ds.create_rating_score(query.id, doc_a.id, 1)
+    assert not ds.reserve_rating(query.id, doc_a.id)
+
+def test_add_query_with_near_duplicate_threshold__expects__similar_queries_suppressed_and_counted(tmp_db_path):
+    ds = DataStore(path=tmp_db_path, ignore_saved_data=True, near_duplicate_threshold=0.8)
+    boots = ds.add_query("best hiking boots")
+
+    assert ds.add_query("best hiking boot").id == boots.id
+    assert ds.add_query("Best hiking-boots!").id == boots.id
+    assert ds.add_query("best hiking boots").id == boots.id
+    assert ds.add_query("best running shoes").id != boots.id
+    assert ds.num_queries() == 2
+    assert ds.stats == {"near_duplicate_queries": 2, "duplicated_queries": 1}
+
+    # saved queries are indexed again on load
+    ds.save()
+    reloaded = DataStore(path=tmp_db_path, near_duplicate_threshold=0.8)
+    assert reloaded.add_query("best running shoe").text == "best running shoes"
+    assert reloaded.num_queries() == 2
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from llm_search_quality_evaluation.shared import data_store_format
+from llm_search_quality_evaluation.shared.data_store import DataStore
+from llm_search_quality_evaluation.shared.data_store_format import (
+    BINARY_MAGIC, _write_binary, convert, detect_format, read_binary, read_records, write_records
+)
+from llm_search_quality_evaluation.shared.models import Document
+
+RECORDS = {
+    "docs": [{"id": "d1", "fields": {"title": "Città"}, "is_used_to_generate_queries": False}],
+    "queries": [{"id": f"q{i}", "text": f"query {i}"} for i in range(25)],
+    "ratings": [{"doc_id": "d1", "query_id": "q3", "score": 2, "explanation": None}],
+}
+
+
+@pytest.mark.parametrize("codec", ["msgpack", "json"])
+@pytest.mark.parametrize("compression", ["zstd", "none"])
+def test_binary_roundtrip__expects__same_records_as_json(tmp_path, codec, compression):
+    path = tmp_path / "datastore.bin"
+    with path.open("wb") as file:
+        _write_binary(file, RECORDS, frame_size=7, codec=codec, compression=compression)
+
+    assert detect_format(path) == "binary"
+    assert read_binary(path) == RECORDS
+
+
+def test_write_records_binary__expects__msgpack_records_zstd_body(tmp_path):
+    path = tmp_path / "datastore.bin"
+    write_records(path, RECORDS, "binary")
+
+    raw = path.read_bytes()[len(BINARY_MAGIC):]
+    header_length = int.from_bytes(raw[:4], "little")
+    header = json.loads(raw[4:4 + header_length])
+    assert header == {"schema_version": 1, "codec": "msgpack", "compression": "zstd"}
+
+
+def test_convert__expects__json_to_binary_and_back_keeps_records(tmp_path):
+    source = tmp_path / "datastore.json"
+    write_records(source, RECORDS, "json")
+
+    convert(source, tmp_path / "datastore.bin", "binary")
+    convert(tmp_path / "datastore.bin", tmp_path / "back.json", "json")
+
+    assert (tmp_path / "datastore.bin").read_bytes().startswith(BINARY_MAGIC)
+    assert json.loads((tmp_path / "back.json").read_text(encoding="utf-8")) == RECORDS
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_read_binary__expects__rejects_newer_schema_and_truncated_file(tmp_path, monkeypatch):
+    path = tmp_path / "datastore.bin"
+    monkeypatch.setattr(data_store_format, "SCHEMA_VERSION", 2)
+    write_records(path, RECORDS, "binary")
+    monkeypatch.setattr(data_store_format, "SCHEMA_VERSION", 1)
+    with pytest.raises(ValueError, match="schema version"):
+        read_records(path)
+
+    write_records(path, RECORDS, "binary")
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(ValueError):
+        read_records(path)
+
+
+def test_datastore__expects__keeps_the_loaded_format_on_save(tmp_path):
+    path = tmp_path / "datastore"
+    ds = DataStore(path=path, ignore_saved_data=True, storage_format="binary")
+    ds.add_document(Document(id="d1", fields={"title": "t"}))
+    query = ds.add_query("hello")
+    ds.create_rating_score(query.id, "d1", 1, "why")
+    ds.save()
+
+    reloaded = DataStore(path=path)
+    assert reloaded.storage_format == "binary"
+    assert reloaded.get_ratings() == ds.get_ratings()
+    reloaded.save()
+    assert detect_format(path) == "binary"
+
+    with pytest.raises(ValueError):
+        DataStore(path=path, ignore_saved_data=True, storage_format="yaml")
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from llm_search_quality_evaluation.shared.data_store import DataStore
+from llm_search_quality_evaluation.shared.data_store_merge import merge_datastores
+from llm_search_quality_evaluation.shared.models import Document
+
+
+def _shard(path, queries, ratings, storage_format="json"):
+    ds = DataStore(path=path, ignore_saved_data=True, storage_format=storage_format)
+    ds.add_document(Document(id="d1", fields={"title": "one"}))
+    ds.add_document(Document(id="d2", fields={"title": "two"}))
+    for query_id, text in queries:
+        ds.add_query(text, query_id=query_id)
+    for query_id, doc_id, score in ratings:
+        ds.create_rating_score(query_id, doc_id, score, f"{path.stem} says {score}")
+    ds.save()
+    return path
+
+
+@pytest.fixture
+def shards(tmp_path):
+    return [
+        _shard(tmp_path / "a.json", [("qa", "Red shoes")], [("qa", "d1", 0)]),
+        # same text after clean_text, other id; "qa" reused for another text
+        _shard(tmp_path / "b.bin", [("qb", "Red  shoes"), ("qa", "blue hat")],
+               [("qb", "d1", 2), ("qa", "d2", 1)], storage_format="binary"),
+        _shard(tmp_path / "c.json", [("qc", "<b>Red</b> shoes")], [("qc", "d1", 2)]),
+    ]
+
+
+def _add_dangling_rating(path):
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["ratings"].append({"query_id": "missing", "doc_id": "d2", "score": 1, "explanation": None})
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _scores(path):
+    ds = DataStore(path=path)
+    texts = {q.id: q.text for q in ds.get_queries()}
+    return {(texts[r.query_id], r.doc_id): (r.score, r.explanation) for r in ds.get_ratings()}
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("first", (0, "a says 0")),
+    ("latest", (2, "c says 2")),
+    ("majority", (2, "b says 2")),
+])
+def test_merge__expects__queries_deduplicated_and_conflicts_resolved_by_policy(tmp_path, shards, policy, expected):
+    _add_dangling_rating(shards[2])
+    output = tmp_path / "merged.json"
+    stats = merge_datastores(shards, output, policy)
+
+    scores = _scores(output)
+    assert scores[("Red shoes", "d1")] == expected
+    assert scores[("blue hat", "d2")] == (1, "b says 1")
+    assert len(scores) == 2
+    assert stats["duplicated_queries"] == 2 and stats["reassigned_query_ids"] == 1
+    assert stats["conflicting_ratings"] == 2 and stats["dangling_ratings"] == 1
+    assert DataStore(path=output).storage_format == "json"
+
+
+def test_merge__expects__unknown_policy_rejected(tmp_path, shards):
+    with pytest.raises(ValueError):
+        merge_datastores(shards, tmp_path / "merged.json", "random")
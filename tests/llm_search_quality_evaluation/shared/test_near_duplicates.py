@@ -0,0 +1,34 @@
+import pytest
+
+from llm_search_quality_evaluation.shared.near_duplicates import NearDuplicateIndex, jaccard, lsh_bands, shingles
+
+
+def test_shingles_ignore_case_punctuation_and_spacing():
+    assert shingles("Best  hiking-boots!") == shingles("best hiking boots")
+    assert jaccard(shingles("best hiking boots"), shingles("best hiking boot")) > 0.8
+    assert jaccard(shingles("iphone 13"), shingles("iphone 12")) < 0.8
+
+
+def test_lsh_bands_candidate_threshold_below_similarity_threshold():
+    bands, rows = lsh_bands(64, 0.8)
+    assert bands * rows <= 64
+    assert (1 / bands) ** (1 / rows) <= 0.8
+
+
+def test_find_returns_most_similar_item_above_threshold():
+    index = NearDuplicateIndex(threshold=0.7)
+    index.add("boots", "best hiking boots")
+    index.add("shoes", "best running shoes")
+
+    assert index.find("best hiking boot") == "boots"
+    assert index.find("best running shoe") == "shoes"
+    assert index.find("cheap flights to rome") is None
+    assert len(index) == 2
+
+    index.clear()
+    assert index.find("best hiking boot") is None
+
+
+def test_invalid_threshold_raises():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold=0)
@@ -0,0 +1,130 @@
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.scripts.mteb_retrieval_dataset_generator import (
+    MtebLoader, _coalesce, _sample_random, normalize_corpus_batch, normalize_doc, normalize_qrels_batch,
+    normalize_queries_batch, normalize_text, to_int, to_string
+)
+
+UNIVERSE = [f"d{i}" for i in range(100)]
+
+# values of the HF rows, falsy and list ones included
+VALUES = [None, "", "x", "y z", 0, 1, 2, "3", "1.0", 0.0, 2.5, [], ["a", None, "b"], [""], False]
+CORPUS_FIELDS = ("_id", "id", "title", "Title", "headline", "name", "text", "abstract", "contents", "body")
+QUERIES_FIELDS = ("_id", "id", "query_id", "qid", "text")
+QRELS_FIELDS = ("query-id", "query_id", "qid", "query", "corpus-id", "doc_id", "document_id", "doc", "corpus_id",
+                "score", "label", "relevance")
+
+
+def _random_rows(fields: tuple, seed: int, size: int = 300) -> List[Dict[str, Any]]:
+    """Rows with a random subset of the fields (missing keys) and random values."""
+    rng = random.Random(seed)
+    present = [f for f in fields if rng.random() < 0.6] or [rng.choice(fields)]
+    return [{f: rng.choice(VALUES) for f in present if rng.random() < 0.8} for _ in range(size)]
+
+
+# row-wise expressions replaced by the batch normalizers
+def _row_corpus(row: Dict[str, Any]) -> Dict[str, Any]:
+    title, text = normalize_doc(row)
+    return {"id": to_string(row.get("_id") or row.get("id")), "title": title, "text": text}
+
+
+def _row_queries(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": to_string(row.get("_id") or row.get("id") or row.get("query_id") or row.get("qid")),
+            "text": normalize_text(row.get("text", ""))}
+
+
+def _row_qrels(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "query_id": to_string(row.get("query-id") or row.get("query_id") or row.get("qid") or row.get("query")),
+        "doc_id": to_string(row.get("corpus-id") or row.get("doc_id") or row.get("document_id") or row.get("doc")
+                            or row.get("corpus_id")),
+        "rating": to_int(row.get("score") or row.get("label") or row.get("relevance") or 0),
+    }
+
+
+def _rows(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+@pytest.mark.parametrize("num_banned, k", [
+    (0, 10),    # rejection sampling
+    (10, 40),   # rejection sampling, at the threshold
+    (10, 41),   # above the threshold: sampled from the listed available docs
+    (60, 30),
+    (90, 10),   # exactly the available docs
+    (95, 10),   # fewer available docs than k
+    (100, 5),
+])
+def test_sample_random__expects__distinct_docs_not_banned(num_banned: int, k: int) -> None:
+    for seed in range(20):
+        rng = random.Random(seed)
+        banned = set(rng.sample(UNIVERSE, num_banned))
+
+        picks = _sample_random(UNIVERSE, banned, k, random.Random(seed))
+
+        assert len(picks) == len(set(picks)) == min(k, len(UNIVERSE) - num_banned)
+        assert not set(picks) & banned
+        assert set(picks) <= set(UNIVERSE)
+
+
+@pytest.mark.parametrize("num_banned, k", [(5, 10), (80, 10)])
+def test_sample_random_with_same_seed__expects__same_picks(num_banned: int, k: int) -> None:
+    banned = UNIVERSE[:num_banned]
+
+    picks = _sample_random(UNIVERSE, set(banned), k, random.Random(42))
+
+    # independent of the banned set insertion order
+    assert _sample_random(UNIVERSE, set(reversed(banned)), k, random.Random(42)) == picks
+    assert _sample_random(UNIVERSE, set(banned), k, random.Random(7)) != picks
+
+
+def test_sample_random_with_nothing_to_sample__expects__empty_list() -> None:
+    assert _sample_random(UNIVERSE, set(), 0, random.Random(42)) == []
+    assert _sample_random([], set(), 3, random.Random(42)) == []
+
+
+@pytest.mark.parametrize("fields", [("a",), ("a", "b"), ("a", "b", "c")])
+def test_coalesce__expects__same_values_as_row_wise_or(fields: tuple) -> None:
+    for seed in range(20):
+        rows = _random_rows(fields, seed, size=50)
+        batch = MtebLoader._to_columns(rows)
+
+        expected = []
+        for row in rows:
+            value = None
+            for field in fields:
+                value = value or row.get(field)
+            expected.append(value)
+        assert _coalesce(batch, fields, len(rows)) == expected
+
+
+@pytest.mark.parametrize("normalize, row_wise, fields", [
+    (normalize_corpus_batch, _row_corpus, CORPUS_FIELDS),
+    (normalize_queries_batch, _row_queries, QUERIES_FIELDS),
+    (normalize_qrels_batch, _row_qrels, QRELS_FIELDS),
+])
+def test_normalize_batch__expects__same_rows_as_row_wise_normalization(normalize, row_wise, fields: tuple) -> None:
+    for seed in range(30):
+        rows = _random_rows(fields, seed)
+
+        assert _rows(normalize(MtebLoader._to_columns(rows))) == [row_wise(row) for row in rows]
+
+
+def test_normalize_corpus_batch_with_falsy_and_list_values__expects__first_truthy_field() -> None:
+    rows = [
+        {"_id": "", "id": 7, "title": None, "Title": "T", "text": [], "abstract": ["a", None, "b"]},
+        {"_id": 0, "title": "", "name": "", "body": ""},
+        {"id": "d3", "headline": ["h"], "contents": "c"},
+    ]
+
+    batch = normalize_corpus_batch(MtebLoader._to_columns(rows))
+
+    assert _rows(batch) == [_row_corpus(row) for row in rows]
+    assert _rows(batch) == [
+        {"id": "7", "title": "T", "text": "a\nb"},
+        {"id": "", "title": "", "text": ""},
+        {"id": "d3", "title": "h", "text": "c"},
+    ]
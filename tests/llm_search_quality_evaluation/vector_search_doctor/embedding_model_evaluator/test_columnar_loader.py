@@ -0,0 +1,123 @@
+import os
+from pathlib import Path
+
+import jsonlines
+import numpy as np
+import pytest
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator import columnar_loader
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.columnar_loader import (
+    CORPUS_SCHEMA, load_candidates, read_jsonl_table
+)
+
+CANDIDATES = [
+    {"query_id": "q2", "doc_id": "d1", "rating": 0},
+    {"query_id": "q1", "doc_id": "d2", "rating": 2},
+    {"query_id": "q2", "doc_id": "d3", "rating": 1},
+    {"query_id": "q1", "doc_id": "d1", "rating": 1},
+    # repeated pair: first position, last rating
+    {"query_id": "q2", "doc_id": "d1", "rating": 2},
+]
+
+
+def _write_jsonl(path: Path, rows: list[dict]) -> Path:
+    with jsonlines.open(path, mode="w") as file:
+        file.write_all(rows)
+    return path
+
+
+def _dict_candidates(rows: list[dict]) -> dict[str, dict[str, int]]:
+    result: dict[str, dict[str, int]] = {}
+    for row in rows:
+        result.setdefault(row["query_id"], {})[row["doc_id"]] = row["rating"]
+    return result
+
+
+def test_load_candidates__expects__csr_arrays_with_file_order(tmp_path: Path) -> None:
+    candidates = load_candidates(_write_jsonl(tmp_path / "candidates.jsonl", CANDIDATES))
+
+    assert candidates.query_ids == ["q2", "q1"]
+    assert candidates.offsets.tolist() == [0, 2, 4]
+    assert [candidates.doc_ids[d] for d in candidates.doc_index] == ["d1", "d3", "d2", "d1"]
+    assert candidates.ratings.tolist() == [2, 1, 2, 1]
+    assert candidates.to_dict() == _dict_candidates(CANDIDATES)
+    assert list(candidates.to_dict().items()) == list(_dict_candidates(CANDIDATES).items())
+    assert candidates.to_dict(min_rating=2) == {"q2": {"d1": 2}, "q1": {"d2": 2}}
+
+
+def test_candidates_view__expects__same_mapping_as_to_dict(tmp_path: Path) -> None:
+    candidates = load_candidates(_write_jsonl(tmp_path / "candidates.jsonl", CANDIDATES))
+
+    for min_rating in (None, 1, 2, 3):
+        view = candidates.view(min_rating)
+        expected = candidates.to_dict(min_rating)
+        assert list(view) == list(expected) and len(view) == len(expected)
+        assert {query_id: view[query_id] for query_id in view} == expected
+    relevant = candidates.view(min_rating=2)
+    assert "q1" in relevant and "q3" not in relevant
+    assert relevant.get("q3") is None and candidates.view(min_rating=3).get("q1") is None
+
+
+def test_read_jsonl_table__expects__sidecar_in_cache_dir_reused_until_file_changes(
+        tmp_path: Path, columnar_cache_dir: Path, monkeypatch
+) -> None:
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    path = _write_jsonl(data_dir / "candidates.jsonl", CANDIDATES)
+    load_candidates(path)
+    assert [file.name for file in data_dir.iterdir()] == ["candidates.jsonl"]
+    assert len(list(columnar_cache_dir.glob("candidates.jsonl.*.arrow"))) == 1
+
+    parsed = []
+    original_parse = columnar_loader._parse
+    monkeypatch.setattr(columnar_loader, "_parse", lambda *args: parsed.append(args) or original_parse(*args))
+
+    assert load_candidates(path).to_dict() == _dict_candidates(CANDIDATES)
+    assert parsed == []
+
+    # validated by size and mtime only: a touched file is parsed again
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_candidates(path).to_dict() == _dict_candidates(CANDIDATES)
+    assert len(parsed) == 1
+
+    _write_jsonl(path, CANDIDATES[:2])
+    assert load_candidates(path).to_dict() == _dict_candidates(CANDIDATES[:2])
+    assert len(parsed) == 2
+
+
+def test_write_sidecar__expects__stale_sidecars_evicted(tmp_path: Path, columnar_cache_dir: Path) -> None:
+    def sidecars() -> list[str]:
+        return sorted(file.name.split(".")[0] for file in columnar_cache_dir.glob("*.arrow"))
+
+    kept = _write_jsonl(tmp_path / "kept.jsonl", CANDIDATES)
+    removed = _write_jsonl(tmp_path / "removed.jsonl", CANDIDATES)
+    load_candidates(kept)
+    load_candidates(removed)
+    assert sidecars() == ["kept", "removed"]
+
+    # a sidecar of the same file with another schema replaces the previous one
+    read_jsonl_table(kept, CORPUS_SCHEMA)
+    assert len(list(columnar_cache_dir.glob("kept.jsonl.*.arrow"))) == 1
+
+    # the sidecars of removed files and the unreadable ones are evicted
+    removed.unlink()
+    (columnar_cache_dir / "broken.jsonl.0123456789abcdef.arrow").write_bytes(b"not arrow")
+    load_candidates(_write_jsonl(tmp_path / "candidates.jsonl", CANDIDATES))
+    assert sidecars() == ["candidates", "kept"]
+
+
+def test_read_jsonl_table_with_mixed_id_types__expects__jsonlines_fallback_with_string_ids(
+        tmp_path: Path, columnar_cache_dir: Path
+) -> None:
+    path = _write_jsonl(tmp_path / "corpus.jsonl", [
+        {"id": 1, "title": "t1", "text": "x1", "extra": [1, 2]},
+        {"id": "d2", "text": "x2"},
+    ])
+
+    table = read_jsonl_table(path, CORPUS_SCHEMA, use_cache=False)
+
+    assert table.column("id").to_pylist() == ["1", "d2"]
+    assert table.column("title").to_pylist() == ["t1", None]
+    assert not columnar_cache_dir.exists()
+    assert np.array_equal(load_candidates(_write_jsonl(tmp_path / "empty.jsonl", [])).offsets, [0])
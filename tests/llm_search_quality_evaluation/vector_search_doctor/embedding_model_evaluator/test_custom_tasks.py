@@ -101,3 +101,24 @@ def test_custom_reranking_task_with_valid_data__expects__loads_dataset_with_posi
     assert "title3\n\ntext3 test3" in neg
 
     assert reranking_task.data_loaded is True
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+@pytest.mark.parametrize("task_to_evaluate", ["retrieval", "reranking"])
+def test_read_corpus_texts__expects__same_document_texts_as_the_custom_task(tmp_path: Path, task_to_evaluate) -> None:
+    from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import TASKS_NAME_MAPPING
+    from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.custom_mteb_tasks import (
+        CustomRerankingTask, CustomRetrievalTask
+    )
+    from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.utils import read_corpus_texts
+    config = _create_dataset_and_load_config(tmp_path, task_to_evaluate)
+    texts = read_corpus_texts(config.corpus_path, TASKS_NAME_MAPPING[task_to_evaluate])
+
+    if task_to_evaluate == "retrieval":
+        task = CustomRetrievalTask()
+        task.load_data(config=config)
+        assert texts == task.corpus["test"]
+    else:
+        task = CustomRerankingTask()
+        task.load_data(config=config)
+        row = task.dataset["test"][0]
+        assert set(row["positive"]) | set(row["negative"]) <= set(texts.values())
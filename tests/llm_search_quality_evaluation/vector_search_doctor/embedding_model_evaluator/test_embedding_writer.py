@@ -82,3 +82,43 @@ def test_embeddings_writer_with_valid_inputs__expects__creates_jsonl_files_with_
         queries = list(r)
     assert queries == [{"id": "query1", "vector": [1.0, 1.1, 1.2]}]
 
+
+
+def test_embeddings_writer_with_all_texts_cached__expects__vectors_read_from_cache_without_encoding(
+        tmp_path: Path,
+        resource_folder
+) -> None:
+    from mteb.models.cache_wrapper import TextVectorMap
+    from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.utils import (
+        read_corpus_texts, read_queries
+    )
+
+    task_name = TASKS_NAME_MAPPING["retrieval"]
+    cache_path = tmp_path / "cache"
+    cache_map = TextVectorMap(cache_path / task_name, initial_vectors=4)
+    doc_text = read_corpus_texts(resource_folder / "corpus.jsonl", task_name)["doc1"]
+    query_text = read_queries(resource_folder / "queries.jsonl")["query1"]
+    cache_map.add(doc_text, np.array([0.5, 0.25], dtype=np.float32))
+    cache_map.add(query_text, np.array([0.125, 1.0], dtype=np.float32))
+    cache_map.save()
+    cache_map.close()
+
+    cached: CachedEmbeddingWrapper = create_autospec(CachedEmbeddingWrapper, instance=True)
+    cached.encode.side_effect = AssertionError("model must not be called when every text is cached")
+
+    embeddings_dir = tmp_path / "output" / "embeddings"
+    writer = EmbeddingWriter(
+        corpus_path=resource_folder / "corpus.jsonl",
+        queries_path=resource_folder / "queries.jsonl",
+        cached=cached,
+        cache_path=cache_path,
+        task_name=task_name,
+        batch_size=32,
+    )
+    writer.write(embeddings_dir)
+
+    with jsonlines.open(embeddings_dir / "documents_embeddings.jsonl") as r:
+        assert list(r) == [{"id": "doc1", "vector": [0.5, 0.25]}]
+    with jsonlines.open(embeddings_dir / "queries_embeddings.jsonl") as r:
+        assert list(r) == [{"id": "query1", "vector": [0.125, 1.0]}]
+    cached.encode.assert_not_called()
@@ -0,0 +1,88 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import jsonlines
+import numpy as np
+import pytest
+from mteb.evaluation.evaluators.RetrievalEvaluator import RetrievalEvaluator
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.config import Config
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.constants import (
+    RETRIEVAL_K_VALUES, TASKS_NAME_MAPPING
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.custom_mteb_tasks import (
+    CustomRetrievalTask
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.fast_retrieval_evaluator import (
+    run_fast_retrieval_evaluation, score_retrieval
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.utils import (
+    read_candidates, read_corpus_retrieval, read_queries
+)
+
+
+class _HashModel:
+    """Deterministic fake encoder: the vector of a text only depends on the text."""
+
+    def encode(self, texts: list[str], task_name: str, prompt_type: Optional[Any] = None, **kwargs: Any) -> np.ndarray:
+        vectors = [
+            np.random.default_rng(int(hashlib.sha256(text.encode()).hexdigest()[:8], 16)).normal(size=8)
+            for text in texts
+        ]
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def _write_dataset(path: Path) -> Config:
+    rng = np.random.default_rng(0)
+    # the last docs share the same text, so their scores tie
+    corpus = [{"id": f"d{i}", "title": f"title {i}", "text": f"text {min(i, 40)}"} for i in range(50)]
+    queries = [{"id": f"q{i}", "text": f"query {i}"} for i in range(12)]
+    candidates = [
+        {"query_id": query["id"], "doc_id": f"d{doc}", "rating": int(rng.integers(0, 3))}
+        for query in queries for doc in rng.choice(40, size=6, replace=False)
+    ]
+    for name, rows in (("corpus", corpus), ("queries", queries), ("candidates", candidates)):
+        with jsonlines.open(path / f"{name}.jsonl", "w") as writer:
+            writer.write_all(rows)
+    return Config(model_id="fake-model", task_to_evaluate="retrieval", corpus_path=path / "corpus.jsonl",
+                  queries_path=path / "queries.jsonl", candidates_path=path / "candidates.jsonl",
+                  relevance_scale="graded", output_dest=path)
+
+
+def test_score_retrieval__expects__same_metrics_as_mteb_retrieval_evaluator(tmp_path: Path) -> None:
+    config = _write_dataset(tmp_path)
+    model = _HashModel()
+    task_name = TASKS_NAME_MAPPING["retrieval"]
+
+    scores = score_retrieval(model, tmp_path / "cache", task_name, config)
+
+    relevant_docs = read_candidates(config.candidates_path).to_dict(min_rating=1)
+    queries = {qid: text for qid, text in read_queries(config.queries_path).items() if relevant_docs.get(qid)}
+    evaluator = RetrievalEvaluator(retriever=model, task_name=task_name, k_values=list(RETRIEVAL_K_VALUES))
+    results = evaluator(read_corpus_retrieval(config.corpus_path), queries)
+    ndcg, _map, recall, precision, _ = evaluator.evaluate(relevant_docs, results, list(RETRIEVAL_K_VALUES))
+    mrr, _ = evaluator.evaluate_custom(relevant_docs, results, list(RETRIEVAL_K_VALUES), "mrr")
+
+    for k in RETRIEVAL_K_VALUES:
+        assert scores[f"ndcg_at_{k}"] == ndcg[f"NDCG@{k}"]
+        assert scores[f"map_at_{k}"] == _map[f"MAP@{k}"]
+        assert scores[f"recall_at_{k}"] == recall[f"Recall@{k}"]
+        assert scores[f"precision_at_{k}"] == precision[f"P@{k}"]
+        assert scores[f"mrr_at_{k}"] == pytest.approx(mrr[f"MRR@{k}"])
+    assert scores["main_score"] == scores["ndcg_at_10"]
+
+
+def test_run_fast_retrieval_evaluation__expects__mteb_task_result_file(tmp_path: Path) -> None:
+    config = _write_dataset(tmp_path)
+    task_result_path = tmp_path / "fake-model" / "no_revision_available" / "CustomRetrievalTask.json"
+
+    run_fast_retrieval_evaluation(CustomRetrievalTask(), _HashModel(), tmp_path / "cache",
+                                  TASKS_NAME_MAPPING["retrieval"], config, task_result_path)
+
+    result = json.loads(task_result_path.read_text())
+    assert result["task_name"] == "CustomRetrievalTask"
+    scores = result["scores"]["test"][0]
+    assert scores["hf_subset"] == "default"
+    assert scores["main_score"] == scores["ndcg_at_10"]
@@ -0,0 +1,53 @@
+import numpy as np
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.hard_negatives import (
+    BM25Index, VectorIndex, mine_hard_negatives
+)
+
+DOCS = {
+    "d0": "apple pie recipe with cinnamon",
+    "d1": "apple orchard in autumn",
+    "d2": "banana bread recipe",
+    "d3": "car engine repair",
+    "d4": "apple pie",
+}
+
+
+def _bm25() -> BM25Index:
+    index = BM25Index()
+    for doc_id, text in DOCS.items():
+        index.add(doc_id, text)
+    index.build()
+    return index
+
+
+def test_bm25_mining__expects__top_ranked_docs_not_banned() -> None:
+    picks = mine_hard_negatives(_bm25(), ["apple pie recipe", "banana"], [{"d4"}, {"d2"}], [2, 3],
+                                seed=0, batch_size=1, workers=2)
+
+    # d0 matches every query term, then "recipe" (2 docs) outweighs "apple" (3 docs); d2 is banned for "banana"
+    assert picks[0] == ["d0", "d2"]
+    assert picks[1] == []
+
+
+def test_bm25_mining__expects__same_picks_for_same_seed_whatever_the_batches() -> None:
+    queries = ["apple", "recipe", "pie apple", "engine"] * 5
+    banned = [set() for _ in queries]
+    needs = [2] * len(queries)
+
+    first = mine_hard_negatives(_bm25(), queries, banned, needs, seed=3, batch_size=1, workers=4)
+    second = mine_hard_negatives(_bm25(), queries, banned, needs, seed=3, batch_size=7, workers=1)
+
+    assert first == second
+
+
+def test_vector_mining__expects__nearest_docs_excluding_banned() -> None:
+    vectors = {"a": [1.0, 0.0], "b": [0.9, 0.1], "c": [0.0, 1.0], "q": [1.0, 0.05]}
+    index = VectorIndex(lambda texts: np.array([vectors[text] for text in texts]), chunk_size=2)
+    for doc_id in ("a", "b", "c"):
+        index.add(doc_id, doc_id)
+    index.build()
+
+    picks = mine_hard_negatives(index, ["q", "q"], [{"a"}, set()], [1, 2], seed=0, batch_size=2, workers=1)
+
+    assert picks == [["b"], ["a", "b"]]
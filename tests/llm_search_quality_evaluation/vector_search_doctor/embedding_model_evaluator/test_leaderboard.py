@@ -0,0 +1,74 @@
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator import leaderboard
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.leaderboard import (
+    aggregate_model_averages, load_leaderboard_averages
+)
+
+TASK_NAMES = ["t1", "t2", "t3"]
+
+
+def _scores() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {"model_name": "m1", "task_name": "t1", "score": 0.5},
+            {"model_name": "m1", "task_name": "t2", "score": 0.7},
+            {"model_name": "m1", "task_name": "t3", "score": 60.0},
+            {"model_name": "m2", "task_name": "t1", "score": 0.9},
+            {"model_name": "m2", "task_name": "other", "score": 0.9},
+            {"model_name": "m3", "task_name": "t1", "score": 0.4},
+            {"model_name": "m3", "task_name": "t2", "score": 0.6},
+            {"model_name": "m3", "task_name": "t3", "score": None},
+        ]
+    )
+
+
+def test_aggregate_model_averages__expects__ratio_scores_scaled_and_incomplete_models_dropped() -> None:
+    averages = aggregate_model_averages(_scores(), TASK_NAMES)
+
+    assert set(averages) == {"m1"}
+    assert averages["m1"] == pytest.approx((50.0 + 70.0 + 60.0) / 3)
+
+
+def test_load_leaderboard_averages_with_fresh_snapshot__expects__results_not_fetched_again(
+        tmp_path: Path, monkeypatch
+) -> None:
+    calls = []
+
+    def _fetch(benchmark_name: str, task_type: str):
+        calls.append(task_type)
+        return TASK_NAMES, _scores()
+
+    monkeypatch.setattr(leaderboard, "_fetch_leaderboard_scores", _fetch)
+
+    first = load_leaderboard_averages("Retrieval", snapshot_dir=tmp_path, ttl_hours=1)
+    second = load_leaderboard_averages("Retrieval", snapshot_dir=tmp_path, ttl_hours=1)
+
+    assert first == second
+    assert calls == ["Retrieval"]
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+
+def test_load_leaderboard_averages_with_expired_snapshot_offline__expects__stale_snapshot_used(
+        tmp_path: Path, monkeypatch
+) -> None:
+    def _fetch(benchmark_name: str, task_type: str):
+        raise AssertionError("must not fetch in offline mode")
+
+    monkeypatch.setattr(leaderboard, "_fetch_leaderboard_scores", _fetch)
+    snapshot_path = leaderboard._snapshot_file(tmp_path, leaderboard.LEADERBOARD_BENCHMARK, "Retrieval")
+    snapshot_path.write_text(json.dumps({
+        "schema_version": leaderboard.LEADERBOARD_SNAPSHOT_VERSION,
+        "benchmark": leaderboard.LEADERBOARD_BENCHMARK,
+        "task_type": "Retrieval",
+        "created_at": time.time() - 10 * 3600,
+        "model_averages": {"m1": 42.0},
+    }))
+
+    assert load_leaderboard_averages("Retrieval", snapshot_dir=tmp_path, ttl_hours=1, offline=True) == {"m1": 42.0}
+    assert load_leaderboard_averages("Reranking", snapshot_dir=tmp_path, offline=True) == {}
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.matryoshka import (
+    evaluate_truncations, truncate
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.retrieval_scorer import RetrievalData
+
+
+def test_truncate__expects__first_dimensions_renormalized() -> None:
+    vectors = np.array([[3.0, 4.0, 12.0]], dtype=np.float32)
+
+    assert np.allclose(truncate(vectors, 2), [[0.6, 0.8]])
+
+
+def test_evaluate_truncations__expects__sorted_curve_ending_with_full_dimension() -> None:
+    rng = np.random.default_rng(0)
+    doc_vectors = rng.normal(size=(30, 16)).astype(np.float32)
+    query_vectors = doc_vectors[:5] + rng.normal(scale=0.05, size=(5, 16)).astype(np.float32)
+    data = RetrievalData([f"d{i}" for i in range(30)], doc_vectors, [f"q{i}" for i in range(5)], query_vectors,
+                         {f"q{i}": {f"d{i}": 1} for i in range(5)})
+
+    report = evaluate_truncations(data, [8, 4, 16, 64])
+
+    curve = report["curve"]
+    assert [point["dimension"] for point in curve] == [4, 8, 16]
+    assert [point["bytes_per_vector"] for point in curve] == [16, 32, 64]
+    assert curve[-1]["ndcg_at_10"] == pytest.approx(1.0)
+    assert curve[-1]["ndcg_at_10_delta"] == 0.0
+    assert curve[0]["recall_at_100_delta"] == pytest.approx(0.0)
@@ -0,0 +1,38 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.main import (
+    _write_model_comparison, compute_mteb_leaderboard_comparison
+)
+
+
+def test_compute_mteb_leaderboard_comparison__expects__top_model_and_user_model_average() -> None:
+    metrics = compute_mteb_leaderboard_comparison("m2", {"m1": 50.0, "m2": 60.0, "m3": 55.0})
+
+    assert metrics["top_model"] == "m2"
+    assert metrics["top_model_avg_main_score"] == pytest.approx(60.0)
+    assert metrics["user_model"] == "m2"
+    assert metrics["user_model_mteb_avg_main_score"] == pytest.approx(60.0)
+
+
+def test_compute_mteb_leaderboard_comparison_with_unknown_model__expects__zero_average() -> None:
+    metrics = compute_mteb_leaderboard_comparison("unknown", {})
+
+    assert metrics["top_model"] == "None"
+    assert metrics["user_model_mteb_avg_main_score"] == 0.0
+
+
+def test_write_model_comparison__expects__models_sorted_by_custom_task_main_score(tmp_path: Path) -> None:
+    rows = [
+        {"model": "m1", "custom_task_main_score": 40.0, "mteb_avg_main_score": 50.0},
+        {"model": "m2", "custom_task_main_score": 70.0, "mteb_avg_main_score": 45.0},
+    ]
+
+    path = _write_model_comparison(rows, tmp_path, "CustomRetrievalTask")
+
+    assert path == tmp_path / "CustomRetrievalTask_model_comparison.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["task"] == "CustomRetrievalTask"
+    assert [row["model"] for row in data["models"]] == ["m2", "m1"]
@@ -26,3 +26,23 @@ def test_config_with_invalid_file_extension__expects__raises_validation_error(re
     path = resource_folder / "invalid_mteb_config.yaml"
     with pytest.raises(ValidationError):
         _ = Config.load(path)
+
+
+def test_config_with_single_model_id__expects__model_ids_has_one_model(config: Config) -> None:
+    assert config.model_ids == ["sentence-transformers/all-MiniLM-L6-v2"]
+    assert config.num_model_workers == 1
+
+
+def test_config_with_list_of_model_ids__expects__model_ids_in_given_order(config: Config) -> None:
+    raw = config.model_dump()
+    raw["model_id"] = ["model-b", "model-a"]
+    multi_model_config = Config(**raw)
+    assert multi_model_config.model_ids == ["model-b", "model-a"]
+
+
+@pytest.mark.parametrize("model_id", [[], ["model-a", "model-a"], ["model-a", " "]])
+def test_config_with_invalid_list_of_model_ids__expects__raises_validation_error(config: Config, model_id) -> None:
+    raw = config.model_dump()
+    raw["model_id"] = model_id
+    with pytest.raises(ValidationError):
+        _ = Config(**raw)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.quantization import (
+    bytes_per_vector, evaluate_quantizations, hamming_similarity, int8_ranges, quantize_binary, quantize_int8
+)
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.retrieval_scorer import RetrievalData
+
+
+def test_quantize_int8__expects__calibration_range_mapped_to_int8_bounds() -> None:
+    vectors = np.array([[-1.0, 0.0], [1.0, 0.5], [0.0, 1.0]], dtype=np.float32)
+
+    quantized = quantize_int8(vectors, int8_ranges(vectors))
+
+    assert quantized.dtype == np.int8
+    assert quantized[:, 0].tolist() == [-128, 127, -1]
+    assert quantized[:, 1].tolist() == [-128, -1, 127]
+
+
+def test_hamming_similarity__expects__negated_bit_differences() -> None:
+    queries = quantize_binary(np.array([[1.0] * 10]))
+    docs = quantize_binary(np.array([[1.0] * 10, [-1.0] * 10, [1.0] * 5 + [-1.0] * 5]))
+
+    assert hamming_similarity(queries, docs).tolist() == [[0, -10, -5]]
+    assert bytes_per_vector("binary", 10) == 2
+
+
+def test_evaluate_quantizations__expects__deltas_against_float32_baseline() -> None:
+    rng = np.random.default_rng(0)
+    doc_vectors = rng.normal(size=(40, 32)).astype(np.float32)
+    doc_ids = [f"d{i}" for i in range(40)]
+    # every query is a noisy copy of its relevant document
+    query_vectors = doc_vectors[:10] + rng.normal(scale=0.1, size=(10, 32)).astype(np.float32)
+    query_ids = [f"q{i}" for i in range(10)]
+    data = RetrievalData(doc_ids, doc_vectors, query_ids, query_vectors,
+                         {f"q{i}": {f"d{i}": 1} for i in range(10)})
+
+    report = evaluate_quantizations(data, ["float16", "int8", "binary"])
+
+    results = report["results"]
+    assert report["dimension"] == 32
+    assert [results[p]["bytes_per_vector"] for p in ("float32", "float16", "int8", "binary")] == [128, 64, 32, 4]
+    assert results["float32"]["ndcg_at_10"] == pytest.approx(1.0)
+    assert results["float16"]["ndcg_at_10_delta"] == pytest.approx(0.0)
+    for precision in ("int8", "binary"):
+        assert results[precision]["recall_at_100_delta"] == pytest.approx(0.0)
+        assert results[precision]["ndcg_at_10_delta"] == pytest.approx(
+            results[precision]["ndcg_at_10"] - results["float32"]["ndcg_at_10"])
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import jsonlines
+import numpy as np
+import pytest
+from mteb.evaluation.evaluators.RerankingEvaluator import RerankingEvaluator
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.custom_mteb_tasks.reranking_samples import (
+    build_reranking_samples
+)
+
+
+def _write_jsonl(path: Path, rows: list[dict]) -> Path:
+    with jsonlines.open(path, mode="w") as file:
+        file.write_all(rows)
+    return path
+
+
+def _build(tmp_path: Path, relevance_scale: str = "graded", batch_size: int = 2):
+    corpus = _write_jsonl(tmp_path / "corpus.jsonl", [
+        {"id": "d1", "title": "title1", "text": "text1"},
+        {"id": "d2", "title": "title2", "text": "text2"},
+        # same text as d2
+        {"id": "d2-copy", "title": "title2", "text": "text2"},
+        {"id": "d3", "title": "", "text": ""},
+        {"id": "unused", "title": "title4", "text": "text4"},
+    ])
+    queries = _write_jsonl(tmp_path / "queries.jsonl", [{"id": f"q{i}", "text": f"query {i}"} for i in range(4)])
+    candidates = _write_jsonl(tmp_path / "candidates.jsonl", [
+        {"query_id": query_id, "doc_id": doc_id, "rating": rating}
+        for query_id in ("q0", "q1", "q2")
+        for doc_id, rating in (("d1", 2), ("d2", 0), ("d2-copy", 0), ("d3", 0))
+    ] + [{"query_id": "q3", "doc_id": "d1", "rating": 1}, {"query_id": "q3", "doc_id": "d2", "rating": 0}])
+    return build_reranking_samples(corpus, queries, candidates, relevance_scale, batch_size=batch_size)
+
+
+def test_build_reranking_samples__expects__texts_stored_once_and_rows_resolved(tmp_path: Path) -> None:
+    samples = _build(tmp_path)
+
+    # q3 only has a rating=1 doc (dropped on the graded scale), so no positive
+    assert len(samples) == 3
+    assert samples.documents.num_rows == 2
+    assert samples[0] == {"query": "query 0", "positive": ["title1\n\ntext1"],
+                          "negative": ["title2\n\ntext2", "title2\n\ntext2"]}
+    assert list(samples) == [samples[i] for i in range(3)]
+    assert samples["query"] == ["query 0", "query 1", "query 2"]
+    # rows share the text objects instead of copying them
+    assert samples[0]["positive"][0] is samples[2]["positive"][0]
+    with pytest.raises(IndexError):
+        samples[3]
+
+
+def test_build_reranking_samples_with_binary_scale__expects__positive_ratings_kept(tmp_path: Path) -> None:
+    samples = _build(tmp_path, relevance_scale="binary")
+
+    assert samples["query"][-1] == "query 3"
+
+
+class _FakeModel:
+    def encode(self, texts: list[str], **kwargs) -> np.ndarray:
+        return np.asarray([[len(text), text.count("1") + 1.0] for text in texts], dtype=np.float32)
+
+
+def test_reranking_samples__expects__evaluated_by_mteb_reranking_evaluator(tmp_path: Path) -> None:
+    samples = _build(tmp_path)
+
+    scores = RerankingEvaluator(samples, task_name="CustomRerankingTask")(_FakeModel())
+
+    assert 0.0 <= scores["map"] <= 1.0
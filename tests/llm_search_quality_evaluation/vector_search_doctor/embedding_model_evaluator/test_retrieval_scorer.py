@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+import pytrec_eval
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.retrieval_scorer import (
+    evaluate_rankings, normalize, top_k
+)
+
+
+def test_top_k_with_small_blocks__expects__same_result_as_full_sort() -> None:
+    rng = np.random.default_rng(0)
+    queries, docs = normalize(rng.normal(size=(7, 16))), normalize(rng.normal(size=(50, 16)))
+
+    indices, scores = top_k(queries, docs, 5, query_block_size=3, doc_block_size=8)
+
+    full = queries @ docs.T
+    expected = np.argsort(-full, axis=1)[:, :5]
+    assert np.array_equal(indices, expected)
+    assert np.allclose(scores, np.take_along_axis(full, expected, axis=1))
+
+
+def test_evaluate_rankings__expects__same_ndcg_and_recall_as_trec_eval() -> None:
+    rng = np.random.default_rng(1)
+    doc_ids = [f"d{i}" for i in range(30)]
+    query_ids = [f"q{i}" for i in range(6)]
+    relevant_docs = {
+        query_id: {doc_id: int(rng.integers(1, 3)) for doc_id in rng.choice(doc_ids, size=4, replace=False)}
+        for query_id in query_ids
+    }
+    # a relevant doc missing from the corpus still counts in the ideal ranking and in recall
+    relevant_docs["q0"]["missing"] = 2
+    scores = rng.random((len(query_ids), len(doc_ids)))
+    ranked = np.argsort(-scores, axis=1)[:, :10]
+
+    metrics = evaluate_rankings(ranked, query_ids, doc_ids, relevant_docs, k_values=(3, 10))
+
+    run = {
+        query_id: {doc_ids[d]: float(len(doc_ids) - rank) for rank, d in enumerate(ranked[row])}
+        for row, query_id in enumerate(query_ids)
+    }
+    evaluator = pytrec_eval.RelevanceEvaluator(relevant_docs, {"ndcg_cut.3,10", "recall.3,10"})
+    expected = evaluator.evaluate(run)
+    for k in (3, 10):
+        assert metrics[f"ndcg_at_{k}"] == pytest.approx(np.mean([v[f"ndcg_cut_{k}"] for v in expected.values()]))
+        assert metrics[f"recall_at_{k}"] == pytest.approx(np.mean([v[f"recall_{k}"] for v in expected.values()]))
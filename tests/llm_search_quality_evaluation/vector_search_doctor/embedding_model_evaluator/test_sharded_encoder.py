@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pytest
+
+from llm_search_quality_evaluation.vector_search_doctor.embedding_model_evaluator.sharded_encoder import ShardedEncoder
+
+
+class _FakeModel:
+    """Deterministic encoder: vector = [len(text), pid of the encoding process]."""
+
+    mteb_model_meta = "fake-meta"
+
+    def encode(self, texts: list[str], **kwargs) -> np.ndarray:
+        return np.array([[len(text), os.getpid()] for text in texts], dtype=np.float32)
+
+
+def _fake_loader(model_id: str) -> _FakeModel:
+    return _FakeModel()
+
+
+def test_sharded_encoder_with_small_input__expects__encoded_in_process() -> None:
+    encoder = ShardedEncoder("fake", num_workers=2, min_shard_size=100, model_loader=_fake_loader)
+
+    vectors = encoder.encode(["a", "bb"], task_name="t")
+
+    assert vectors[:, 0].tolist() == [1, 2]
+    assert set(vectors[:, 1].tolist()) == {os.getpid()}
+    assert encoder.mteb_model_meta == "fake-meta"
+    encoder.close()
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_sharded_encoder_with_large_input__expects__shards_encoded_by_workers_in_order() -> None:
+    encoder = ShardedEncoder("fake", num_workers=2, threads_per_worker=1, min_shard_size=2,
+                             model_loader=_fake_loader)
+    texts = ["x" * i for i in range(1, 10)]
+    try:
+        vectors = encoder.encode(texts, task_name="t", batch_size=4)
+    finally:
+        encoder.close()
+
+    assert vectors.shape == (9, 2)
+    assert vectors[:, 0].tolist() == list(range(1, 10))
+    # shards are encoded by the worker processes, not by the local model copy
+    assert os.getpid() not in set(vectors[:, 1].tolist())